@@ -5,6 +5,7 @@ import logging
 import tempfile
 import subprocess
 from pathlib import Path
+from urllib.parse import quote
 from typing import Optional, List
 from fastapi import FastAPI, UploadFile, File, HTTPException, Query
 from fastapi.concurrency import run_in_threadpool
@@ -16,6 +17,11 @@ import pandas as pd
 import numpy as np
 from pydantic import BaseModel
 
+from review_stats import ReviewStats
+from skills import DEFAULT_SKILLS_PATH, JobSkills, SkillMatcher, load_skill_dictionary
+from table_index import ColumnPostings, TableIndex
+from text_search import CatalogSearch
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 load_dotenv()
@@ -48,10 +54,17 @@ except ValueError as e:
 MODEL_SERVICE_URL = os.environ.get("MODEL_SERVICE_URL", "http://model-service:8001")
 logger.info(f"Model service URL configured: {MODEL_SERVICE_URL}")
 
+# Largest page of matches a client may request, as accepted by the model service
+MAX_TOP_K = 50
+
 # CSV Data Configuration
 CSV_DATA_PATH = os.environ.get("CSV_DATA_PATH", "/app/mock-data")
 logger.info(f"CSV data path configured: {CSV_DATA_PATH}")
 
+# Skill dictionary extracted from job texts
+SKILLS_PATH = os.environ.get("SKILLS_PATH", str(DEFAULT_SKILLS_PATH))
+logger.info(f"Skill dictionary path configured: {SKILLS_PATH}")
+
 # Pydantic Models
 class Company(BaseModel):
     id: int
@@ -102,9 +115,29 @@ company_data_cache = None
 job_data_cache = None
 review_data_cache = None
 
+# Row postings of the filterable columns, rebuilt with the data
+company_index = None
+job_index = None
+
+# Search indexes over names, titles and texts, rebuilt with the data
+catalog_search = None
+
+# Company slug -> row of company_data_cache, and review and job rows grouped by
+# company slug, rebuilt with the data
+company_row_by_slug = {}
+review_groups = None
+job_groups = None
+
+# Per-company review counts, rating means and histograms, rebuilt with the data
+review_stats = None
+
+# Skills mentioned by each job, extracted when the data is loaded
+job_skills = None
+
 def load_csv_data():
     """Load and cache CSV data"""
-    global company_data_cache, job_data_cache, review_data_cache
+    global company_data_cache, job_data_cache, review_data_cache, company_index, job_index, catalog_search
+    global company_row_by_slug, review_groups, job_groups, review_stats, job_skills
     
     try:
         # Load company info
@@ -140,29 +173,30 @@ def load_csv_data():
         company_data_cache = pd.DataFrame()
         job_data_cache = pd.DataFrame()
         review_data_cache = pd.DataFrame()
-
-def extract_skills_from_text(job_text: str) -> List[str]:
-    """Extract skills from job description text"""
-    if not job_text or pd.isna(job_text):
-        return []
     
-    skill_keywords = [
-        'JavaScript', 'Python', 'Java', 'React', 'Node.js', 'Angular', 'Vue.js',
-        'SQL', 'MongoDB', 'PostgreSQL', 'MySQL', 'AWS', 'Azure', 'Docker', 
-        'Kubernetes', 'Git', 'HTML', 'CSS', 'TypeScript', 'PHP', 'C++', 'C#',
-        'Machine Learning', 'Data Analysis', 'Tableau', 'Excel', 'Figma',
-        'Photoshop', 'Project Management', 'Agile', 'Scrum', 'DevOps',
-        'TensorFlow', 'PyTorch', 'Pandas', 'NumPy'
-    ]
+    company_index = TableIndex(company_data_cache, ["industry", "size"])
+    job_index = TableIndex(job_data_cache, ["company", "category", "location"])
+    catalog_search = CatalogSearch(company_data_cache, job_data_cache)
     
-    found_skills = []
-    text_lower = str(job_text).lower()
+    empty = pd.Series([], dtype=object)
+    slugs = company_data_cache['Company'].map(slug_key) if 'Company' in company_data_cache.columns else empty
+    # The first company wins when several share a slug
+    first_rows = np.flatnonzero(slugs.notna().to_numpy() & ~slugs.duplicated().to_numpy())
+    company_row_by_slug = dict(zip(slugs.iloc[first_rows], first_rows.tolist()))
+    review_groups = ColumnPostings(review_data_cache['Company'] if 'Company' in review_data_cache.columns else empty, slug_key)
+    job_groups = ColumnPostings(job_data_cache['company'] if 'company' in job_data_cache.columns else empty, slug_key)
+    review_stats = ReviewStats(review_data_cache, review_groups)
     
-    for skill in skill_keywords:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills[:5]  # Limit to 5 skills
+    try:
+        skill_dictionary = load_skill_dictionary(SKILLS_PATH)
+    except OSError as e:
+        logger.error(f"Error loading skill dictionary: {e}")
+        skill_dictionary = []
+    job_texts = pd.Series("", index=job_data_cache.index)
+    for column in ('job_title', 'job_text'):
+        if column in job_data_cache.columns:
+            job_texts += " " + job_data_cache[column].fillna("").astype(str)
+    job_skills = JobSkills(SkillMatcher(skill_dictionary), job_texts)
 
 def calculate_match_percentage(company_name: str, user_skills: List[str] = None) -> float:
     """Calculate match percentage for a company based on various factors"""
@@ -197,6 +231,51 @@ def calculate_match_percentage(company_name: str, user_skills: List[str] = None)
     except Exception:
         return 75.0  # Safe fallback
 
+def company_key(name) -> Optional[str]:
+    """Normalizes a company name the way the model service groups jobs by company"""
+    if not isinstance(name, str):
+        return None
+    return " ".join(re.findall(r"\w+", name.lower())) or None
+
+def slug_key(name) -> Optional[str]:
+    """Normalizes a company name, or the URL slug the frontend builds from it, to the same key"""
+    if not isinstance(name, str):
+        return None
+    return " ".join(re.sub(r"[^\w\s-]", "", name.lower()).replace("-", " ").split()) or None
+
+def parse_top_k(value) -> int:
+    """Validates a client-supplied top_k, raising 400 unless it is an integer from 1 to MAX_TOP_K"""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise HTTPException(status_code=400, detail="top_k must be an integer")
+    try:
+        top_k = int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="top_k must be an integer")
+    if not 1 <= top_k <= MAX_TOP_K:
+        raise HTTPException(status_code=400, detail=f"top_k must be between 1 and {MAX_TOP_K}")
+    return top_k
+
+async def fetch_company_scores(cursor: str) -> Optional[dict]:
+    """
+    Returns {company key: similarity} for every company with jobs, ranked by the
+    model service for the resume behind an analysis cursor, or None when the
+    cursor has expired or the model service cannot be reached.
+    """
+    try:
+        async with httpx.AsyncClient() as client:
+            model_response = await client.post(
+                f"{MODEL_SERVICE_URL}/match_companies",
+                json={"cursor": cursor},
+                timeout=30.0
+            )
+        if model_response.status_code != 200:
+            logger.warning(f"Company matching unavailable ({model_response.status_code}); using default order")
+            return None
+        return {company_key(item["company"]): item["score"] for item in model_response.json()["companies"]}
+    except httpx.RequestError as e:
+        logger.warning(f"Error connecting to model service for company matching: {e}")
+        return None
+
 # Global helper function for safe float conversion
 def safe_float(value, default=4.0):
     """Safely convert a value to float, handling NaN, infinity, and invalid values"""
@@ -390,6 +469,7 @@ async def analyze_resume_endpoint(data: dict):
     Analyzes the parsed resume data by calling the model service to find matching jobs.
     """
     logger.info("Received request for custom job analysis.")
+    top_k = parse_top_k(data.get('top_k', 5))
     try:
         parsed_data = data.get('parsed_data', {})
         summary_text = parsed_data.get('summary', {}).get('full_text', '')
@@ -397,12 +477,11 @@ async def analyze_resume_endpoint(data: dict):
         skills_text = parsed_data.get('skills', {}).get('full_text', '')
         
         query_text = f"{summary_text}\n{experience_text}\n{skills_text}"
-        
         # Call the model service
         async with httpx.AsyncClient() as client:
             model_response = await client.post(
                 f"{MODEL_SERVICE_URL}/match_jobs",
-                json={"resume_text": query_text, "top_k": 5},
+                json={"resume_text": query_text, "top_k": top_k},
                 timeout=30.0
             )
             
@@ -414,7 +493,7 @@ async def analyze_resume_endpoint(data: dict):
             job_matches = model_data.get("job_matches", [])
             
         return {
-            "analysis": {"job_matches": job_matches},
+            "analysis": {"job_matches": job_matches, "next_cursor": model_data.get("next_cursor")},
             "original_parsed_data": data
         }
     except httpx.RequestError as e:
@@ -424,6 +503,67 @@ async def analyze_resume_endpoint(data: dict):
         logger.exception("An error occurred during custom analysis.")
         raise HTTPException(status_code=500, detail=f"Error during analysis: {str(e)}")
 
+@app.post("/analyze_resume/more")
+async def analyze_resume_more_endpoint(data: dict):
+    """
+    Loads the next page of job matches using the next_cursor of a previous analysis.
+    """
+    cursor = data.get('cursor')
+    if not cursor:
+        raise HTTPException(status_code=400, detail="cursor is required")
+    top_k = parse_top_k(data.get('top_k', 5))
+    try:
+        async with httpx.AsyncClient() as client:
+            model_response = await client.post(
+                f"{MODEL_SERVICE_URL}/match_jobs",
+                json={"cursor": cursor, "top_k": top_k},
+                timeout=30.0
+            )
+        
+        # Expired or malformed cursors are the caller's to handle (repeat the analysis)
+        if model_response.status_code in (400, 410):
+            raise HTTPException(status_code=model_response.status_code, detail=model_response.json().get("detail"))
+        if model_response.status_code != 200:
+            logger.error(f"Model service returned status {model_response.status_code}: {model_response.text}")
+            raise HTTPException(status_code=500, detail="Model service unavailable")
+        
+        model_data = model_response.json()
+        return {"job_matches": model_data.get("job_matches", []), "next_cursor": model_data.get("next_cursor")}
+    except HTTPException:
+        raise
+    except httpx.RequestError as e:
+        logger.exception(f"Error connecting to model service: {e}")
+        raise HTTPException(status_code=500, detail="Unable to connect to model service")
+    except Exception as e:
+        logger.exception("An error occurred while loading more matches.")
+        raise HTTPException(status_code=500, detail=f"Error loading more matches: {str(e)}")
+
+@app.get("/similar_jobs/{job_id}")
+async def similar_jobs_endpoint(job_id: str, top_k: int = Query(5, ge=1, le=MAX_TOP_K)):
+    """
+    Returns the jobs most similar to a given job, for related vacancies on job pages.
+    """
+    try:
+        async with httpx.AsyncClient() as client:
+            model_response = await client.get(
+                f"{MODEL_SERVICE_URL}/similar_jobs/{quote(job_id, safe='')}",
+                params={"top_k": top_k},
+                timeout=30.0
+            )
+
+        if model_response.status_code == 404:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        if model_response.status_code != 200:
+            logger.error(f"Model service returned status {model_response.status_code}: {model_response.text}")
+            raise HTTPException(status_code=500, detail="Model service unavailable")
+
+        return model_response.json()
+    except HTTPException:
+        raise
+    except httpx.RequestError as e:
+        logger.exception(f"Error connecting to model service: {e}")
+        raise HTTPException(status_code=500, detail="Unable to connect to model service")
+
 
 # --- CSV-based Company and Job Endpoints ---
 
@@ -433,9 +573,15 @@ async def get_companies(
     size: Optional[str] = Query(None, description="Filter by company size"),
     search: Optional[str] = Query(None, description="Search companies by name or description"),
     page: int = Query(1, ge=1, description="Page number (starting from 1)"),
-    limit: int = Query(12, ge=1, le=100, description="Number of companies per page")
+    limit: int = Query(12, ge=1, le=100, description="Number of companies per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of a resume analysis; ranks companies by match")
 ):
-    """Get list of companies with optional filtering and pagination"""
+    """
+    Get list of companies with optional filtering and pagination.
+
+    With the cursor of a resume analysis, match is the similarity of the resume to
+    each company's jobs and companies are sorted by it before paginating.
+    """
     logger.info(f"GET /companies - page={page}, limit={limit}, industry={industry}, size={size}, search={search}")
     try:
         if company_data_cache.empty:
@@ -452,35 +598,32 @@ async def get_companies(
                 }
             }
         
-        # Start with all companies
-        filtered_companies = company_data_cache.copy()
-        
-        # Apply filters
-        if industry and len(industry) > 0:
-            if 'industry' in filtered_companies.columns:
-                # Handle multiple industries with OR logic
-                industry_mask = pd.Series([False] * len(filtered_companies))
-                for ind in industry:
-                    industry_mask |= filtered_companies['industry'].str.contains(ind, case=False, na=False)
-                filtered_companies = filtered_companies[industry_mask]
+        # Filters intersect precomputed postings; only the requested page is materialized
+        rows = company_index.filter({"industry": industry, "size": size})
         
         if search:
-            if 'Company' in filtered_companies.columns:
-                search_mask = filtered_companies['Company'].str.contains(search, case=False, na=False)
-                if 'description' in filtered_companies.columns:
-                    search_mask |= filtered_companies['description'].str.contains(search, case=False, na=False)
-                filtered_companies = filtered_companies[search_mask]
+            rows = np.intersect1d(rows, catalog_search.companies(search), assume_unique=True)
+        
+        # Real match scores, sorted across all pages; companies without jobs come last
+        company_scores = await fetch_company_scores(cursor) if cursor else None
+        row_scores = None
+        if company_scores is not None and 'Company' in company_data_cache.columns:
+            names = company_data_cache['Company'].to_numpy()[rows]
+            row_scores = np.array([company_scores.get(company_key(name), np.nan) for name in names], dtype=np.float64)
+            order = np.argsort(-np.nan_to_num(row_scores, nan=-np.inf), kind='stable')
+            rows, row_scores = rows[order], row_scores[order]
         
         # Calculate pagination
-        total_companies = len(filtered_companies)
+        total_companies = len(rows)
         offset = (page - 1) * limit
         
         # Get paginated data
-        paginated_companies = filtered_companies.iloc[offset:offset + limit]
+        paginated_companies = company_data_cache.iloc[rows[offset:offset + limit]]
+        page_scores = row_scores[offset:offset + limit] if row_scores is not None else None
         
         # Convert to list of dictionaries
         companies = []
-        for idx, row in paginated_companies.iterrows():
+        for position, (idx, row) in enumerate(paginated_companies.iterrows()):
             company = {
                 "id": idx + 1,
                 "name": row.get('Company', f'Company {idx + 1}'),
@@ -490,16 +633,24 @@ async def get_companies(
                 "match": calculate_match_percentage(row.get('Company', '')),
                 "location": row.get('headquarters', 'Malaysia')
             }
+            stats = review_stats.summary(slug_key(row.get('Company')))
+            if stats is not None:
+                company["rating"] = round(safe_float(stats['overall_rating'], 0.0), 1)
+                company["review_count"] = stats['review_count']
+            if page_scores is not None:
+                company["match"] = round(max(safe_float(page_scores[position], 0.0), 0.0) * 100, 1)
             companies.append(company)
         
-        # Sort by match percentage descending
-        companies.sort(key=lambda x: x['match'], reverse=True)
+        if page_scores is None:
+            # Sort by match percentage descending
+            companies.sort(key=lambda x: x['match'], reverse=True)
         
         # Calculate pagination metadata
         total_pages = (total_companies + limit - 1) // limit
         
         return make_json_safe({
             "companies": companies,
+            "personalized": row_scores is not None,
             "pagination": {
                 "current_page": page,
                 "total_pages": total_pages,
@@ -529,101 +680,61 @@ async def get_company_details(company_name: str):
     """Get detailed information about a specific company"""
     try:
         logger.info(f"Fetching company details for: {company_name}")
-        # Convert URL slug back to potential company name
-        # First, convert hyphens to spaces
-        potential_name = company_name.replace('-', ' ')
-        
-        # Try to find exact match in company data first
-        clean_company_name = None
-        if not company_data_cache.empty and 'Company' in company_data_cache.columns:
-            # Look for companies that match when both are stripped of punctuation and lowercased
-            for company in company_data_cache['Company'].dropna():
-                company_clean = ''.join(c.lower() for c in company if c.isalnum() or c.isspace())
-                potential_clean = ''.join(c.lower() for c in potential_name if c.isalnum() or c.isspace())
-                if company_clean == potential_clean:
-                    clean_company_name = company
-                    break
-        
-        # Fallback to title case if no exact match found
-        if clean_company_name is None:
-            clean_company_name = potential_name.title()
-        
-        # Find company in data using the exact name we found
-        company_row = None
-        if not company_data_cache.empty and 'Company' in company_data_cache.columns:
-            exact_match = company_data_cache[
-                company_data_cache['Company'] == clean_company_name
-            ]
-            if not exact_match.empty:
-                company_row = exact_match.iloc[0]
+        # Resolve the URL slug through the lookup built at load time
+        key = slug_key(company_name)
+        row = company_row_by_slug.get(key)
+        company_row = company_data_cache.iloc[row] if row is not None else None
+        
+        # Fallback to title case if no company matches
+        clean_company_name = company_row.get('Company') if company_row is not None else company_name.replace('-', ' ').title()
         
-        # Get company reviews using exact company name
+        # Get company reviews
         company_reviews = []
-        if not review_data_cache.empty and 'Company' in review_data_cache.columns:
-            reviews_for_company = review_data_cache[
-                review_data_cache['Company'] == clean_company_name
-            ].head(10)  # Limit to 10 reviews
-            
-            for idx, review in reviews_for_company.iterrows():
-                company_reviews.append({
-                    "id": int(idx) if pd.notna(idx) else 0,
-                    "rating": safe_float(review.get('overall_rating'), 4.0),
-                    "title": review.get('headline', 'Employee Review'),
-                    "position": review.get('job_title', 'Employee'),
-                    "location": review.get('location', 'Malaysia') if review.get('location') and str(review.get('location')).strip() and str(review.get('location')) != '0.0' else 'N/A',
-                    "date": review.get('date_review', '2024'),
-                    "employment": review.get('current', 'N/A'),
-                    "pros": review.get('pros', 'N/A'),
-                    "cons": review.get('cons', 'N/A'),
-                })
-        
-        # Get job openings for this company using exact company name
+        for idx, review in review_data_cache.iloc[review_groups.equal(key)[:10]].iterrows():  # Limit to 10 reviews
+            company_reviews.append({
+                "id": int(idx) if pd.notna(idx) else 0,
+                "rating": safe_float(review.get('overall_rating'), 4.0),
+                "title": review.get('headline', 'Employee Review'),
+                "position": review.get('job_title', 'Employee'),
+                "location": review.get('location', 'Malaysia') if review.get('location') and str(review.get('location')).strip() and str(review.get('location')) != '0.0' else 'N/A',
+                "date": review.get('date_review', '2024'),
+                "employment": review.get('current', 'N/A'),
+                "pros": review.get('pros', 'N/A'),
+                "cons": review.get('cons', 'N/A'),
+            })
+        
+        # Get job openings for this company
         company_jobs = []
-        if not job_data_cache.empty and 'company' in job_data_cache.columns:
-            jobs_for_company = job_data_cache[
-                job_data_cache['company'] == clean_company_name
-            ].head(5)  # Limit to 5 jobs
-            
-            for idx, job in jobs_for_company.iterrows():
-                company_jobs.append({
-                    "job_id": str(job.get('job_id', int(idx) if pd.notna(idx) else 0)),
-                    "job_title": job.get('job_title', 'N/A'),
-                    "category": job.get('category', 'N/A'),
-                    "subcategory": job.get('subcategory', 'N/A'),
-                    "location": job.get('location', 'N/A'),
-                    "type": job.get('type', 'N/A'),
-                    "salary": job.get('salary', 'N/A'),
-                    "job_text": job.get('job_text', 'N/A'),
-                    "role": job.get('role', 'N/A')
-                })
-        
-        # Calculate average ratings
-        avg_rating = 0.0
-        review_count = len(company_reviews)
-        if company_reviews:
-            # Filter out any NaN ratings and ensure we have valid numbers
-            valid_ratings = [r['rating'] for r in company_reviews if isinstance(r['rating'], (int, float)) and not pd.isna(r['rating'])]
-            if valid_ratings:
-                avg_rating = sum(valid_ratings) / len(valid_ratings)
-            else:
-                avg_rating = 0.0  # fallback if no valid ratings
-        
-        # Ensure avg_rating is valid
-        if not isinstance(avg_rating, (int, float)) or pd.isna(avg_rating):
-            avg_rating = 0.0
+        for idx, job in job_data_cache.iloc[job_groups.equal(key)[:5]].iterrows():  # Limit to 5 jobs
+            company_jobs.append({
+                "job_id": str(job.get('job_id', int(idx) if pd.notna(idx) else 0)),
+                "job_title": job.get('job_title', 'N/A'),
+                "category": job.get('category', 'N/A'),
+                "subcategory": job.get('subcategory', 'N/A'),
+                "location": job.get('location', 'N/A'),
+                "type": job.get('type', 'N/A'),
+                "salary": job.get('salary', 'N/A'),
+                "job_text": job.get('job_text', 'N/A'),
+                "role": job.get('role', 'N/A')
+            })
+        
+        # Aggregates over all of the company's reviews, computed at load time
+        stats = review_stats.summary(key) or {}
         
         # Build company details using actual CSV data
         company_details = {
-            "name": company_row.get('Company') if company_row is not None else clean_company_name,
+            "name": clean_company_name,
             "tagline": company_row.get('tagline', 'N/A') if company_row is not None else 'N/A',
             "location": company_row.get('headquarters', 'N/A') if company_row is not None else 'N/A',
             "industry": company_row.get('industry', 'N/A') if company_row is not None else 'N/A',
             "size": company_row.get('size', 'N/A') if company_row is not None else 'N/A',
-            "rating": round(avg_rating, 0),
-            "reviewCount": review_count,
-            "workLifeBalance": round(avg_rating * 0.95, 0),
-            "culture": round(avg_rating * 1.05, 0),
-            "careerOpportunities": round(avg_rating * 0.9, 0),
+            "rating": round(safe_float(stats.get('overall_rating'), 0.0), 1),
+            "reviewCount": stats.get('review_count', 0),
+            "workLifeBalance": round(safe_float(stats.get('work_life_balance'), 0.0), 1),
+            "culture": round(safe_float(stats.get('culture_values'), 0.0), 1),
+            "careerOpportunities": round(safe_float(stats.get('career_opp'), 0.0), 1),
+            "compensationBenefits": round(safe_float(stats.get('comp_benefits'), 0.0), 1),
+            "ratingHistogram": stats.get('rating_histogram', {str(stars): 0 for stars in range(1, 6)}),
             "founded": company_row.get('founded', 'N/A') if company_row is not None else 'N/A',
             "employeeCount": company_row.get('employee_count', 'N/A') if company_row is not None else 'N/A',
             "headquarters": company_row.get('headquarters', 'N/A') if company_row is not None else 'N/A',
@@ -649,6 +760,8 @@ async def get_jobs(
     company: Optional[str] = Query(None, description="Filter by company"),
     category: Optional[str] = Query(None, description="Filter by job category"),
     location: Optional[str] = Query(None, description="Filter by location"),
+    search: Optional[str] = Query(None, description="Search job titles and texts; results are ranked"),
+    skill: Optional[List[str]] = Query(None, description="Filter by skill (can be multiple; jobs must mention all)"),
     limit: int = Query(20, description="Maximum number of jobs to return")
 ):
     """Get list of job openings with optional filtering"""
@@ -656,31 +769,19 @@ async def get_jobs(
         if job_data_cache.empty:
             return []
         
-        # Start with all jobs
-        filtered_jobs = job_data_cache.copy()
+        # Filters intersect precomputed postings; only the returned rows are materialized
+        rows = job_index.filter({"company": company, "category": category, "location": location})
         
-        # Apply filters
-        if company:
-            if 'company' in filtered_jobs.columns:
-                filtered_jobs = filtered_jobs[
-                    filtered_jobs['company'].str.contains(company, case=False, na=False)
-                ]
+        if skill:
+            rows = np.intersect1d(rows, job_skills.rows_with(skill), assume_unique=True)
         
-        if category:
-            if 'category' in filtered_jobs.columns:
-                filtered_jobs = filtered_jobs[
-                    filtered_jobs['category'].str.contains(category, case=False, na=False)
-                ]
-        
-        if location:
-            if 'location' in filtered_jobs.columns:
-                filtered_jobs = filtered_jobs[
-                    filtered_jobs['location'].str.contains(location, case=False, na=False)
-                ]
+        if search:
+            ranked = catalog_search.jobs(search)
+            rows = ranked[np.isin(ranked, rows, assume_unique=True)]
         
         # Convert to list of dictionaries
         jobs = []
-        for idx, row in filtered_jobs.head(limit).iterrows():
+        for position, (idx, row) in zip(rows[:limit].tolist(), job_data_cache.iloc[rows[:limit]].iterrows()):
             job = {
                 "job_id": str(row.get('job_id', int(idx) if pd.notna(idx) else 0)),
                 "job_title": row.get('job_title', 'Software Engineer'),
@@ -693,7 +794,7 @@ async def get_jobs(
                 "type": row.get('type', 'Full-time'),
                 "salary": row.get('salary', 'Competitive'),
                 "listing_date": row.get('listingDate', '2024-01-01'),
-                "skills": extract_skills_from_text(row.get('job_text', ''))
+                "skills": job_skills.names_of(position)[:5]
             }
             jobs.append(job)
         
@@ -703,6 +804,38 @@ async def get_jobs(
         logger.error(f"Error fetching jobs: {e}")
         return []
 
+@app.get("/skills")
+async def get_skill_facets(
+    company: Optional[str] = Query(None, description="Filter by company"),
+    category: Optional[str] = Query(None, description="Filter by job category"),
+    location: Optional[str] = Query(None, description="Filter by location"),
+    skill: Optional[List[str]] = Query(None, description="Filter by skill (can be multiple; jobs must mention all)"),
+    limit: int = Query(20, ge=1, le=500, description="Maximum number of skills to return")
+):
+    """Most mentioned skills among the jobs matching the filters, with job counts"""
+    try:
+        rows = None
+        if company or category or location or skill:
+            rows = job_index.filter({"company": company, "category": category, "location": location})
+            if skill:
+                rows = np.intersect1d(rows, job_skills.rows_with(skill), assume_unique=True)
+        return job_skills.facets(rows, limit)
+    except Exception as e:
+        logger.error(f"Error fetching skill facets: {e}")
+        return []
+
+@app.get("/search/suggest")
+async def suggest(
+    q: str = Query(..., description="Text typed so far"),
+    limit: int = Query(8, ge=1, le=50, description="Maximum number of suggestions of each kind")
+):
+    """Typeahead suggestions: company names and job titles containing the query"""
+    try:
+        return make_json_safe(catalog_search.suggest(q, limit))
+    except Exception as e:
+        logger.error(f"Error fetching suggestions: {e}")
+        return {"companies": [], "job_titles": []}
+
 @app.get("/reviews/{company_name}")
 async def get_company_reviews(
     company_name: str,
@@ -713,13 +846,8 @@ async def get_company_reviews(
         if review_data_cache.empty:
             return []
         
-        # Clean up company name
-        clean_company_name = company_name.replace('-', ' ').title()
-        
-        # Find reviews for this company - remove periods for search but preserve original names in results
-        company_reviews = review_data_cache[
-            review_data_cache['Company'].str.contains(clean_company_name.replace('.', ''), case=False, na=False)
-        ].head(limit)
+        # Reviews grouped by company slug at load time
+        company_reviews = review_data_cache.iloc[review_groups.equal(slug_key(company_name))[:limit]]
         
         reviews = []
         for idx, review in company_reviews.iterrows():
@@ -0,0 +1,58 @@
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RATING_COLUMNS = ["overall_rating", "work_life_balance", "culture_values", "career_opp", "comp_benefits"]
+
+
+class ReviewStats:
+    """
+    Per-company review aggregates, computed for every company at once when the
+    data is loaded: the number of reviews, the mean of each rating column
+    (over the reviews that give it) and a histogram of overall ratings
+    rounded to whole stars.
+
+    Companies are the groups of a ColumnPostings over the review table, and
+    their aggregates are rows of small numeric arrays, so a lookup is a dict
+    access and an index.
+    """
+
+    def __init__(self, reviews: pd.DataFrame, groups):
+        companies = len(groups.values)
+        # The company of every review (-1 for none), recovered from the grouped rows
+        codes = np.full(len(reviews), -1, dtype=np.int64)
+        codes[groups.rows] = np.repeat(np.arange(companies), np.diff(groups.offsets))
+        grouped = codes >= 0
+
+        ratings = pd.DataFrame({
+            column: pd.to_numeric(reviews[column], errors="coerce") if column in reviews.columns else np.nan
+            for column in RATING_COLUMNS
+        }, index=reviews.index)
+        self.positions = groups.codes
+        self.counts = np.bincount(codes[grouped], minlength=companies).astype(np.int32)
+        self.means = (ratings[grouped].astype(np.float64).groupby(codes[grouped]).mean()
+                      .reindex(range(companies)).to_numpy(dtype=np.float64).reshape(companies, len(RATING_COLUMNS)))
+
+        stars = ratings["overall_rating"].round().clip(1, 5).to_numpy()
+        starred = grouped & ~np.isnan(stars)
+        self.histograms = np.bincount(codes[starred] * 5 + stars[starred].astype(np.int64) - 1,
+                                      minlength=companies * 5).reshape(companies, 5).astype(np.int32)
+        logger.info(f"Aggregated {int(grouped.sum())} reviews of {companies} companies")
+
+    def summary(self, key: Optional[str]) -> Optional[dict]:
+        """
+        Returns the aggregates of the company with the given key, or None if it
+        has no reviews. Means of ratings no review gives are None.
+        """
+        position = self.positions.get(key)
+        if position is None:
+            return None
+        return {
+            "review_count": int(self.counts[position]),
+            **{column: None if np.isnan(mean) else float(mean) for column, mean in zip(RATING_COLUMNS, self.means[position])},
+            "rating_histogram": {str(stars): int(count) for stars, count in enumerate(self.histograms[position].tolist(), 1)},
+        }
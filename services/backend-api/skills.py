@@ -0,0 +1,172 @@
+import logging
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Words as skills are written: keeps "c++", "c#", "node.js" and ".net" whole,
+# while hyphens, slashes and sentence-ending periods separate words
+SKILL_TOKEN_PATTERN = re.compile(r"\.?[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+DEFAULT_SKILLS_PATH = Path(__file__).parent / "skills.txt"
+
+
+def skill_tokens(text) -> list[str]:
+    return SKILL_TOKEN_PATTERN.findall(str(text).lower()) if pd.notna(text) else []
+
+
+def load_skill_dictionary(path) -> list[tuple[str, list[str]]]:
+    """
+    Reads a skill dictionary: one skill per line, optionally followed by
+    "|"-separated aliases. Blank lines and lines starting with "#" are
+    skipped.
+    """
+    skills = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, *aliases = [part.strip() for part in line.split("|")]
+        skills.append((name, [alias for alias in aliases if alias]))
+    return skills
+
+
+class SkillMatcher:
+    """
+    An Aho-Corasick automaton over the skill dictionary, finding every skill
+    and alias in a text in one pass.
+
+    The automaton steps over words rather than characters, so skills only
+    match whole words: "Java" does not match inside "JavaScript", and
+    multi-word skills such as "Machine Learning" match across any spacing or
+    punctuation between their words.
+    """
+
+    def __init__(self, skills: list[tuple[str, list[str]]]):
+        self.names = [name for name, _ in skills]
+        self.ids = {}
+        self.transitions = [{}]
+        outputs = [[]]
+        for skill_id, (name, aliases) in enumerate(skills):
+            for phrase in [name, *aliases]:
+                tokens = skill_tokens(phrase)
+                if not tokens:
+                    continue
+                self.ids.setdefault(" ".join(tokens), skill_id)
+                state = 0
+                for token in tokens:
+                    if token not in self.transitions[state]:
+                        self.transitions[state][token] = len(self.transitions)
+                        self.transitions.append({})
+                        outputs.append([])
+                    state = self.transitions[state][token]
+                outputs[state].append(skill_id)
+
+        # Failure links, breadth first: the longest proper suffix of a state's
+        # phrase that is also a prefix of some skill
+        self.failures = [0] * len(self.transitions)
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self.transitions[state].items():
+                queue.append(child)
+                failure = self.failures[state]
+                while failure and token not in self.transitions[failure]:
+                    failure = self.failures[failure]
+                self.failures[child] = self.transitions[failure].get(token, 0)
+                outputs[child] = outputs[child] + outputs[self.failures[child]]
+        self.outputs = [tuple(dict.fromkeys(skill_ids)) for skill_ids in outputs]
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name: str) -> Optional[int]:
+        """
+        Returns the id of the skill with the given name or alias
+        (case-insensitive), or None.
+        """
+        return self.ids.get(" ".join(skill_tokens(name)))
+
+    def find(self, text) -> list[int]:
+        """
+        Returns the ids of the skills mentioned in text, in order of first
+        mention.
+        """
+        found = {}
+        state = 0
+        for token in skill_tokens(text):
+            while state and token not in self.transitions[state]:
+                state = self.failures[state]
+            state = self.transitions[state].get(token, 0)
+            for skill_id in self.outputs[state]:
+                found.setdefault(skill_id)
+        return list(found)
+
+
+class JobSkills:
+    """
+    The skills of every job, extracted once when the data is loaded.
+
+    skill_ids holds each job's skill ids in order of first mention, with
+    offsets marking where each job's ids start. The same pairs are also kept
+    grouped by skill, so filtering by a skill is a slice and facet counts are
+    a bincount.
+    """
+
+    def __init__(self, matcher: SkillMatcher, texts: pd.Series):
+        start = time.perf_counter()
+        self.matcher = matcher
+        per_job = [matcher.find(text) for text in texts]
+        lengths = np.array([len(skill_ids) for skill_ids in per_job], dtype=np.int64)
+        id_type = np.int16 if len(matcher) < 2 ** 15 else np.int32
+        self.skill_ids = np.fromiter((skill_id for skill_ids in per_job for skill_id in skill_ids),
+                                     dtype=id_type, count=int(lengths.sum()))
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self.job_rows = np.repeat(np.arange(len(per_job), dtype=np.int32), lengths)
+
+        self.counts = np.bincount(self.skill_ids, minlength=len(matcher)).astype(np.int32)
+        self.rows_by_skill = self.job_rows[np.argsort(self.skill_ids, kind="stable")]
+        self.skill_offsets = np.concatenate([[0], np.cumsum(self.counts)])
+        logger.info(f"Extracted {len(self.skill_ids)} mentions of {np.count_nonzero(self.counts)} skills "
+                    f"from {len(per_job)} jobs in {time.perf_counter() - start:.2f}s")
+
+    def names_of(self, row: int) -> list[str]:
+        """
+        Returns the names of a job's skills, in order of first mention.
+        """
+        return [self.matcher.names[skill_id] for skill_id in self.skill_ids[self.offsets[row]:self.offsets[row + 1]].tolist()]
+
+    def rows_with(self, skills: list[str]) -> np.ndarray:
+        """
+        Returns the sorted rows of jobs that mention every given skill (by name
+        or alias). Unknown skills match no jobs.
+        """
+        rows = None
+        for name in skills:
+            skill_id = self.matcher.lookup(name)
+            if skill_id is None:
+                return np.empty(0, dtype=np.int32)
+            skill_rows = self.rows_by_skill[self.skill_offsets[skill_id]:self.skill_offsets[skill_id + 1]]
+            rows = skill_rows if rows is None else np.intersect1d(rows, skill_rows, assume_unique=True)
+        return np.arange(len(self.offsets) - 1, dtype=np.int32) if rows is None else rows
+
+    def facets(self, rows: Optional[np.ndarray] = None, limit: int = 20) -> list[dict]:
+        """
+        Returns the most mentioned skills among the given job rows (or all
+        jobs) with their job counts, most common first.
+        """
+        if rows is None:
+            counts = self.counts
+        else:
+            selected = np.zeros(len(self.offsets) - 1, dtype=bool)
+            selected[rows] = True
+            counts = np.bincount(self.skill_ids[selected[self.job_rows]], minlength=len(self.matcher))
+        order = np.argsort(-counts, kind="stable")[:limit]
+        return [{"skill": self.matcher.names[skill_id], "count": int(counts[skill_id])}
+                for skill_id in order.tolist() if counts[skill_id] > 0]
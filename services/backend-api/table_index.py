@@ -0,0 +1,90 @@
+import logging
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _lowercase(value) -> Optional[str]:
+    return str(value).strip().lower() if pd.notna(value) else None
+
+
+class ColumnPostings:
+    """
+    Row ids of a table grouped by the normalized (by default lowercased) value
+    of one column.
+
+    Rows are stored sorted by value, with offsets marking where each distinct
+    value's rows start, so a lookup is a slice rather than a scan of the column.
+    """
+
+    def __init__(self, values: pd.Series, normalize: Callable[[object], Optional[str]] = _lowercase):
+        normalized = values.map(normalize)
+        codes, uniques = pd.factorize(normalized)
+        # Missing values get code -1 and no postings
+        present = np.flatnonzero(codes >= 0)
+        order = present[np.argsort(codes[present], kind="stable")]
+        self.values = list(uniques)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+        self.rows = order.astype(np.int32)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[present], minlength=len(uniques)))])
+
+    def rows_for_codes(self, codes: list[int]) -> np.ndarray:
+        """
+        Returns the sorted rows holding any of the given value codes.
+        """
+        if not codes:
+            return np.empty(0, dtype=np.int32)
+        return np.sort(np.concatenate([self.rows[self.offsets[code]:self.offsets[code + 1]] for code in codes]))
+
+    def equal(self, value: Optional[str]) -> np.ndarray:
+        """
+        Returns the rows, in table order, whose normalized value is value.
+        """
+        code = self.codes.get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return self.rows[self.offsets[code]:self.offsets[code + 1]]
+
+    def containing(self, substring: str) -> np.ndarray:
+        """
+        Returns the sorted rows whose value contains substring
+        (case-insensitive). Only the distinct values are scanned, not the rows.
+        """
+        substring = str(substring).lower()
+        return self.rows_for_codes([code for code, value in enumerate(self.values) if substring in value])
+
+
+class TableIndex:
+    """
+    Postings for the filterable columns of a table, built once when the data is
+    loaded. Filters combine as OR within a column and AND across columns, and
+    yield sorted row ids, so only the rows of the requested page are ever
+    materialized from the table.
+    """
+
+    def __init__(self, table: pd.DataFrame, columns: list[str]):
+        self.size = len(table)
+        self.columns = {column: ColumnPostings(table[column]) for column in columns if column in table.columns}
+        logger.info(f"Indexed {self.size} rows by {', '.join(self.columns) or 'no columns'}")
+
+    def filter(self, conditions: dict) -> np.ndarray:
+        """
+        Returns the sorted rows matching every condition, a mapping of column
+        to accepted values (a string or a list of them). Values match as
+        case-insensitive substrings of the column, like str.contains. Empty
+        conditions, and conditions on columns the table lacks, are ignored.
+        """
+        rows = None
+        for column, accepted in conditions.items():
+            if not accepted:
+                continue
+            accepted = [accepted] if isinstance(accepted, str) else accepted
+            postings = self.columns.get(column)
+            if postings is None:
+                continue
+            matched = np.unique(np.concatenate([postings.containing(value) for value in accepted]))
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        return np.arange(self.size, dtype=np.int32) if rows is None else rows
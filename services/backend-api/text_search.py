@@ -0,0 +1,256 @@
+import logging
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Keeps tech tokens such as "c++", "c#" and "3d" whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Suggestions verified per requested one before ranking; bounds the work of a
+# keystroke however common its trigrams are
+SUGGEST_CANDIDATES_PER_RESULT = 4
+
+
+def normalize(text) -> str:
+    """
+    Lowercases text and collapses whitespace ("" for missing values).
+    """
+    return " ".join(str(text).lower().split()) if pd.notna(text) else ""
+
+
+def tokenize(text) -> list[str]:
+    return TOKEN_PATTERN.findall(str(text).lower()) if pd.notna(text) else []
+
+
+def _sorted_member(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """
+    Returns a mask of which ids occur in sorted_ids.
+    """
+    positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return sorted_ids[positions] == ids
+
+
+class TrigramIndex:
+    """
+    Substring and prefix lookup over short strings such as company names and
+    job titles.
+
+    Each string is indexed by its character trigrams and by the one- and
+    two-character prefixes of its words, so queries of any length narrow down
+    to a few postings before the substring is verified. Strings are numbered in
+    descending weight, so postings list them best first and a lookup can stop
+    as soon as it has enough matches.
+    """
+
+    def __init__(self, texts: list, weights: Optional[np.ndarray] = None):
+        weights = np.zeros(len(texts)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.positions = np.argsort(-weights, kind="stable")
+        self.texts = [normalize(texts[position]) for position in self.positions]
+
+        postings = defaultdict(list)
+        for entry, text in enumerate(self.texts):
+            keys = {text[i:i + 3] for i in range(len(text) - 2)}
+            for word in text.split():
+                keys.update(("^" + word[:1], "^" + word[:2]))
+            for key in keys:
+                postings[key].append(entry)
+        self.postings = {key: np.array(entries, dtype=np.int32) for key, entries in postings.items()}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _candidates(self, query: str, chunk_size: int = 64):
+        """
+        Yields chunks of entries, best first, that hold every key of the query.
+        Chunks double in size, so a lookup that stops early reads little and
+        one that reads everything takes few steps.
+        """
+        keys = {query[i:i + 3] for i in range(len(query) - 2)} if len(query) >= 3 else {"^" + query}
+        lists = sorted((self.postings.get(key) for key in keys), key=lambda entries: -1 if entries is None else len(entries))
+        if lists[0] is None:
+            return
+        start = 0
+        while start < len(lists[0]):
+            chunk = lists[0][start:start + chunk_size]
+            for entries in lists[1:]:
+                chunk = chunk[_sorted_member(entries, chunk)]
+            yield chunk
+            start += chunk_size
+            chunk_size *= 2
+
+    def _matches(self, query: str, entry: int) -> bool:
+        # Short queries were looked up by word prefix, which is all they match
+        return len(query) < 3 or query in self.texts[entry]
+
+    def search(self, query: str) -> np.ndarray:
+        """
+        Returns the sorted positions of every string containing query
+        (case-insensitive; queries shorter than three characters match word
+        prefixes).
+        """
+        query = normalize(query)
+        if not query:
+            return np.arange(len(self), dtype=np.int64)
+        entries = [entry for chunk in self._candidates(query) for entry in chunk.tolist() if self._matches(query, entry)]
+        return np.sort(self.positions[entries])
+
+    def suggest(self, query: str, limit: int = 8) -> list[int]:
+        """
+        Returns the positions of up to limit strings containing query, ranked
+        by where it occurs (at the start, at a word start, elsewhere) and then
+        by weight.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        wanted = limit * SUGGEST_CANDIDATES_PER_RESULT
+        found = []
+        for chunk in self._candidates(query, wanted):
+            found.extend(entry for entry in chunk.tolist() if self._matches(query, entry))
+            if len(found) >= wanted:
+                del found[wanted:]
+                break
+        found.sort(key=lambda entry: (not self.texts[entry].startswith(query),
+                                      f" {query}" not in f" {self.texts[entry]}", entry))
+        return self.positions[found[:limit]].tolist()
+
+
+class TokenIndex:
+    """
+    Word postings over long text fields (descriptions, job texts), for ranked
+    search on whole words where the last query word may be a prefix, as it is
+    while typing.
+
+    Each (word, row) posting carries the summed weight of the fields the word
+    occurs in, and a row's score is the sum over query words.
+    """
+
+    def __init__(self, fields: list[tuple[pd.Series, float]]):
+        rows = max((len(values) for values, _ in fields), default=0)
+        tokens = [values.reset_index(drop=True).fillna("").astype(str).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+                  for values, _ in fields]
+        codes, terms = pd.factorize(pd.concat(tokens)) if tokens else (np.empty(0, dtype=np.int64), pd.Index([]))
+        # Renumber terms alphabetically so that a prefix covers a contiguous range of them
+        alphabetical = np.argsort(terms.to_numpy(dtype=str))
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[alphabetical] = np.arange(len(terms))
+
+        keys, weights, offset = [], [], 0
+        for field_tokens, (_, weight) in zip(tokens, fields):
+            field_keys = np.unique(rank[codes[offset:offset + len(field_tokens)]] * rows + field_tokens.index.to_numpy())
+            keys.append(field_keys)
+            weights.append(np.full(len(field_keys), weight, dtype=np.float32))
+            offset += len(field_tokens)
+        keys, inverse = np.unique(np.concatenate(keys or [np.empty(0, dtype=np.int64)]), return_inverse=True)
+
+        self.terms = terms.to_numpy(dtype=str)[alphabetical].tolist()
+        self.posting_rows = (keys % max(rows, 1)).astype(np.int32)
+        self.posting_weights = np.bincount(inverse, weights=np.concatenate(weights or [np.empty(0)])).astype(np.float32)
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(keys // max(rows, 1), minlength=len(self.terms)))])
+
+    def _term_postings(self, first: int, last: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the rows and weights of terms first..last-1, with the weights
+        of a row summed.
+        """
+        rows = self.posting_rows[self.offsets[first]:self.offsets[last]]
+        weights = self.posting_weights[self.offsets[first]:self.offsets[last]]
+        if last - first == 1:
+            return rows, weights
+        unique_rows, inverse = np.unique(rows, return_inverse=True)
+        return unique_rows, np.bincount(inverse, weights=weights).astype(np.float32)
+
+    def search(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (rows, scores) of the rows containing every query word (the
+        last as a prefix), best first.
+        """
+        words = tokenize(query)
+        if not words:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        rows, scores = None, None
+        for position, word in enumerate(words):
+            first = bisect_left(self.terms, word)
+            if position == len(words) - 1:
+                last = bisect_left(self.terms, word + "\uffff")
+            else:
+                last = first + 1 if first < len(self.terms) and self.terms[first] == word else first
+            if first == last:
+                return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+            word_rows, word_scores = self._term_postings(first, last)
+            if rows is None:
+                rows, scores = word_rows, word_scores
+            else:
+                rows, left, right = np.intersect1d(rows, word_rows, assume_unique=True, return_indices=True)
+                scores = scores[left] + word_scores[right]
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+
+class CatalogSearch:
+    """
+    The search indexes of the loaded CSV data, rebuilt with it: trigrams over
+    company names and distinct job titles, and word postings over company
+    descriptions and job texts.
+    """
+
+    def __init__(self, companies: pd.DataFrame, jobs: pd.DataFrame):
+        start = time.perf_counter()
+        empty = pd.Series([], dtype=object)
+        job_companies = jobs["company"] if "company" in jobs.columns else empty
+        jobs_per_company = job_companies.map(normalize).value_counts()
+
+        self.company_names = companies["Company"] if "Company" in companies.columns else pd.Series([""] * len(companies))
+        self.company_name_index = TrigramIndex(
+            self.company_names.tolist(),
+            self.company_names.map(normalize).map(jobs_per_company).fillna(0).to_numpy(),
+        )
+        self.company_text_index = TokenIndex(
+            [(companies["description"], 1.0)] if "description" in companies.columns else []
+        )
+
+        # Distinct titles, each shown in its most common spelling and weighted by its number of jobs
+        titles = (jobs["job_title"] if "job_title" in jobs.columns else empty).dropna().astype(str).str.strip()
+        title_groups = pd.DataFrame({"key": titles.map(normalize), "title": titles}).groupby("key")["title"]
+        title_counts = title_groups.size()
+        self.job_titles = title_groups.agg(lambda spellings: spellings.value_counts().index[0]).loc[title_counts.index].tolist()
+        self.job_title_index = TrigramIndex(self.job_titles, title_counts.to_numpy())
+        self.job_text_index = TokenIndex(
+            [(jobs[column], weight) for column, weight in (("job_title", 3.0), ("job_text", 1.0)) if column in jobs.columns]
+        )
+        logger.info(f"Indexed {len(companies)} companies and {len(jobs)} jobs for search "
+                    f"in {time.perf_counter() - start:.2f}s")
+
+    def companies(self, query: str) -> np.ndarray:
+        """
+        Returns the sorted rows of companies whose name contains query or whose
+        description contains its words (the last as a prefix).
+        """
+        by_name = self.company_name_index.search(query)
+        by_description, _ = self.company_text_index.search(query)
+        return np.union1d(by_name, by_description)
+
+    def jobs(self, query: str) -> np.ndarray:
+        """
+        Returns the rows of jobs containing every query word (the last as a
+        prefix), ranked with title matches above matches in the job text.
+        """
+        rows, _ = self.job_text_index.search(query)
+        return rows
+
+    def suggest(self, query: str, limit: int = 8) -> dict:
+        """
+        Returns up to limit company names and job titles containing query, for
+        typeahead.
+        """
+        return {
+            "companies": [self.company_names.iat[position] for position in self.company_name_index.suggest(query, limit)],
+            "job_titles": [self.job_titles[position] for position in self.job_title_index.suggest(query, limit)],
+        }
@@ -0,0 +1,354 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+from vector_store import Float32Store
+
+logger = logging.getLogger(__name__)
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Returns the indices of the top_k highest scores along the last axis, best
+    first. Uses a partial partition instead of sorting every score.
+    """
+    n = scores.shape[-1]
+    top_k = min(top_k, n)
+    if top_k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if top_k < n:
+        candidates = np.argpartition(-scores, top_k - 1, axis=-1)[..., :top_k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+def _collect(store, queries: np.ndarray, candidates: list, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lets the store refine each query's best-first (ids, scores) candidates and
+    packs them into (n_queries, top_k) arrays, padded with id -1 and score -inf
+    when fewer than top_k candidates exist.
+    """
+    ids = np.full((len(candidates), top_k), -1, dtype=np.int64)
+    scores = np.full((len(candidates), top_k), -np.inf, dtype=np.float32)
+    for row, (query, (candidate_ids, candidate_scores)) in enumerate(zip(queries, candidates)):
+        row_ids, row_scores = store.refine(query, candidate_ids, candidate_scores, top_k)
+        ids[row, :len(row_ids)] = row_ids
+        scores[row, :len(row_scores)] = row_scores
+    return ids, scores
+
+
+class ExactIndex:
+    """
+    Brute-force inner-product search over the full embedding store.
+
+    The corpus is scanned in blocks of block_rows and the running top
+    candidates are merged after each block, so a large batch of queries never
+    materializes a full queries x corpus score matrix.
+    """
+    kind = "exact"
+
+    def __init__(self, store, block_rows: int = 65_536):
+        self.store = store
+        self.block_rows = block_rows
+
+    def __len__(self):
+        return len(self.store)
+
+    def search(self, queries: np.ndarray, top_k: int,
+               allowed: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (ids, scores) arrays of shape (n_queries, top_k), padded with id
+        -1 and score -inf when fewer than top_k jobs qualify.
+
+        allowed is an optional boolean mask over the corpus; only those rows can
+        be returned. Small allowed sets are scored directly, larger ones are
+        masked block by block during the scan.
+        """
+        queries = np.atleast_2d(queries)
+        n_candidates = self.store.candidate_count(top_k)
+
+        if allowed is not None:
+            rows = np.flatnonzero(allowed)
+            if len(rows) <= self.block_rows:
+                return self.search_rows(queries, rows, top_k)
+
+        best_ids = np.empty((queries.shape[0], 0), dtype=np.int64)
+        best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+        for start in range(0, len(self.store), self.block_rows):
+            stop = min(start + self.block_rows, len(self.store))
+            block_scores = self.store.scores(queries, slice(start, stop))
+            if allowed is not None:
+                block_scores[:, ~allowed[start:stop]] = -np.inf
+            block_best = top_k_indices(block_scores, n_candidates)
+
+            merged_ids = np.concatenate([best_ids, block_best + start], axis=1)
+            merged_scores = np.concatenate([best_scores, np.take_along_axis(block_scores, block_best, axis=-1)], axis=1)
+            keep = top_k_indices(merged_scores, n_candidates)
+            best_ids = np.take_along_axis(merged_ids, keep, axis=-1)
+            best_scores = np.take_along_axis(merged_scores, keep, axis=-1)
+
+        # Masked-out rows only surface when fewer than top_k rows qualify
+        best_ids[np.isneginf(best_scores)] = -1
+        return _collect(self.store, queries, list(zip(best_ids, best_scores)), top_k)
+
+    def search_rows(self, queries: np.ndarray, rows: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Like search, but scores only the given rows (ascending row ids), for
+        candidate sets small enough to gather directly.
+        """
+        queries = np.atleast_2d(queries)
+        row_scores = self.store.scores(queries, rows)
+        best = top_k_indices(row_scores, self.store.candidate_count(top_k))
+        best_scores = np.take_along_axis(row_scores, best, axis=-1)
+        return _collect(self.store, queries, list(zip(rows[best], best_scores)), top_k)
+
+
+def _assign(embeddings: np.ndarray, centroids: np.ndarray, block_rows: int = 65_536) -> np.ndarray:
+    """
+    Returns the id of the nearest centroid for every vector.
+    """
+    assignment = np.empty(embeddings.shape[0], dtype=np.int64)
+    for start in range(0, embeddings.shape[0], block_rows):
+        block = np.asarray(embeddings[start:start + block_rows], dtype=np.float32)
+        assignment[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+class IVFIndex:
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid
+    and a query only scans the n_probe buckets whose centroids score highest.
+
+    n_probe is the recall/latency knob: probing every list is exact search,
+    probing fewer lists trades recall for speed.
+    """
+    kind = "ivf"
+
+    def __init__(self, store, centroids: np.ndarray, list_order: np.ndarray,
+                 list_offsets: np.ndarray, n_probe: int = 16):
+        self.store = store
+        self.centroids = centroids
+        self.list_order = list_order
+        self.list_offsets = list_offsets
+        self.n_probe = n_probe
+
+    def __len__(self):
+        return len(self.store)
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, store, n_lists: Optional[int] = None, n_probe: int = 16,
+              n_iter: int = 10, sample_size: int = 50_000, seed: int = 0) -> "IVFIndex":
+        """
+        Trains spherical k-means centroids on a sample of the float32 corpus and
+        assigns every vector to its nearest centroid. Searches score against
+        the given store.
+        """
+        n = embeddings.shape[0]
+        n_lists = n_lists or max(1, int(4 * np.sqrt(n)))
+        n_lists = min(n_lists, n)
+        rng = np.random.default_rng(seed)
+
+        sample_ids = rng.choice(n, size=min(n, max(sample_size, n_lists)), replace=False)
+        sample = np.asarray(embeddings[np.sort(sample_ids)], dtype=np.float32)
+        centroids = sample[rng.choice(sample.shape[0], size=n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            non_empty = norms[:, 0] > 0
+            centroids[non_empty] = sums[non_empty] / norms[non_empty]
+
+        logger.info(f"Built IVF index with {n_lists} lists over {n} vectors")
+        return cls.from_assignment(store, centroids, _assign(embeddings, centroids), n_probe=n_probe)
+
+    @classmethod
+    def from_assignment(cls, store, centroids: np.ndarray, assignment: np.ndarray, n_probe: int = 16) -> "IVFIndex":
+        """
+        Builds the inverted lists from each vector's centroid id.
+        """
+        list_order = np.argsort(assignment, kind="stable")
+        list_offsets = np.zeros(centroids.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=centroids.shape[0]), out=list_offsets[1:])
+        return cls(store, centroids, list_order, list_offsets, n_probe=n_probe)
+
+    def assignment(self) -> np.ndarray:
+        """
+        Returns the centroid id of every vector.
+        """
+        assignment = np.empty(len(self.list_order), dtype=np.int64)
+        assignment[self.list_order] = np.repeat(np.arange(self.n_lists), np.diff(self.list_offsets))
+        return assignment
+
+    def refreshed(self, embeddings: np.ndarray, store, source_rows: np.ndarray) -> "IVFIndex":
+        """
+        Returns an index over a changed corpus without retraining centroids.
+
+        source_rows maps each new row to the row it was copied from in this
+        index, or -1 for new vectors, which are assigned to their nearest
+        existing centroid.
+        """
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        reused = source_rows >= 0
+        assignment = np.empty(len(source_rows), dtype=np.int64)
+        assignment[reused] = self.assignment()[source_rows[reused]]
+        new_rows = np.flatnonzero(~reused)
+        if len(new_rows):
+            assignment[new_rows] = _assign(embeddings[new_rows], self.centroids)
+        return IVFIndex.from_assignment(store, self.centroids, assignment, n_probe=self.n_probe)
+
+    def search(self, queries: np.ndarray, top_k: int,
+               allowed: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (ids, scores) arrays of shape (n_queries, top_k), padded with id
+        -1 and score -inf when fewer than top_k jobs qualify.
+
+        allowed is an optional boolean mask over the corpus. Rows outside it
+        are skipped while scanning the probed lists; selective filters, or
+        queries whose probed lists hold fewer than top_k allowed jobs, fall
+        back to exact search over the allowed rows so results are not lost.
+        """
+        queries = np.atleast_2d(queries)
+        exact = ExactIndex(self.store)
+        if allowed is not None and np.count_nonzero(allowed) <= exact.block_rows:
+            return exact.search(queries, top_k, allowed)
+
+        n_probe = min(self.n_probe, self.n_lists)
+        probes = top_k_indices(queries @ self.centroids.T, n_probe)
+
+        candidates = []
+        for query, lists in zip(queries, probes):
+            rows = np.sort(np.concatenate([
+                self.list_order[self.list_offsets[l]:self.list_offsets[l + 1]] for l in lists
+            ]))
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+            if allowed is not None and len(rows) < top_k:
+                ids, scores = exact.search(query, top_k, allowed)
+                candidates.append((ids[0], scores[0]))
+                continue
+            row_scores = self.store.scores(query, rows)[0]
+            best = top_k_indices(row_scores, self.store.candidate_count(top_k))
+            candidates.append((rows[best], row_scores[best]))
+        return _collect(self.store, queries, candidates, top_k)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """
+        Returns the trained structures, for persisting next to the embeddings.
+        """
+        return {
+            "ivf_centroids": self.centroids,
+            "ivf_list_order": self.list_order,
+            "ivf_list_offsets": self.list_offsets,
+        }
+
+
+def build_index(embeddings: np.ndarray, store=None, kind: str = "ivf", n_probe: int = 16, n_lists: Optional[int] = None,
+                min_corpus_size: int = 20_000, cache=None):
+    """
+    Builds the search index for a corpus. Falls back to exact search when
+    requested, or when the corpus is too small for an ANN index to pay off.
+
+    The index scores against store (float32 embeddings when omitted); IVF
+    training always uses the float32 embeddings.
+
+    If an EmbeddingCache is passed, trained IVF structures are loaded from and
+    saved next to the embedding artifact.
+    """
+    if store is None:
+        store = Float32Store(embeddings)
+    if kind == "exact" or embeddings.shape[0] < min_corpus_size:
+        logger.info(f"Using exact search over {embeddings.shape[0]} jobs")
+        return ExactIndex(store)
+    if kind != "ivf":
+        raise ValueError(f"Unknown ANN index type: {kind}")
+
+    suffix = f"{n_lists or 'auto'}"
+    if cache is not None:
+        arrays = {name: cache.load_array(f"{name}_{suffix}") for name in ("ivf_centroids", "ivf_list_order", "ivf_list_offsets")}
+        if all(a is not None for a in arrays.values()) and arrays["ivf_list_order"].shape[0] == embeddings.shape[0]:
+            logger.info(f"Loaded IVF index with {arrays['ivf_centroids'].shape[0]} lists from cache")
+            return IVFIndex(store, arrays["ivf_centroids"], arrays["ivf_list_order"],
+                            arrays["ivf_list_offsets"], n_probe=n_probe)
+
+    index = IVFIndex.build(embeddings, store, n_lists=n_lists, n_probe=n_probe)
+    if cache is not None:
+        for name, array in index.arrays().items():
+            cache.save_array(f"{name}_{suffix}", array)
+    return index
+
+
+def refresh_index(index, embeddings: np.ndarray, store, source_rows: np.ndarray, kind: str = "ivf",
+                  n_probe: int = 16, n_lists: Optional[int] = None, min_corpus_size: int = 20_000):
+    """
+    Returns an index for a changed corpus, reusing the trained IVF centroids
+    of the previous index when there is one.
+    """
+    if isinstance(index, IVFIndex) and kind == "ivf" and embeddings.shape[0] >= min_corpus_size:
+        return index.refreshed(embeddings, store, source_rows)
+    return build_index(embeddings, store=store, kind=kind, n_probe=n_probe, n_lists=n_lists,
+                       min_corpus_size=min_corpus_size)
+
+
+def recall_report(index, embeddings: np.ndarray, queries: np.ndarray, top_k: int = 5) -> dict:
+    """
+    Measures recall@k and mean per-query latency of an index against brute force.
+    """
+    exact = ExactIndex(Float32Store(embeddings))
+
+    start = time.perf_counter()
+    exact_ids = [exact.search(q, top_k)[0][0] for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    approx_ids = [index.search(q, top_k)[0][0] for q in queries]
+    approx_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    hits = sum(len(np.intersect1d(e, a)) for e, a in zip(exact_ids, approx_ids))
+    return {
+        "index": index.kind,
+        "n_probe": getattr(index, "n_probe", None),
+        "top_k": top_k,
+        "queries": len(queries),
+        "recall_at_k": round(hits / (top_k * len(queries)), 4),
+        "exact_ms_per_query": round(exact_ms, 3),
+        "index_ms_per_query": round(approx_ms, 3),
+    }
+
+
+def sample_queries(embeddings: np.ndarray, n: int, noise: float = 0.05, seed: int = 0) -> np.ndarray:
+    """
+    Draws perturbed corpus vectors to stand in for real resume queries.
+    """
+    rng = np.random.default_rng(seed)
+    queries = np.asarray(embeddings[rng.choice(embeddings.shape[0], size=n, replace=False)], dtype=np.float32)
+    queries = queries + rng.normal(scale=noise, size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report IVF recall@k against brute force for a cached embedding artifact.")
+    parser.add_argument("embeddings", help="Path to an embeddings.npy artifact")
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = np.load(args.embeddings, mmap_mode="r")
+    index = IVFIndex.build(corpus, Float32Store(corpus), n_lists=args.n_lists)
+    query_sample = sample_queries(corpus, min(args.queries, corpus.shape[0]))
+    for probe in args.n_probe:
+        index.n_probe = probe
+        print(recall_report(index, corpus, query_sample, top_k=args.top_k))
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from metrics import BATCH_SIZE, QUEUE_DEPTH, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Groups concurrent match requests into batches and runs them off the event
+    loop.
+
+    Requests queue up while the encoder is busy. When it frees up, the worker
+    takes everything already queued, waits at most max_wait_ms for stragglers
+    (never beyond max_batch_size), and hands the whole batch to handler in a
+    single call on a dedicated thread.
+    """
+
+    def __init__(self, handler: Callable[[list[str], list[int], list[Optional[dict]]], list],
+                 max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # One thread: batches run back to back and the encoder uses its own intra-op threads
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-batch")
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(f"Micro-batching enabled (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait * 1000:g})")
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, resume_text: str, top_k: int, filters: Optional[dict] = None):
+        """
+        Queues one resume and waits for its matches.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((resume_text, top_k, filters, time.perf_counter(), future))
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return await future
+
+    async def _collect(self) -> list[tuple]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            QUEUE_DEPTH.set(self._queue.qsize())
+            # Skip requests whose callers already gave up
+            batch = [item for item in batch if not item[-1].done()]
+            if not batch:
+                continue
+
+            texts, top_ks, filters, queued_at, futures = (list(column) for column in zip(*batch))
+            started = time.perf_counter()
+            queue_wait = STAGE_SECONDS.labels("queue_wait")
+            for enqueued in queued_at:
+                queue_wait.observe(started - enqueued)
+            BATCH_SIZE.observe(len(batch))
+            try:
+                with STAGE_SECONDS.labels("batch").time():
+                    results = await loop.run_in_executor(self._executor, self.handler, texts, top_ks, filters)
+            except Exception as e:
+                logger.error(f"Error processing batch of {len(batch)} match requests: {e}")
+                if len(batch) == 1:
+                    if not futures[0].done():
+                        futures[0].set_exception(e)
+                    continue
+                # Retry each request on its own so one bad request cannot fail its neighbours
+                results = [None if item[-1].done() else await self._run_one(loop, *item[:3]) for item in batch]
+
+            for future, result in zip(futures, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _run_one(self, loop, resume_text: str, top_k: int, filters: Optional[dict]):
+        """
+        Runs a single request through the handler, returning its result or the
+        exception it raised.
+        """
+        try:
+            results = await loop.run_in_executor(self._executor, self.handler, [resume_text], [top_k], [filters])
+            return results[0]
+        except Exception as e:
+            return e
@@ -0,0 +1,66 @@
+import argparse
+import json
+
+# Metric paths compared between runs; lower is better for all of them
+METRICS = [
+    ("startup_seconds",),
+    ("query_latency", "end_to_end", "p50_ms"),
+    ("query_latency", "end_to_end", "p95_ms"),
+    ("query_latency", "search", "p50_ms"),
+    ("query_latency", "format_json", "p50_ms"),
+    ("peak_rss_mb",),
+]
+
+
+def lookup(result: dict, path: tuple):
+    for key in path:
+        result = result.get(key) if isinstance(result, dict) else None
+    return result
+
+
+def compare(baseline: dict, candidate: dict, threshold: float = 0.10) -> list[dict]:
+    """
+    Pairs results by corpus size and reports the relative change of each
+    metric, flagging changes worse than threshold as regressions.
+    """
+    baseline_rows = {result["rows"]: result for result in baseline["results"]}
+    rows = []
+    for result in candidate["results"]:
+        before = baseline_rows.get(result["rows"])
+        if before is None:
+            continue
+        for path in METRICS:
+            old, new = lookup(before, path), lookup(result, path)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            rows.append({
+                "rows": result["rows"],
+                "metric": ".".join(path),
+                "baseline": old,
+                "candidate": new,
+                "change": round(change, 4),
+                "regression": change > threshold,
+            })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two run_benchmarks.py result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')}")
+    changes = compare(baseline, candidate, args.threshold)
+    for change in changes:
+        flag = "REGRESSION" if change["regression"] else ""
+        print(f"{change['rows']:>9} {change['metric']:<38} {change['baseline']:>10} -> {change['candidate']:>10} "
+              f"{change['change']:+.1%} {flag}")
+    raise SystemExit(1 if any(change["regression"] for change in changes) else 0)
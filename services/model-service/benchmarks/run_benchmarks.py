@@ -0,0 +1,223 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_data import generate_jobs, write_dataset  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+
+
+def percentiles(samples: list[float]) -> dict:
+    """
+    Summarizes per-call timings in milliseconds.
+    """
+    values = np.asarray(samples) * 1000
+    return {
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def peak_rss_mb() -> float:
+    # Linux keeps ru_maxrss across exec, so a spawned child would report its
+    # parent's peak; VmHWM belongs to this process's own address space.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 2**10, 1)
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def run_scale(dataset_path: str, rows: int, args: dict) -> dict:
+    """
+    Loads a JobMatcher over one dataset and measures it. Runs in a fresh
+    process so peak RSS belongs to this scale alone.
+    """
+    from keyword_index import hybrid_report, hybrid_search
+    from model import JobMatcher
+    from stand_in_encoder import HashingEncoder
+
+    logging.basicConfig(level=logging.WARNING)
+    encoder = HashingEncoder(args["dim"]) if args["encoder"] == "stand-in" else None
+    model_path = args["model_path"] or dataset_path
+    cache_dir = tempfile.mkdtemp(prefix="bench-cache-", dir=args["work_dir"])
+
+    try:
+        matcher, startup_seconds = timed(
+            JobMatcher, model_path, dataset_path, cache_dir=cache_dir, encoder=encoder,
+            index_type=args["index_type"], store_type=args["store_type"], n_probe=args["n_probe"],
+            retrieval_mode=args["retrieval_mode"], hybrid_candidates=args["hybrid_candidates"],
+            near_duplicate_threshold=args["near_duplicate_threshold"], encode_workers=args["encode_workers"],
+            query_cache_size=0
+        )
+        rss_after_load = peak_rss_mb()
+        matcher.warm_up()
+        matcher.load_status.finish()
+        phase_seconds = matcher.load_status.snapshot()["phase_seconds"]
+        snapshot = matcher.snapshot
+
+        # Resume-like queries that are not in the corpus
+        queries = generate_jobs(args["queries"], seed=10_000 + rows, text_words=200)["job_text"].tolist()
+        top_k = args["top_k"]
+
+        end_to_end, encode, search, format_json, format_records = [], [], [], [], []
+        for query in queries:
+            end_to_end.append(timed(matcher.match_batch_json, [query], [top_k], use_cache=False)[1])
+            embedding, seconds = timed(matcher.encode_queries, [query])
+            encode.append(seconds)
+            if snapshot.keywords is not None:
+                (ids, scores), seconds = timed(hybrid_search, snapshot.keywords, snapshot.index, snapshot.store,
+                                               query, embedding, top_k, args["hybrid_candidates"])
+            else:
+                (ids, scores), seconds = timed(snapshot.index.search, embedding, top_k)
+            search.append(seconds)
+            found = ids[0] >= 0
+            format_json.append(timed(snapshot.formatter.json_array, ids[0][found], scores[0][found])[1])
+            format_records.append(timed(snapshot.formatter.records, ids[0][found], scores[0][found])[1])
+
+        batch_size = args["batch_size"]
+        batches = [queries[i:i + batch_size] for i in range(0, len(queries) - batch_size + 1, batch_size)]
+        batch_seconds = sum(timed(matcher.match_batch_json, batch, [top_k] * len(batch), use_cache=False)[1]
+                            for batch in batches)
+
+        # Hybrid retrieval is checked against exhaustive dense search over the same queries
+        hybrid = None
+        if snapshot.keywords is not None:
+            hybrid = hybrid_report(snapshot.keywords, snapshot.index, snapshot.store, queries,
+                                   matcher.encode_queries(queries), top_k, args["hybrid_candidates"])
+
+        return {
+            "rows": rows,
+            "jobs": len(snapshot),
+            "index": type(snapshot.index).__name__,
+            "store": snapshot.store.kind,
+            "retrieval_mode": args["retrieval_mode"],
+            "encode_workers": matcher.corpus_encoder.workers,
+            "startup_seconds": round(startup_seconds, 3),
+            "peak_rss_after_load_mb": rss_after_load,
+            "phase_seconds": phase_seconds,
+            "corpus": matcher.corpus_report,
+            "encode_jobs_per_second": round(len(snapshot) / max(phase_seconds.get("embeddings", 0), 1e-9), 1),
+            "embeddings_mb": round(snapshot.embeddings.nbytes / 2**20, 1),
+            "store_resident_mb": round(snapshot.store.nbytes / 2**20, 1),
+            "result_fragments_mb": round(snapshot.formatter.blob.nbytes / 2**20, 1),
+            "query_latency": {
+                "end_to_end": percentiles(end_to_end),
+                "encode": percentiles(encode),
+                "search": percentiles(search),
+                "format_json": percentiles(format_json),
+                "format_records": percentiles(format_records),
+            },
+            "hybrid": hybrid,
+            "batch_queries_per_second": round(len(batches) * batch_size / batch_seconds, 1) if batches else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVICE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JobMatcher startup, query latency and memory at synthetic corpus scales.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--encoder", choices=["stand-in", "model"], default="stand-in",
+                        help="stand-in: offline hashing encoder; model: the SentenceTransformer at --model-path")
+    parser.add_argument("--model-path", default=os.environ.get("MODEL_PATH"))
+    parser.add_argument("--dim", type=int, default=768, help="Embedding width of the stand-in encoder")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--index-type", default="ivf")
+    parser.add_argument("--n-probe", type=int, default=16)
+    parser.add_argument("--store-type", default="float32")
+    parser.add_argument("--retrieval-mode", choices=["dense", "hybrid"], default="dense")
+    parser.add_argument("--hybrid-candidates", type=int, default=2000)
+    parser.add_argument("--near-duplicate-threshold", type=float, default=0.9)
+    parser.add_argument("--encode-workers", type=int, default=1, help="Corpus encoding processes (0 = one per core)")
+    parser.add_argument("--work-dir", default=str(SERVICE_DIR / "benchmarks" / "data"),
+                        help="Where synthetic datasets are generated (and reused)")
+    parser.add_argument("--output", default=None, help="Results JSON path (default: benchmarks/results/<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.encoder == "model" and not args.model_path:
+        parser.error("--encoder model needs --model-path or MODEL_PATH")
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    options = {**vars(args), "work_dir": str(work_dir)}
+
+    results = []
+    for rows in args.rows:
+        dataset_path = work_dir / f"job_vacancy_{rows}.csv"
+        if not dataset_path.exists():
+            write_dataset(rows, str(dataset_path))
+
+        logger.info(f"Benchmarking {rows} rows...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(run_scale, str(dataset_path), rows, options).result()
+        logger.info(
+            f"{rows} rows: startup {result['startup_seconds']}s, p50 {result['query_latency']['end_to_end']['p50_ms']}ms, "
+            f"p95 {result['query_latency']['end_to_end']['p95_ms']}ms, peak RSS {result['peak_rss_mb']} MB"
+        )
+        results.append(result)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": {key: value for key, value in vars(args).items() if key not in ("output", "work_dir")},
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else (
+        SERVICE_DIR / "benchmarks" / "results" / f"{commit}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    logger.info(f"Wrote results to {output}")
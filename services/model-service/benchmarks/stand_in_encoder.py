@@ -0,0 +1,35 @@
+import zlib
+
+import numpy as np
+
+
+class HashingEncoder:
+    """
+    Offline stand-in for the SentenceTransformer: a signed feature-hashing
+    bag of words. It is far cheaper than the real model, so benchmarks using
+    it measure everything around encoding (loading, indexing, search,
+    formatting, memory) at the real embedding width.
+    """
+
+    def __init__(self, dim: int = 768):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else sentences
+
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.array([zlib.crc32(token.encode()) for token in str(text).lower().split()], dtype=np.int64)
+            if len(hashes):
+                np.add.at(embeddings[row], hashes % self.dim, np.where(hashes & (1 << 20), 1.0, -1.0))
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings /= norms
+        return embeddings[0] if single else embeddings
@@ -0,0 +1,79 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Same columns as job_vacancy.csv
+COLUMNS = [
+    "job_text", "job_id", "job_title", "company", "location",
+    "category", "subcategory", "role", "type", "salary", "listingDate"
+]
+
+_WORDS = (
+    "python java javascript typescript sql data engineer developer manager sales marketing finance account "
+    "audit nurse teacher cloud aws azure docker kubernetes react design senior junior lead analyst support "
+    "customer service retail driver warehouse logistics operations hr recruitment legal admin executive "
+    "project product quality safety electrical mechanical civil chemical research science banking insurance"
+).split()
+_LOCATIONS = ["Kuala Lumpur", "Selangor", "Penang", "Johor", "Sabah", "Sarawak", "Perak", "Melaka", "Negeri Sembilan"]
+_CATEGORIES = [
+    "Information & Communication Technology", "Accounting", "Sales", "Healthcare & Medical", "Retail & Consumer Products",
+    "Manufacturing, Transport & Logistics", "Engineering", "Banking & Financial Services", "Education & Training",
+]
+_TYPES = ["Full time", "Part time", "Contract/Temp", "Casual/Vacation"]
+
+
+def generate_jobs(rows: int, seed: int = 0, start_id: int = 0, text_words: int = 120) -> pd.DataFrame:
+    """
+    Generates a job table with realistic column types and value spreads.
+    Job texts are random word sequences, so every row is unique.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array(_WORDS)
+    text_tokens = words[rng.integers(0, len(words), size=(rows, text_words))]
+    title_tokens = words[rng.integers(0, len(words), size=(rows, 2))]
+
+    salary_low = rng.integers(20, 150, size=rows) * 100
+    salaries = np.array([f"RM {low:,} – RM {low + 1500:,} per month" for low in salary_low.tolist()], dtype=object)
+    salaries[rng.random(rows) < 0.3] = None
+
+    listing_dates = np.datetime64("2024-01-01") + rng.integers(0, 365, size=rows).astype("timedelta64[D]")
+
+    return pd.DataFrame({
+        "job_text": [" ".join(tokens) for tokens in text_tokens.tolist()],
+        "job_id": np.arange(start_id, start_id + rows),
+        "job_title": [" ".join(tokens).title() for tokens in title_tokens.tolist()],
+        "company": [f"Company {i}" for i in rng.integers(0, max(rows // 20, 1), size=rows).tolist()],
+        "location": np.array(_LOCATIONS)[rng.integers(0, len(_LOCATIONS), size=rows)],
+        "category": np.array(_CATEGORIES)[rng.integers(0, len(_CATEGORIES), size=rows)],
+        "subcategory": [f"Subcategory {i}" for i in rng.integers(0, 60, size=rows).tolist()],
+        "role": words[rng.integers(0, len(words), size=rows)],
+        "type": np.array(_TYPES)[rng.integers(0, len(_TYPES), size=rows)],
+        "salary": salaries,
+        "listingDate": np.datetime_as_string(listing_dates) + "T00:00:00.000Z",
+    }, columns=COLUMNS)
+
+
+def write_dataset(rows: int, path: str, seed: int = 0, chunk_rows: int = 100_000):
+    """
+    Writes a synthetic job_vacancy.csv of the given size, chunk by chunk so 1M
+    rows do not need to be held in memory at once.
+    """
+    for chunk, start in enumerate(range(0, rows, chunk_rows)):
+        frame = generate_jobs(min(chunk_rows, rows - start), seed=seed + chunk, start_id=start)
+        frame.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    logger.info(f"Wrote {rows} synthetic jobs to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic job_vacancy.csv.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    write_dataset(args.rows, args.path, seed=args.seed)
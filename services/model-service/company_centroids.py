@@ -0,0 +1,128 @@
+import logging
+import re
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ARRAY_NAMES = ("names", "centroids", "job_counts")
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def company_key(name) -> Optional[str]:
+    """
+    Normalizes a company name for grouping and lookups: lowercased, with
+    punctuation and repeated whitespace dropped ("Acme Sdn. Bhd." and
+    "ACME SDN BHD" share a key). None for missing names.
+    """
+    if not isinstance(name, str):
+        return None
+    return " ".join(_WORD_PATTERN.findall(name.lower())) or None
+
+
+class CompanyCentroids:
+    """
+    One vector per company: the normalized mean embedding of its jobs, so a
+    resume is scored against every company with a single matrix product.
+
+    names holds each company's most common spelling among its jobs, in the
+    order of the centroid rows.
+    """
+
+    def __init__(self, names: np.ndarray, centroids: np.ndarray, job_counts: np.ndarray):
+        self.names = names
+        self.centroids = centroids
+        self.job_counts = job_counts
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.names.nbytes + self.centroids.nbytes + self.job_counts.nbytes)
+
+    @classmethod
+    def build(cls, companies: pd.Series, embeddings: np.ndarray, block_rows: int = 65_536) -> "CompanyCentroids":
+        """
+        Averages the embeddings of each company's jobs, reading them in blocks
+        of block_rows so memory-mapped embeddings are never loaded at once.
+        """
+        start = time.perf_counter()
+        keys = companies.map(company_key)
+        labels, unique_keys = pd.factorize(keys)
+        # Jobs without a company get label -1 and are left out
+        names = (pd.DataFrame({"label": labels, "name": companies.astype(str).str.strip()})[labels >= 0]
+                 .groupby("label")["name"].agg(lambda spellings: spellings.value_counts().index[0]))
+
+        sums = np.zeros((len(unique_keys), embeddings.shape[1]), dtype=np.float64)
+        for block_start in range(0, embeddings.shape[0], block_rows):
+            block_labels = labels[block_start:block_start + block_rows]
+            block = np.asarray(embeddings[block_start:block_start + block_rows], dtype=np.float32)[block_labels >= 0]
+            block_labels = block_labels[block_labels >= 0]
+            order = np.argsort(block_labels, kind="stable")
+            block_labels = block_labels[order]
+            if not len(block_labels):
+                continue
+            run_starts = np.flatnonzero(np.r_[True, block_labels[1:] != block_labels[:-1]])
+            sums[block_labels[run_starts]] += np.add.reduceat(block[order], run_starts, axis=0)
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.maximum(norms, 1e-12)).astype(np.float32)
+        job_counts = np.bincount(labels[labels >= 0], minlength=len(unique_keys)).astype(np.int32)
+        logger.info(f"Built centroids for {len(unique_keys)} companies in {time.perf_counter() - start:.2f}s")
+        return cls(names.to_numpy(dtype=str), centroids, job_counts)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """
+        Returns the centroid arrays, for persisting next to the embeddings.
+        """
+        return {"names": self.names, "centroids": self.centroids, "job_counts": self.job_counts}
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Returns the cosine similarity of each (normalized) query to every
+        company, shape (n_queries, n_companies).
+        """
+        return np.atleast_2d(queries).astype(np.float32, copy=False) @ self.centroids.T
+
+    def ranking(self, query: np.ndarray, top_k: Optional[int] = None) -> list[dict]:
+        """
+        Returns companies ranked by similarity to one query, best first (the
+        top_k best, or all of them).
+        """
+        scores = self.scores(query)[0]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [
+            {"company": name, "score": round(score, 4), "job_count": count}
+            for name, score, count in zip(self.names[order].tolist(), scores[order].astype(np.float64).tolist(),
+                                          self.job_counts[order].tolist())
+        ]
+
+
+def build_company_centroids(companies: pd.Series, embeddings: np.ndarray, cache=None) -> CompanyCentroids:
+    """
+    Builds company centroids for a corpus. If an EmbeddingCache is passed,
+    they are saved next to the embedding artifact and memory-mapped back.
+    """
+    centroids = CompanyCentroids.build(companies, embeddings)
+    if cache is None:
+        return centroids
+    for name, array in centroids.arrays().items():
+        cache.save_array(f"company_{name}", array)
+    return load_company_centroids(cache, embeddings.shape[1]) or centroids
+
+
+def load_company_centroids(cache, dim: int) -> Optional[CompanyCentroids]:
+    """
+    Maps company centroids of width dim from the artifact cache, if there are
+    any.
+    """
+    arrays = {name: cache.load_array(f"company_{name}") for name in ARRAY_NAMES}
+    if any(array is None for array in arrays.values()) or arrays["centroids"].shape[1:] != (dim,):
+        return None
+    logger.info(f"Loaded centroids for {len(arrays['names'])} companies from cache")
+    return CompanyCentroids(**arrays)
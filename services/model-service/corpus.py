@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from company_centroids import CompanyCentroids
+from filters import FilterIndex
+from keyword_index import KeywordIndex
+from near_duplicates import ALIAS_COLUMN
+from results import ResultFormatter, clean_column, clean_list_column
+from similar_jobs import SimilarJobsGraph
+
+# Columns kept from the dataset for every job
+JOB_COLUMNS = [
+    "job_text", "job_id", "job_title", "company", "location",
+    "category", "subcategory", "role", "type", "salary", "listingDate"
+]
+
+
+@dataclass(frozen=True)
+class CorpusSnapshot:
+    """
+    One immutable version of the searchable corpus.
+
+    The job table, embeddings, store, index, formatter, filter index,
+    keyword index (hybrid retrieval only), similar-jobs graph and company
+    centroids always describe the same rows. Updates build a new snapshot and swap the
+    reference, so a request that grabbed a snapshot keeps a consistent view
+    until it finishes.
+    """
+    version: str
+    job_df: pd.DataFrame
+    embeddings: np.ndarray
+    store: object
+    index: object
+    formatter: ResultFormatter
+    filters: FilterIndex
+    keywords: Optional[KeywordIndex] = None
+    similar: Optional[SimilarJobsGraph] = None
+    companies: Optional[CompanyCentroids] = None
+    row_by_job_id: dict = field(default_factory=dict)
+    row_by_alias: dict = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.job_df)
+
+    @staticmethod
+    def map_job_ids(job_df: pd.DataFrame) -> dict:
+        """
+        Maps each job_id (as a string) to its row.
+        """
+        return {job_id: row for row, job_id in enumerate(clean_column(job_df["job_id"])) if job_id is not None}
+
+    @staticmethod
+    def map_aliases(job_df: pd.DataFrame) -> dict:
+        """
+        Maps the job_id of each collapsed repost to the row of the job it was
+        folded into.
+        """
+        if ALIAS_COLUMN not in job_df.columns:
+            return {}
+        return {alias: row for row, aliases in enumerate(clean_list_column(job_df[ALIAS_COLUMN])) if aliases
+                for alias in aliases}
+
+
+def _alias_lists(job_df: pd.DataFrame) -> list[list]:
+    """
+    Returns each row's alias job_ids as a list (empty for rows without any).
+    """
+    if ALIAS_COLUMN not in job_df.columns:
+        return [[] for _ in range(len(job_df))]
+    return [aliases or [] for aliases in clean_list_column(job_df[ALIAS_COLUMN])]
+
+
+def merge_upserts(job_df: pd.DataFrame, job_ids: list, jobs: list[dict]) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Applies upserted jobs to a job table.
+
+    Existing rows with an upserted job_id are replaced, keeping their aliases,
+    and new job_ids are appended; an upserted job_id that was an alias of
+    another job stops being one. Duplicates by job_text are dropped with
+    upserted jobs taking precedence, and the dropped job_ids (with their
+    aliases) become aliases of the job that is kept. Returns the new table and,
+    for each of its rows, the row it was copied from unchanged in job_df, or -1
+    for upserted rows and rows whose aliases changed.
+    """
+    updates = pd.DataFrame(jobs, columns=JOB_COLUMNS).drop_duplicates("job_id", keep="last")
+    upserted = set(updates["job_id"].astype(str))
+    keep = np.array([job_id not in upserted for job_id in job_ids], dtype=bool)
+
+    aliases = _alias_lists(job_df)
+    source_rows = np.flatnonzero(keep)
+    kept_aliases = []
+    for row in source_rows:
+        row_aliases = [alias for alias in aliases[row] if alias not in upserted]
+        if len(row_aliases) != len(aliases[row]):
+            source_rows[len(kept_aliases)] = -1
+        kept_aliases.append(row_aliases)
+    aliases_by_job_id = {job_ids[row]: [alias for alias in aliases[row] if alias not in upserted]
+                         for row in np.flatnonzero(~keep)}
+    update_aliases = [aliases_by_job_id.get(job_id, []) for job_id in updates["job_id"].astype(str)]
+
+    merged = pd.concat([job_df[keep].drop(columns=ALIAS_COLUMN, errors="ignore"), updates], ignore_index=True)
+    merged_aliases = kept_aliases + update_aliases
+    merged_sources = np.concatenate([source_rows, np.full(len(updates), -1, dtype=np.int64)])
+
+    # Fold each dropped duplicate into the last row with its job_text
+    last_row = {text: row for row, text in enumerate(merged["job_text"])}
+    duplicated = merged.duplicated("job_text", keep="last").to_numpy()
+    merged_ids = merged["job_id"].astype(str).tolist()
+    for row in np.flatnonzero(duplicated):
+        survivor = last_row[merged["job_text"].iat[row]]
+        merged_aliases[survivor] = merged_aliases[survivor] + [merged_ids[row]] + merged_aliases[row]
+        merged_sources[survivor] = -1
+
+    merged[ALIAS_COLUMN] = [row_aliases or None for row_aliases in merged_aliases]
+    return merged[~duplicated].reset_index(drop=True), merged_sources[~duplicated]
+
+
+def drop_jobs(job_df: pd.DataFrame, job_ids: list, removed: set) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Removes jobs by job_id, and removed alias job_ids from the jobs they were
+    folded into. Returns the new table, the source row of each of its rows in
+    job_df, and the same with -1 for rows whose aliases changed.
+    """
+    keep = np.array([job_id not in removed for job_id in job_ids], dtype=bool)
+    source_rows = np.flatnonzero(keep)
+    record_sources = source_rows.copy()
+    job_df = job_df[keep].reset_index(drop=True)
+
+    aliases = _alias_lists(job_df)
+    changed = [row for row, row_aliases in enumerate(aliases) if any(alias in removed for alias in row_aliases)]
+    if changed:
+        job_df[ALIAS_COLUMN] = [[alias for alias in row_aliases if alias not in removed] or None
+                                for row_aliases in aliases]
+        record_sources[changed] = -1
+    return job_df, source_rows, record_sources
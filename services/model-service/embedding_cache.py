@@ -0,0 +1,288 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-disk layout or the way embeddings are produced changes,
+# so artifacts written by older code are never picked up.
+CACHE_FORMAT_VERSION = "1"
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+
+
+def compute_fingerprint(model_path: str, dataset_path: str, encoder_backend: str = "torch",
+                        near_duplicate_threshold: float = 0.0) -> str:
+    """
+    Builds a short fingerprint of the model directory, the dataset file, the
+    encoder backend (quantized backends produce slightly different vectors) and
+    the near-duplicate threshold (which decides the rows of the corpus).
+
+    Model files are keyed by relative path, size and modification time (hashing
+    hundreds of MB of weights on every boot would defeat the purpose), while the
+    dataset is hashed by content since it is small in comparison and is the
+    part that changes most often.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format={CACHE_FORMAT_VERSION}".encode())
+    # Left out for the reference backend so existing artifacts stay valid
+    if encoder_backend != "torch":
+        digest.update(f"backend={encoder_backend}".encode())
+    if near_duplicate_threshold > 0:
+        digest.update(f"near_duplicates={near_duplicate_threshold}".encode())
+
+    model_root = Path(model_path)
+    model_files = [model_root] if model_root.is_file() else sorted(p for p in model_root.rglob("*") if p.is_file())
+    for file in model_files:
+        stat = file.stat()
+        digest.update(str(file.relative_to(model_root) if file != model_root else file.name).encode())
+        digest.update(f":{stat.st_size}:{stat.st_mtime_ns};".encode())
+
+    with open(dataset_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()[:16]
+
+
+class EmbeddingCache:
+    """
+    Stores corpus embeddings under ``<cache_dir>/<fingerprint>/`` as a ``.npy``
+    file that is memory-mapped read-only on load.
+    """
+
+    def __init__(self, cache_dir: str, fingerprint: str):
+        self.cache_dir = Path(cache_dir)
+        self.fingerprint = fingerprint
+        self.path = self.cache_dir / fingerprint
+
+    def load(self, expected_rows: int) -> Optional[np.ndarray]:
+        """
+        Returns the cached embeddings, or None if there is no usable artifact.
+        """
+        embeddings_path = self.path / EMBEDDINGS_FILE
+        if not embeddings_path.exists():
+            logger.info(f"No cached embeddings found for fingerprint {self.fingerprint}")
+            return None
+
+        try:
+            embeddings = np.load(embeddings_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable embedding cache at {embeddings_path}: {e}")
+            return None
+
+        if embeddings.ndim != 2 or embeddings.shape[0] != expected_rows:
+            logger.warning(
+                f"Ignoring embedding cache at {embeddings_path}: shape {embeddings.shape} "
+                f"does not match {expected_rows} jobs"
+            )
+            return None
+
+        logger.info(f"Loaded {embeddings.shape[0]} cached embeddings from {embeddings_path}")
+        return embeddings
+
+    def save(self, embeddings: np.ndarray, metadata: Optional[dict] = None) -> np.ndarray:
+        """
+        Writes the embeddings atomically and returns them memory-mapped from disk.
+
+        The artifact is written to a temporary directory next to the final one and
+        renamed into place, so a crash mid-write never leaves a truncated file
+        where the next boot would find it.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{self.fingerprint}-", dir=self.cache_dir))
+        try:
+            np.save(tmp_dir / EMBEDDINGS_FILE, np.ascontiguousarray(embeddings, dtype=np.float32))
+            self._publish(tmp_dir, embeddings.shape, metadata)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        logger.info(f"Saved {embeddings.shape[0]} embeddings to {self.path}")
+        self.prune()
+        return np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r")
+
+    @property
+    def partial_path(self) -> Path:
+        """
+        Directory in which embeddings are encoded before they are published
+        with save_partial. It survives restarts, so an interrupted build can
+        resume from it.
+        """
+        return self.cache_dir / f".{self.fingerprint}.partial"
+
+    def save_partial(self, metadata: Optional[dict] = None) -> np.ndarray:
+        """
+        Publishes the embeddings encoded into partial_path (see
+        parallel_encoding.py) by moving the file rather than copying it, then
+        discards the rest of the partial build. Returns them memory-mapped.
+        """
+        embeddings_path = self.partial_path / EMBEDDINGS_FILE
+        shape = np.load(embeddings_path, mmap_mode="r").shape
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{self.fingerprint}-", dir=self.cache_dir))
+        try:
+            os.replace(embeddings_path, tmp_dir / EMBEDDINGS_FILE)
+            self._publish(tmp_dir, shape, metadata)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            shutil.rmtree(self.partial_path, ignore_errors=True)
+
+        logger.info(f"Saved {shape[0]} embeddings to {self.path}")
+        self.prune()
+        return np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r")
+
+    @property
+    def updates_path(self) -> Path:
+        """
+        Directory holding the embeddings of corpora changed by live job
+        updates. They only live as long as the process that made them.
+        """
+        return self.cache_dir / f".{self.fingerprint}.updates"
+
+    def create_update(self, revision: int, shape: tuple) -> np.memmap:
+        """
+        Creates a writable float32 array of the given shape, memory-mapped from
+        a file in updates_path, for the embeddings of a changed corpus. Files of
+        earlier revisions (and of earlier runs; updates need a single worker)
+        are removed; arrays already mapped from them stay readable until they
+        are released.
+        """
+        self.updates_path.mkdir(parents=True, exist_ok=True)
+        for stale in self.updates_path.glob("*.npy"):
+            stale.unlink(missing_ok=True)
+        return np.lib.format.open_memmap(self.updates_path / f"embeddings-{os.getpid()}-{revision}.npy",
+                                         mode="w+", dtype=np.float32, shape=shape)
+
+    def _publish(self, tmp_dir: Path, shape: tuple, metadata: Optional[dict]):
+        """
+        Writes the metadata next to the embeddings in tmp_dir and moves both
+        into the artifact.
+        """
+        with open(tmp_dir / METADATA_FILE, "w") as f:
+            json.dump({
+                "fingerprint": self.fingerprint,
+                "format_version": CACHE_FORMAT_VERSION,
+                "rows": int(shape[0]),
+                "dim": int(shape[1]),
+                **(metadata or {}),
+            }, f, indent=2)
+
+        if self.path.is_dir() and not (self.path / EMBEDDINGS_FILE).exists():
+            # Auxiliary arrays computed before encoding are already in place
+            for file in tmp_dir.iterdir():
+                os.replace(file, self.path / file.name)
+        else:
+            try:
+                os.replace(tmp_dir, self.path)
+            except OSError:
+                # Another process finished the same artifact first; keep theirs.
+                logger.info(f"Embedding cache for {self.fingerprint} already written by another process")
+
+    def load_metadata(self) -> dict:
+        """
+        Returns the metadata saved with the embeddings ({} if there is none).
+        """
+        try:
+            with open(self.path / METADATA_FILE) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load_array(self, name: str) -> Optional[np.ndarray]:
+        """
+        Loads an auxiliary array stored next to the embeddings, if present.
+        """
+        array_path = self.path / f"{name}.npy"
+        if not array_path.exists():
+            return None
+        try:
+            return np.load(array_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cached array {array_path}: {e}")
+            return None
+
+    def save_array(self, name: str, array: np.ndarray):
+        """
+        Atomically stores an auxiliary array (e.g. index structures) next to the
+        embeddings, so it shares their fingerprint and lifetime.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{name}-", suffix=".npy", dir=self.path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, self.path / f"{name}.npy")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load_frame(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        Loads an auxiliary table stored next to the embeddings, if present.
+        """
+        frame_path = self.path / f"{name}.pkl"
+        if not frame_path.exists():
+            return None
+        try:
+            return pd.read_pickle(frame_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached table {frame_path}: {e}")
+            return None
+
+    def save_frame(self, name: str, frame: pd.DataFrame):
+        """
+        Atomically stores an auxiliary table (e.g. job metadata) next to the
+        embeddings.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{name}-", suffix=".pkl", dir=self.path)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                frame.to_pickle(f)
+            os.replace(tmp_path, self.path / f"{name}.pkl")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @contextmanager
+    def lock(self):
+        """
+        Holds an exclusive inter-process lock on this fingerprint, so when
+        several workers start together one builds the artifact while the others
+        wait and then load it.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / f".{self.fingerprint}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def prune(self):
+        """
+        Removes artifacts (and lock files, partial builds and updated
+        embeddings) left behind by previous fingerprints.
+        """
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir() and entry.name != self.fingerprint and not entry.name.startswith("."):
+                logger.info(f"Removing stale embedding cache {entry}")
+                shutil.rmtree(entry, ignore_errors=True)
+            elif entry.is_dir() and entry.name.endswith(".partial") and entry != self.partial_path:
+                logger.info(f"Removing stale partial embedding build {entry}")
+                shutil.rmtree(entry, ignore_errors=True)
+            elif entry.is_dir() and entry.name.endswith(".updates") and entry != self.updates_path:
+                logger.info(f"Removing stale updated embeddings {entry}")
+                shutil.rmtree(entry, ignore_errors=True)
+            elif entry.is_file() and entry.suffix == ".lock" and entry.name != f".{self.fingerprint}.lock":
+                entry.unlink(missing_ok=True)
@@ -0,0 +1,123 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import torch
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# torch: float32 PyTorch (reference). torch-int8: PyTorch with Linear layers
+# dynamically quantized to int8. onnx: exported ONNX graph run by ONNX Runtime
+# (needs `pip install optimum[onnxruntime]`; the graph is exported on first use).
+ENCODER_BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def load_encoder(model_path: str, backend: str = "torch", threads: Optional[int] = None) -> SentenceTransformer:
+    """
+    Loads the fine-tuned SentenceTransformer for CPU inference with the given
+    backend. threads sets the intra-op thread count of the backend (None
+    keeps the library default, e.g. from TORCH_NUM_THREADS).
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend: {backend}")
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    if backend == "onnx":
+        model_kwargs = {"provider": "CPUExecutionProvider"}
+        if threads:
+            try:
+                import onnxruntime
+            except ImportError as e:
+                raise ImportError("The onnx encoder backend needs `pip install optimum[onnxruntime]`") from e
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = threads
+            session_options.inter_op_num_threads = 1
+            model_kwargs["session_options"] = session_options
+        try:
+            model = SentenceTransformer(model_path, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+        except TypeError as e:
+            raise ImportError("The onnx encoder backend needs sentence-transformers>=3.2") from e
+    else:
+        model = SentenceTransformer(model_path, device="cpu")
+        if backend == "torch-int8":
+            # Weights are quantized once; activations are quantized per batch at runtime
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    logger.info(f"Encoder backend: {backend} (threads={threads or 'default'})")
+    return model
+
+
+def encode(model: SentenceTransformer, texts: list[str], batch_size: int = 32) -> np.ndarray:
+    """
+    Encodes texts into L2-normalized float32 vectors.
+    """
+    embeddings = model.encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def parity_report(reference: np.ndarray, candidate: np.ndarray, queries: np.ndarray,
+                  candidate_queries: np.ndarray, top_k: int = 5) -> dict:
+    """
+    Compares a candidate backend's embeddings with the float32 reference: the
+    cosine between each text's two embeddings, and the overlap of the top_k
+    jobs each backend ranks for the same queries.
+    """
+    from ann_index import top_k_indices
+
+    cosine = np.sum(reference * candidate, axis=1)
+    reference_ids = top_k_indices(queries @ reference.T, top_k)
+    candidate_ids = top_k_indices(candidate_queries @ candidate.T, top_k)
+    overlap = [len(np.intersect1d(a, b)) / top_k for a, b in zip(reference_ids, candidate_ids)]
+
+    return {
+        "jobs": len(reference),
+        "queries": len(queries),
+        "top_k": top_k,
+        "mean_cosine": round(float(cosine.mean()), 5),
+        "min_cosine": round(float(cosine.min()), 5),
+        "mean_top_k_overlap": round(float(np.mean(overlap)), 4),
+        "min_top_k_overlap": round(float(np.min(overlap)), 4),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check embedding parity of encoder backends against the float32 torch model."
+    )
+    parser.add_argument("model_path", help="Path to the fine-tuned SentenceTransformer")
+    parser.add_argument("dataset_path", help="Job CSV with a job_text column")
+    parser.add_argument("--backend", nargs="+", default=["torch-int8", "onnx"], choices=ENCODER_BACKENDS[1:])
+    parser.add_argument("--jobs", type=int, default=2000, help="Job texts sampled as the corpus")
+    parser.add_argument("--queries", type=int, default=100, help="Sampled job titles used as queries")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    jobs = pd.read_csv(args.dataset_path, usecols=["job_text", "job_title"]).dropna().drop_duplicates("job_text")
+    jobs = jobs.sample(n=min(args.jobs, len(jobs)), random_state=0)
+    texts = jobs["job_text"].tolist()
+    query_texts = jobs["job_title"].head(args.queries).tolist()
+
+    def timed_encode(model):
+        start = time.perf_counter()
+        corpus = encode(model, texts, args.batch_size)
+        elapsed = time.perf_counter() - start
+        return corpus, encode(model, query_texts, args.batch_size), round(len(texts) / elapsed, 1)
+
+    reference, reference_queries, reference_rate = timed_encode(load_encoder(args.model_path, "torch", args.threads))
+    print({"backend": "torch", "texts_per_second": reference_rate})
+    for backend in args.backend:
+        corpus, queries, rate = timed_encode(load_encoder(args.model_path, backend, args.threads))
+        print({"backend": backend, "texts_per_second": rate,
+               **parity_report(reference, corpus, reference_queries, queries, args.top_k)})
@@ -0,0 +1,117 @@
+import logging
+import re
+from datetime import date, datetime, time, timezone
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Filterable job_df columns matched by exact (case-insensitive) value
+CATEGORICAL_FIELDS = ["location", "category", "subcategory", "type"]
+
+_SALARY_NUMBER = re.compile(r"(\d+(?:\.\d+)?)\s*([kK])?")
+_EMPTY_ROWS = np.empty(0, dtype=np.int64)
+
+
+def parse_salary(salary) -> tuple[float, float]:
+    """
+    Parses a free-text salary such as "RM 3,000 – RM 4,500 per month" into a
+    (min, max) monthly range. Annual figures are divided by 12. Returns NaNs
+    when no amount can be found.
+    """
+    if salary is None or pd.isna(salary):
+        return np.nan, np.nan
+    text = str(salary).replace(",", "")
+    amounts = [float(number) * (1000 if thousands else 1) for number, thousands in _SALARY_NUMBER.findall(text)]
+    if not amounts:
+        return np.nan, np.nan
+    if re.search(r"year|annum|annual", text, re.IGNORECASE):
+        amounts = [amount / 12 for amount in amounts]
+    return min(amounts), max(amounts)
+
+
+def _to_datetime64(value, end_of_day: bool = False) -> np.datetime64:
+    if isinstance(value, str):
+        # As packed into pagination cursors
+        value = datetime.fromisoformat(value) if "T" in value else date.fromisoformat(value)
+    if isinstance(value, datetime):
+        moment = value
+    else:
+        moment = datetime.combine(value, time.max if end_of_day else time.min)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(moment, "ns")
+
+
+class FilterIndex:
+    """
+    Precomputed structures for restricting search to jobs matching metadata
+    filters: per-value row id postings for categorical fields, and parsed
+    listing dates and salary ranges as flat arrays for range filters.
+    """
+
+    def __init__(self, job_df: pd.DataFrame):
+        self.size = len(job_df)
+        self.postings = {}
+        for field in CATEGORICAL_FIELDS:
+            values = job_df[field].astype("string").str.strip().str.lower()
+            groups = pd.Series(np.arange(self.size, dtype=np.int64)).groupby(values.to_numpy(), dropna=True)
+            self.postings[field] = {value: rows.to_numpy() for value, rows in groups}
+
+        listing_dates = pd.to_datetime(job_df["listingDate"], errors="coerce", utc=True)
+        self.listing_dates = listing_dates.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+
+        salary_ranges = np.array([parse_salary(s) for s in job_df["salary"]], dtype=np.float64).reshape(-1, 2)
+        self.salary_min = salary_ranges[:, 0]
+        self.salary_max = salary_ranges[:, 1]
+
+        logger.info(
+            f"Built filter index over {self.size} jobs "
+            f"({', '.join(f'{len(p)} {f} values' for f, p in self.postings.items())})"
+        )
+
+    def values(self, field: str) -> list[str]:
+        return sorted(self.postings[field])
+
+    def mask(self, filters: Optional[dict]) -> Optional[np.ndarray]:
+        """
+        Returns a boolean mask of jobs matching all filters, or None when no
+        filter is set.
+
+        Categorical filters take a list of accepted values (any may match).
+        listing_date_from/listing_date_to (dates or ISO strings) bound
+        listingDate inclusively, and salary_min/salary_max keep jobs whose
+        parsed salary range overlaps the requested one. Jobs without a
+        parseable date or salary never match a filter on that field.
+        """
+        if not filters:
+            return None
+
+        mask = None
+
+        def restrict(field_mask):
+            nonlocal mask
+            mask = field_mask if mask is None else mask & field_mask
+
+        for field in CATEGORICAL_FIELDS:
+            accepted = filters.get(field)
+            if accepted:
+                field_mask = np.zeros(self.size, dtype=bool)
+                for value in accepted:
+                    field_mask[self.postings[field].get(str(value).strip().lower(), _EMPTY_ROWS)] = True
+                restrict(field_mask)
+
+        if filters.get("listing_date_from") is not None:
+            restrict(self.listing_dates >= _to_datetime64(filters["listing_date_from"]))
+        if filters.get("listing_date_to") is not None:
+            restrict(self.listing_dates <= _to_datetime64(filters["listing_date_to"], end_of_day=True))
+
+        # NaN comparisons are False, so unparsed salaries drop out
+        if filters.get("salary_min") is not None:
+            restrict(self.salary_max >= filters["salary_min"])
+        if filters.get("salary_max") is not None:
+            restrict(self.salary_min <= filters["salary_max"])
+
+        return mask
@@ -0,0 +1,321 @@
+import argparse
+import logging
+import re
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ann_index import ExactIndex, top_k_indices
+
+logger = logging.getLogger(__name__)
+
+# Keeps tech tokens such as "c++", "c#" and "3d" whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Title and role words count this many times, so they outweigh the same word
+# in the description
+FIELD_BOOSTS = {"job_title": 3, "role": 3, "job_text": 1}
+
+# Query terms found in more than this share of jobs add little but cost the
+# longest posting lists, so they are skipped
+MAX_DF_RATIO = 0.5
+
+ARRAY_NAMES = ("terms", "term_offsets", "posting_rows", "posting_tfs", "doc_lengths")
+
+
+def tokenize(text) -> list[str]:
+    return TOKEN_PATTERN.findall(str(text).lower()) if isinstance(text, str) else []
+
+
+def _document_tokens(job_df: pd.DataFrame) -> list[list[str]]:
+    columns = [(job_df[column].tolist(), boost) for column, boost in FIELD_BOOSTS.items() if column in job_df.columns]
+    documents = []
+    for row in range(len(job_df)):
+        tokens = []
+        for values, boost in columns:
+            tokens.extend(tokenize(values[row]) * boost)
+        documents.append(tokens)
+    return documents
+
+
+def _postings(documents: list[list[str]], vocabulary: dict, chunk_rows: int = 20_000) -> tuple[np.ndarray, ...]:
+    """
+    Counts term frequencies per document. Returns (term ids, rows, tfs) with
+    one entry per distinct term of each document, plus document lengths;
+    new terms are added to vocabulary.
+    """
+    term_chunks, row_chunks, tf_chunks = [], [], []
+    doc_lengths = np.zeros(len(documents), dtype=np.int32)
+    for start in range(0, len(documents), chunk_rows):
+        chunk = documents[start:start + chunk_rows]
+        lengths = np.array([len(tokens) for tokens in chunk], dtype=np.int64)
+        doc_lengths[start:start + len(chunk)] = lengths
+        term_ids = np.fromiter(
+            (vocabulary.setdefault(token, len(vocabulary)) for tokens in chunk for token in tokens),
+            dtype=np.int64, count=int(lengths.sum())
+        )
+        rows = np.repeat(np.arange(start, start + len(chunk), dtype=np.int64), lengths)
+        pairs, tfs = np.unique(rows << 32 | term_ids, return_counts=True)
+        term_chunks.append(pairs & 0xFFFFFFFF)
+        row_chunks.append((pairs >> 32).astype(np.int32))
+        tf_chunks.append(np.minimum(tfs, np.iinfo(np.uint16).max).astype(np.uint16))
+    if not term_chunks:
+        return np.empty(0, np.int64), np.empty(0, np.int32), np.empty(0, np.uint16), doc_lengths
+    return np.concatenate(term_chunks), np.concatenate(row_chunks), np.concatenate(tf_chunks), doc_lengths
+
+
+class KeywordIndex:
+    """
+    In-memory BM25 inverted index over job titles, roles and descriptions,
+    used to narrow the corpus to a few thousand candidates before dense
+    scoring.
+
+    Terms are kept sorted so lookups are a binary search, and postings are
+    flat arrays (row ids sorted within each term), so the whole index can be
+    memory-mapped from the artifact cache and shared between workers.
+    Term weights are computed at query time from the stored frequencies, so
+    the index can be refreshed after corpus updates without re-tokenizing
+    unchanged jobs.
+    """
+
+    def __init__(self, terms: np.ndarray, term_offsets: np.ndarray, posting_rows: np.ndarray,
+                 posting_tfs: np.ndarray, doc_lengths: np.ndarray, k1: float = 1.2, b: float = 0.75):
+        self.terms = terms
+        self.term_offsets = term_offsets
+        self.posting_rows = posting_rows
+        self.posting_tfs = posting_tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        # Length normalization of every job, so a query only gathers it
+        average = float(doc_lengths.mean()) if len(doc_lengths) else 1.0
+        self._length_norms = (k1 * (1 - b + b * doc_lengths / max(average, 1e-9))).astype(np.float32)
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    @classmethod
+    def build(cls, job_df: pd.DataFrame) -> "KeywordIndex":
+        """
+        Tokenizes the title, role and text of every job and builds the
+        postings.
+        """
+        start = time.perf_counter()
+        vocabulary = {}
+        term_ids, rows, tfs, doc_lengths = _postings(_document_tokens(job_df), vocabulary)
+        index = cls._from_postings(np.array(list(vocabulary), dtype=str), term_ids, rows, tfs, doc_lengths)
+        logger.info(f"Built keyword index with {len(index.terms)} terms over {len(job_df)} jobs "
+                    f"in {time.perf_counter() - start:.1f}s")
+        return index
+
+    @classmethod
+    def _from_postings(cls, terms: np.ndarray, term_ids: np.ndarray, rows: np.ndarray, tfs: np.ndarray,
+                       doc_lengths: np.ndarray) -> "KeywordIndex":
+        """
+        Sorts the vocabulary and groups (term id, row, tf) entries, given in
+        ascending row order, by term.
+        """
+        order = np.argsort(terms, kind="stable")
+        rank = np.empty(len(terms), dtype=np.int64)
+        rank[order] = np.arange(len(terms))
+        term_ids = rank[term_ids]
+
+        by_term = np.argsort(term_ids, kind="stable")
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=term_offsets[1:])
+        return cls(terms[order], term_offsets, rows[by_term], tfs[by_term], doc_lengths)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """
+        Returns the index structures, for persisting next to the embeddings.
+        """
+        return {f"keywords_{name}": getattr(self, name) for name in ARRAY_NAMES}
+
+    def refreshed(self, job_df: pd.DataFrame, source_rows: np.ndarray) -> "KeywordIndex":
+        """
+        Returns an index over a changed job table. source_rows maps each row to
+        an unchanged row of this index, or -1 for jobs that must be tokenized.
+        """
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        new_row_of = np.full(len(self), -1, dtype=np.int64)
+        reused = np.flatnonzero(source_rows >= 0)
+        new_row_of[source_rows[reused]] = reused
+
+        # Postings of unchanged jobs are carried over under their new row ids
+        old_term_ids = np.repeat(np.arange(len(self.terms)), np.diff(self.term_offsets))
+        moved_rows = new_row_of[self.posting_rows]
+        kept = moved_rows >= 0
+
+        vocabulary = {term: term_id for term_id, term in enumerate(self.terms.tolist())}
+        added = np.flatnonzero(source_rows < 0)
+        term_ids, rows, tfs, lengths = _postings(_document_tokens(job_df.iloc[added]), vocabulary)
+        rows = added[rows].astype(np.int32) if len(rows) else rows
+
+        doc_lengths = np.empty(len(job_df), dtype=np.int32)
+        doc_lengths[reused] = self.doc_lengths[source_rows[reused]]
+        doc_lengths[added] = lengths
+
+        term_ids = np.concatenate([old_term_ids[kept], term_ids])
+        rows = np.concatenate([moved_rows[kept].astype(np.int32), rows])
+        tfs = np.concatenate([self.posting_tfs[kept], tfs])
+        by_row = np.argsort(rows, kind="stable")
+        return KeywordIndex._from_postings(np.array(list(vocabulary), dtype=str), term_ids[by_row], rows[by_row],
+                                           tfs[by_row], doc_lengths)
+
+    def scores(self, query_text: str) -> np.ndarray:
+        """
+        Returns the BM25 score of every job for a query (0 for jobs sharing no
+        term with it).
+        """
+        scores = np.zeros(len(self), dtype=np.float32)
+        query_terms = np.array(sorted(set(tokenize(query_text))), dtype=str)
+        if not len(query_terms) or not len(self.terms):
+            return scores
+
+        positions = np.minimum(np.searchsorted(self.terms, query_terms), len(self.terms) - 1)
+        n = len(self)
+        for position in positions[self.terms[positions] == query_terms]:
+            start, stop = self.term_offsets[position], self.term_offsets[position + 1]
+            df = stop - start
+            if df > MAX_DF_RATIO * n:
+                continue
+            idf = np.log1p((n - df + 0.5) / (df + 0.5))
+            rows = self.posting_rows[start:stop]
+            tfs = self.posting_tfs[start:stop].astype(np.float32)
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + self._length_norms[rows])
+        return scores
+
+    def candidates(self, query_text: str, n_candidates: int, allowed: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns the rows of up to n_candidates jobs with the highest BM25
+        scores (in ascending row order), restricted to an optional boolean
+        mask. Jobs sharing no term with the query are never candidates.
+        """
+        scores = self.scores(query_text)
+        if allowed is not None:
+            scores[~allowed] = 0
+        best = top_k_indices(scores, n_candidates)
+        return np.sort(best[scores[best] > 0])
+
+
+def build_keyword_index(job_df: pd.DataFrame, cache=None) -> KeywordIndex:
+    """
+    Builds the keyword index for a job table. If an EmbeddingCache is passed,
+    the index is saved next to the embedding artifact and memory-mapped back.
+    """
+    index = KeywordIndex.build(job_df)
+    if cache is None:
+        return index
+    for name, array in index.arrays().items():
+        cache.save_array(name, array)
+    return load_keyword_index(cache, len(job_df))
+
+
+def load_keyword_index(cache, expected_rows: int) -> Optional[KeywordIndex]:
+    """
+    Maps a keyword index from the artifact cache, if one for expected_rows jobs
+    is there.
+    """
+    arrays = {name: cache.load_array(f"keywords_{name}") for name in ARRAY_NAMES}
+    if any(array is None for array in arrays.values()) or arrays["doc_lengths"].shape[0] != expected_rows:
+        return None
+    logger.info(f"Loaded keyword index with {len(arrays['terms'])} terms from cache")
+    return KeywordIndex(**arrays)
+
+
+def hybrid_search(keywords: KeywordIndex, index, store, query_text: str, query: np.ndarray, top_k: int,
+                  n_candidates: int, allowed: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Two-stage retrieval for one query: BM25 picks up to n_candidates jobs
+    (or top_k, if larger), then only those are scored against the query
+    embedding. Queries with fewer than top_k keyword candidates fall back to
+    the dense index, so they still get a full page of results.
+
+    Returns (ids, scores) arrays of shape (1, top_k) like an index search.
+    """
+    rows = keywords.candidates(query_text, max(n_candidates, top_k), allowed)
+    if len(rows) < min(top_k, n_candidates):
+        return index.search(query, top_k, allowed=allowed)
+    return ExactIndex(store).search_rows(query, rows, top_k)
+
+
+def hybrid_report(keywords: KeywordIndex, index, store, query_texts: list[str], queries: np.ndarray,
+                  top_k: int = 10, n_candidates: int = 2000) -> dict:
+    """
+    Measures recall@k and mean per-query latency of hybrid retrieval against
+    exhaustive dense search.
+    """
+    exact = ExactIndex(store)
+
+    start = time.perf_counter()
+    exact_ids = [exact.search(q, top_k)[0][0] for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    hybrid_ids = [hybrid_search(keywords, index, store, text, q, top_k, n_candidates)[0][0]
+                  for text, q in zip(query_texts, queries)]
+    hybrid_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    hits = sum(len(np.intersect1d(e[e >= 0], h[h >= 0])) for e, h in zip(exact_ids, hybrid_ids))
+    expected = sum(int(np.count_nonzero(e >= 0)) for e in exact_ids)
+    fallbacks = sum(len(keywords.candidates(text, max(n_candidates, top_k))) < min(top_k, n_candidates)
+                    for text in query_texts)
+    return {
+        "n_candidates": n_candidates,
+        "top_k": top_k,
+        "queries": len(queries),
+        "recall_at_k": round(hits / max(expected, 1), 4),
+        "dense_fallback_rate": round(fallbacks / len(queries), 4),
+        "exhaustive_ms_per_query": round(exact_ms, 3),
+        "hybrid_ms_per_query": round(hybrid_ms, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report recall@k and latency of hybrid retrieval against exhaustive dense search."
+    )
+    parser.add_argument("embeddings", help="Path to the embeddings.npy artifact of the dataset")
+    parser.add_argument("dataset_path", help="The job CSV the artifact was built from")
+    parser.add_argument("model_path", help="Path to the fine-tuned SentenceTransformer, for encoding queries")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[500, 1000, 2000, 5000])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200, help="Sampled jobs whose texts, half-shuffled, are used as queries")
+    parser.add_argument("--backend", default="torch")
+    parser.add_argument("--near-duplicate-threshold", type=float, default=0.9, help="As NEAR_DUPLICATE_THRESHOLD")
+    args = parser.parse_args()
+
+    from corpus import JOB_COLUMNS
+    from encoders import encode, load_encoder
+    from near_duplicates import collapse_near_duplicates
+    from vector_store import Float32Store
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Same rows as the service (and its artifact)
+    jobs = pd.read_csv(args.dataset_path)[JOB_COLUMNS].drop_duplicates("job_text").reset_index(drop=True)
+    if args.near_duplicate_threshold > 0:
+        jobs, _ = collapse_near_duplicates(jobs, args.near_duplicate_threshold)
+    corpus = np.load(args.embeddings, mmap_mode="r")
+    if corpus.shape[0] != len(jobs):
+        parser.error(f"{args.embeddings} has {corpus.shape[0]} rows but the dataset has {len(jobs)} jobs")
+
+    # Resume-like queries: a random half of the words of sampled job texts
+    rng = np.random.default_rng(0)
+    query_texts = []
+    for text in jobs["job_text"].sample(n=min(args.queries, len(jobs)), random_state=0).tolist():
+        words = str(text).split()
+        query_texts.append(" ".join(rng.permutation(words)[:max(1, len(words) // 2)]))
+    queries = encode(load_encoder(args.model_path, args.backend), query_texts)
+
+    keywords = KeywordIndex.build(jobs)
+    store = Float32Store(corpus)
+    for n_candidates in args.candidates:
+        print(hybrid_report(keywords, ExactIndex(store), store, query_texts, queries,
+                            top_k=args.top_k, n_candidates=n_candidates))
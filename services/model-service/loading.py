@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Startup phases in order, with their rough share of total load time
+LOAD_PHASES = [
+    ("model", 10),
+    ("dataset", 5),
+    ("embeddings", 60),
+    ("index", 20),
+    ("warmup", 5),
+]
+
+
+class LoadStatus:
+    """
+    Thread-safe record of how far startup has progressed.
+
+    The loader moves through LOAD_PHASES with begin() and reports progress
+    within a phase with update(); health endpoints read snapshot() at any
+    time. A loader that stops reporting progress shows up as a growing
+    seconds_since_progress.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._weights = dict(LOAD_PHASES)
+        self.phase = "starting"
+        self.fraction = 0.0
+        self.ready = False
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.updated_at = self._phase_started = self.started_at
+        self.phase_seconds: dict[str, float] = {}
+
+    def begin(self, phase: str):
+        with self._lock:
+            now = time.monotonic()
+            if self.phase in self._weights:
+                self.phase_seconds[self.phase] = round(now - self._phase_started, 2)
+            self.phase, self.fraction = phase, 0.0
+            self._phase_started = self.updated_at = now
+        logger.info(f"Startup phase: {phase}")
+
+    def update(self, fraction: float):
+        with self._lock:
+            self.fraction = min(max(fraction, 0.0), 1.0)
+            self.updated_at = time.monotonic()
+
+    def finish(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.phase in self._weights:
+                self.phase_seconds[self.phase] = round(now - self._phase_started, 2)
+            self.phase, self.fraction, self.ready = "ready", 1.0, True
+            self.updated_at = now
+        logger.info(f"Startup complete in {now - self.started_at:.1f}s")
+
+    def fail(self, error: Exception):
+        with self._lock:
+            self.error = str(error)
+            self.updated_at = time.monotonic()
+
+    @property
+    def percent(self) -> float:
+        if self.ready:
+            return 100.0
+        done = 0.0
+        for phase, weight in LOAD_PHASES:
+            if phase == self.phase:
+                done += weight * self.fraction
+                break
+            done += weight
+        else:
+            done = 0.0
+        return round(100.0 * done / sum(self._weights.values()), 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "phase": "failed" if self.error else self.phase,
+                "progress_percent": self.percent,
+                "ready": self.ready,
+                "error": self.error,
+                "elapsed_seconds": round(now - self.started_at, 1),
+                "seconds_since_progress": round(now - self.updated_at, 1),
+                "phase_seconds": dict(self.phase_seconds),
+            }
@@ -0,0 +1,99 @@
+import logging
+import os
+from typing import Callable
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans cache hits (~0.1 ms) to cold corpus-wide scans
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# Set (to an empty directory) when running several worker processes: each worker
+# writes its samples there and a scrape of any worker aggregates them all
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Added to the registry built for each scrape in multiprocess mode
+CALLBACK_GAUGES = []
+
+
+class CallbackGauge(Collector):
+    """
+    A gauge read at scrape time from a value already tracked elsewhere.
+
+    Every worker maps the same corpus, so these are reported by the scraped
+    worker rather than aggregated. A sample is skipped while its function
+    raises, e.g. before the model is loaded.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._functions = {}
+        CALLBACK_GAUGES.append(self)
+        if MULTIPROC_DIR is None:
+            REGISTRY.register(self)
+
+    def set_function(self, function: Callable[[], float], *labelvalues):
+        self._functions[tuple(str(value) for value in labelvalues)] = function
+
+    def collect(self):
+        family = GaugeMetricFamily(self.name, self.documentation, labels=self.labelnames)
+        for labelvalues, function in list(self._functions.items()):
+            try:
+                family.add_metric(labelvalues, function())
+            except Exception as e:
+                logger.debug(f"Metric {self.name} callback failed: {e}")
+        yield family
+
+
+def render() -> bytes:
+    """
+    Renders every metric in the Prometheus text format, summed over all
+    workers in multiprocess mode.
+    """
+    if MULTIPROC_DIR is None:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for gauge in CALLBACK_GAUGES:
+        registry.register(gauge)
+    return generate_latest(registry)
+
+
+def release_worker():
+    """
+    Drops this worker's live gauges from the aggregate when it shuts down.
+    """
+    if MULTIPROC_DIR is not None:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+# Shared by the service modules
+STAGE_SECONDS = Histogram(
+    "model_stage_seconds", "Time spent in each stage of matching (per batch call).", ("stage",),
+    buckets=LATENCY_BUCKETS
+)
+BATCH_SIZE = Histogram(
+    "model_batch_size", "Resumes per micro-batch handed to the matcher.", buckets=BATCH_SIZE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "model_request_seconds", "HTTP request latency until the response starts.", ("method", "route"),
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_ERRORS = Counter(
+    "model_request_errors", "HTTP responses with a 4xx or 5xx status.", ("method", "route", "status")
+)
+CACHE_LOOKUPS = Counter("model_cache_lookups", "Query cache lookups by outcome.", ("cache", "result"))
+QUEUE_DEPTH = Gauge(
+    "model_queue_depth", "Match requests waiting for the micro-batcher.", multiprocess_mode="livesum"
+)
+CORPUS_JOBS = CallbackGauge("model_corpus_jobs", "Jobs in the current corpus snapshot.")
+MEMORY_BYTES = CallbackGauge(
+    "model_memory_bytes", "Size of corpus structures (embeddings are memory-mapped when cached).", ("component",)
+)
+LOAD_PROGRESS = CallbackGauge("model_load_progress_percent", "Startup progress; 100 once ready.")
@@ -1,55 +1,181 @@
-import torch
 import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer, util
 import gc
+import json
 import logging
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, Optional
+from embedding_cache import EmbeddingCache, compute_fingerprint
+from encoders import load_encoder
+from ann_index import build_index, refresh_index
+from vector_store import build_store
+from result_cache import LRUCache, text_key
+from results import ResultFormatter
+from corpus import JOB_COLUMNS, CorpusSnapshot, drop_jobs, merge_upserts
+from filters import FilterIndex
+from near_duplicates import ALIAS_COLUMN, collapse_near_duplicates, near_duplicate_clusters
+from keyword_index import build_keyword_index, hybrid_search, load_keyword_index
+from parallel_encoding import CorpusEncoder, available_cores
+from similar_jobs import build_similar_jobs, load_similar_jobs
+from company_centroids import CompanyCentroids, build_company_centroids, load_company_centroids
+from loading import LoadStatus
+from metrics import STAGE_SECONDS
+from pagination import PREFETCH_PAGES, CursorError, MatchCursor, decode_token, encode_token, pack_cursor, unpack_cursor
 
 logger = logging.getLogger(__name__)
 
+RETRIEVAL_MODES = ("dense", "hybrid")
+
 class JobMatcher:
-    def __init__(self, model_path: str, dataset_path: str, batch_size: int = 32):
+    def __init__(self, model_path: str, dataset_path: str, batch_size: int = 32, cache_dir: Optional[str] = None,
+                 index_type: str = "ivf", n_probe: int = 16, n_lists: Optional[int] = None,
+                 ann_min_corpus_size: int = 20_000, store_type: str = "float32", rescore_depth: int = 50,
+                 query_cache_size: int = 1024, query_cache_ttl: float = 600.0, shared: bool = False,
+                 encoder_backend: str = "torch", encoder_threads: Optional[int] = None,
+                 load_status: Optional[LoadStatus] = None, encoder=None,
+                 cursor_cache_size: int = 4096, cursor_ttl: float = 900.0,
+                 retrieval_mode: str = "dense", hybrid_candidates: int = 2000,
+                 near_duplicate_threshold: float = 0.9, encode_workers: int = 1, similar_jobs_k: int = 20):
         """
         Initializes the job matcher by loading the fine-tuned model and dataset.
+
+        When cache_dir is set, job embeddings are read from (or written to) an
+        on-disk artifact keyed by a fingerprint of the model and dataset, so the
+        corpus is only re-encoded when one of them changes.
+
+        index_type selects the search index ("ivf" or "exact"); corpora smaller
+        than ann_min_corpus_size always use exact search. n_probe is the IVF
+        recall/latency knob.
+
+        store_type selects how corpus vectors are held in memory ("float32",
+        "float16" or "int8"); compact stores re-score their best rescore_depth
+        candidates against the float32 vectors.
+
+        Resume embeddings and top-k results are kept in LRU caches of
+        query_cache_size entries for query_cache_ttl seconds; result keys
+        include the corpus version so a corpus change invalidates them.
+        Pagination cursors are valid for cursor_ttl seconds and expire when
+        the corpus changes; their rankings are cached for at most
+        cursor_cache_size of them.
+
+        With shared, the corpus is loaded for one of several worker processes:
+        embeddings, compact vectors, index arrays and serialized results are
+        memory-mapped from the artifact in cache_dir (built by whichever worker
+        gets there first), and only the job metadata without job texts is held
+        in process memory. Shared corpora cannot be updated in place.
+
+        encoder_backend selects how the model runs on CPU ("torch",
+        "torch-int8" or "onnx", see encoders.py) with encoder_threads intra-op
+        threads. encoder replaces the model with any object offering the
+        SentenceTransformer encode() interface, such as the offline stand-in
+        used by the benchmarks.
+
+        retrieval_mode "dense" scores every job (through the index);
+        "hybrid" first narrows each query to its hybrid_candidates best BM25
+        matches on job title, role and text, and scores only those.
+
+        Reposted vacancies whose texts (ignoring case, whitespace and digits)
+        have an estimated shingle similarity of at least
+        near_duplicate_threshold are collapsed into their most recent listing,
+        which lists the others in alias_job_ids; 0 disables this. What loading
+        removed is kept in corpus_report.
+
+        The corpus is encoded (when there is no artifact) by encode_workers
+        processes, each loading its own copy of the encoder; 0 or less uses
+        one per available core (see available_cores). With cache_dir, an
+        interrupted encode resumes on the next start.
+
+        The similar_jobs_k most similar jobs of every job are precomputed
+        (and cached) from the embeddings through the index; 0 disables this.
+        So is one centroid embedding per company, for ranking companies.
+
+        Progress through the startup phases is reported to load_status, which
+        health endpoints can read from another thread while this runs.
         """
         logger.info(f"Loading fine-tuned model: {model_path}")
+        self.load_status = load_status or LoadStatus()
         
         try:
+            self.load_status.begin("model")
             # Load fine-tuned SentenceTransformer model
-            self.model = SentenceTransformer(model_path)
+            self.model = encoder if encoder is not None else load_encoder(model_path, encoder_backend, encoder_threads)
             logger.info("Model loaded successfully")
             
-            # Load job data
-            self.df = pd.read_csv(dataset_path)
-            logger.info(f"Dataset loaded with {len(self.df)} rows")
-            
-            # Define job columns
-            job_columns = [
-                "job_text", "job_id", "job_title", "company", "location",
-                "category", "subcategory", "role", "type", "salary", "listingDate"
-            ]
-            
-            # Clean and deduplicate job corpus
-            self.job_df = self.df[job_columns].drop_duplicates("job_text").reset_index(drop=True)
-            logger.info(f"Deduplicated to {len(self.job_df)} unique jobs")
-            
-            # Prepare job corpus and embeddings with batch processing
-            self.job_corpus = self.job_df["job_text"].tolist()
-            logger.info(f"Encoding {len(self.job_corpus)} job descriptions in batches...")
-            
-            # Encode in batches to manage memory usage
-            self.job_embeddings = []
-            for i in range(0, len(self.job_corpus), batch_size):
-                batch = self.job_corpus[i:i + batch_size]
-                batch_embeddings = self.model.encode(batch, convert_to_tensor=True, show_progress_bar=False)
-                self.job_embeddings.append(batch_embeddings)
+            if retrieval_mode not in RETRIEVAL_MODES:
+                raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+            
+            self.batch_size = batch_size
+            self.retrieval_mode = retrieval_mode
+            self.hybrid_candidates = hybrid_candidates
+            self.encoder_backend = encoder_backend
+            self.corpus_encoder = CorpusEncoder(
+                self.model, batch_size, workers=encode_workers if encode_workers > 0 else available_cores(),
+                model_path=model_path, backend=encoder_backend, threads=encoder_threads, pass_model=encoder is not None
+            )
+            self.store_options = {"kind": store_type, "rescore_depth": rescore_depth}
+            self.index_options = {
+                "kind": index_type,
+                "n_probe": n_probe,
+                "n_lists": n_lists,
+                "min_corpus_size": ann_min_corpus_size,
+            }
+            
+            # Identifies the corpus that results were computed against
+            self.near_duplicate_threshold = near_duplicate_threshold
+            self.base_version = compute_fingerprint(model_path, dataset_path, encoder_backend, near_duplicate_threshold)
+            self.corpus_report = {}
+            self.revision = 0
+            self.shared = shared
+            
+            self.embedding_cache = None
+            if cache_dir:
+                self.embedding_cache = EmbeddingCache(cache_dir, self.base_version)
+            elif shared:
+                raise ValueError("A shared corpus needs an embedding cache directory")
+            
+            self.load_status.begin("dataset")
+            # With several workers, the first builds the artifact; the others wait, then map it
+            with self.embedding_cache.lock() if shared else nullcontext():
+                if shared:
+                    job_df, job_embeddings, formatter = self._load_shared_corpus(model_path, dataset_path)
+                else:
+                    job_df = self._read_jobs(dataset_path)
+                    
+                    # Precompute cleaned columns and JSON fragments for building results
+                    formatter = ResultFormatter.from_frame(job_df)
+                    job_embeddings = self._load_embeddings(job_df, model_path, dataset_path)
                 
-                # Log progress every 10 batches
-                if (i // batch_size + 1) % 5 == 0:
-                    logger.info(f"Processed {i + len(batch)}/{len(self.job_corpus)} job descriptions")
+                self.load_status.begin("index")
+                store = build_store(job_embeddings, cache=self.embedding_cache, **self.store_options)
+                index = build_index(job_embeddings, store=store, cache=self.embedding_cache, **self.index_options)
+                keywords = self._load_keywords(job_df, dataset_path) if retrieval_mode == "hybrid" else None
+                similar = self._load_similar_jobs(index, job_embeddings, similar_jobs_k) if similar_jobs_k > 0 else None
+                companies = self._load_company_centroids(job_df, job_embeddings)
+            
+            # In-flight requests keep whichever snapshot they started with; updates swap in a new one
+            self.snapshot = CorpusSnapshot(
+                version=self.base_version,
+                job_df=job_df,
+                embeddings=job_embeddings,
+                store=store,
+                index=index,
+                formatter=formatter,
+                filters=FilterIndex(job_df),
+                keywords=keywords,
+                similar=similar,
+                companies=companies,
+                row_by_job_id=CorpusSnapshot.map_job_ids(job_df),
+                row_by_alias=CorpusSnapshot.map_aliases(job_df)
+            )
+            self._update_lock = threading.Lock()
+            
+            self.query_embedding_cache = LRUCache(max_size=query_cache_size, ttl_seconds=query_cache_ttl,
+                                                  metric_name="query_embeddings")
+            self.result_cache = LRUCache(max_size=query_cache_size, ttl_seconds=query_cache_ttl, metric_name="results")
+            self.cursor_cache = LRUCache(max_size=cursor_cache_size, ttl_seconds=cursor_ttl)
             
-            # Concatenate all embeddings
-            self.job_embeddings = torch.cat(self.job_embeddings, dim=0)
             logger.info("Model initialization complete!")
             
             # Force garbage collection
@@ -62,7 +188,177 @@ class JobMatcher:
             logger.error(f"Error during model initialization: {e}")
             raise
 
-    def find_top_matches(self, resume_text: str, top_k: int = 5) -> list[dict]:
+    def _read_jobs(self, dataset_path: str) -> pd.DataFrame:
+        # Load job data
+        df = pd.read_csv(dataset_path)
+        logger.info(f"Dataset loaded with {len(df)} rows")
+        
+        # Clean and deduplicate job corpus; only this table is kept
+        job_df = df[JOB_COLUMNS].drop_duplicates("job_text").reset_index(drop=True)
+        logger.info(f"Deduplicated to {len(job_df)} unique jobs")
+        self.corpus_report = {"dataset_rows": len(df), "exact_duplicates": len(df) - len(job_df)}
+        
+        if self.near_duplicate_threshold <= 0:
+            job_df[ALIAS_COLUMN] = None
+            self.corpus_report["unique_jobs"] = len(job_df)
+            return job_df
+        
+        # Clustering is the slow part, so its labels are kept with the artifact
+        labels = self.embedding_cache.load_array("near_duplicate_labels") if self.embedding_cache is not None else None
+        if labels is None or len(labels) != len(job_df):
+            labels = near_duplicate_clusters(job_df, threshold=self.near_duplicate_threshold)
+            if self.embedding_cache is not None:
+                self.embedding_cache.save_array("near_duplicate_labels", labels)
+        
+        job_df, report = collapse_near_duplicates(job_df, self.near_duplicate_threshold, labels=labels)
+        self.corpus_report.update(report)
+        return job_df
+
+    def _load_embeddings(self, job_df: pd.DataFrame, model_path: str, dataset_path: str) -> np.ndarray:
+        """
+        Returns the job embeddings from the artifact, encoding (and saving) them
+        if there is none.
+        """
+        self.load_status.begin("embeddings")
+        job_embeddings = None
+        if self.embedding_cache is not None:
+            job_embeddings = self.embedding_cache.load(expected_rows=len(job_df))
+        
+        if job_embeddings is None:
+            texts = job_df["job_text"].tolist()
+            logger.info(f"Encoding {len(texts)} job descriptions with {self.corpus_encoder.workers} worker(s)...")
+            if self.embedding_cache is None:
+                job_embeddings = self.corpus_encoder.encode(texts, progress=self.load_status.update)
+            else:
+                self.corpus_encoder.encode(texts, work_dir=self.embedding_cache.partial_path, progress=self.load_status.update)
+                job_embeddings = self.embedding_cache.save_partial(
+                    metadata={"model_path": model_path, "dataset_path": dataset_path, "corpus": self.corpus_report,
+                              "encoder_backend": self.encoder_backend}
+                )
+        return job_embeddings
+
+    def _load_shared_corpus(self, model_path: str, dataset_path: str) -> tuple[pd.DataFrame, np.ndarray, ResultFormatter]:
+        """
+        Maps the job metadata, embeddings and result fragments from the
+        artifact, building any missing part from the dataset first. Must be
+        called with the artifact lock held.
+        """
+        cache = self.embedding_cache
+        job_df = cache.load_frame("jobs")
+        if job_df is not None:
+            job_embeddings = cache.load(expected_rows=len(job_df))
+            blob = cache.load_array("result_blob")
+            offsets = cache.load_array("result_offsets")
+            if job_embeddings is not None and blob is not None and offsets is not None and len(offsets) == len(job_df) + 1:
+                logger.info(f"Mapped shared corpus of {len(job_df)} jobs from {cache.path}")
+                self.corpus_report = cache.load_metadata().get("corpus", {})
+                return job_df, job_embeddings, ResultFormatter(None, blob, offsets)
+        
+        job_df = self._read_jobs(dataset_path)
+        job_embeddings = self._load_embeddings(job_df, model_path, dataset_path)
+        formatter = ResultFormatter.from_frame(job_df)
+        cache.save_array("result_blob", formatter.blob)
+        cache.save_array("result_offsets", formatter.offsets)
+        
+        # Job texts only live in the serialized fragments from here on
+        job_df = job_df.drop(columns="job_text")
+        cache.save_frame("jobs", job_df)
+        del formatter
+        
+        return job_df, job_embeddings, ResultFormatter(None, cache.load_array("result_blob"), cache.load_array("result_offsets"))
+
+    def _load_keywords(self, job_df: pd.DataFrame, dataset_path: str):
+        """
+        Returns the BM25 keyword index, mapped from the artifact when one was
+        saved for this corpus, otherwise built (and saved).
+        """
+        if self.embedding_cache is not None:
+            keywords = load_keyword_index(self.embedding_cache, len(job_df))
+            if keywords is not None:
+                return keywords
+        
+        # A shared corpus keeps no job texts in memory, so read them again
+        if "job_text" not in job_df.columns:
+            job_df = self._read_jobs(dataset_path)
+        return build_keyword_index(job_df, cache=self.embedding_cache)
+
+    def _load_similar_jobs(self, index, job_embeddings: np.ndarray, k: int):
+        """
+        Returns the similar-jobs graph, mapped from the artifact when one was
+        saved for this corpus, otherwise built (and saved).
+        """
+        if self.embedding_cache is not None:
+            similar = load_similar_jobs(self.embedding_cache, len(job_embeddings), k)
+            if similar is not None:
+                return similar
+        return build_similar_jobs(index, job_embeddings, k, cache=self.embedding_cache)
+
+    def _load_company_centroids(self, job_df: pd.DataFrame, job_embeddings: np.ndarray) -> CompanyCentroids:
+        """
+        Returns the company centroids, mapped from the artifact when they were
+        saved for this corpus, otherwise built (and saved).
+        """
+        if self.embedding_cache is not None:
+            companies = load_company_centroids(self.embedding_cache, job_embeddings.shape[1])
+            if companies is not None:
+                return companies
+        return build_company_centroids(job_df["company"], job_embeddings, cache=self.embedding_cache)
+
+    @property
+    def corpus_version(self) -> str:
+        return self.snapshot.version
+
+    @property
+    def job_df(self) -> pd.DataFrame:
+        return self.snapshot.job_df
+
+    @property
+    def job_embeddings(self) -> np.ndarray:
+        return self.snapshot.embeddings
+
+    @property
+    def index(self):
+        return self.snapshot.index
+
+    def _encode_texts(self, texts: list[str], progress: Optional[Callable[[float], None]] = None) -> np.ndarray:
+        """
+        Encodes job texts into L2-normalized float32 vectors, so cosine
+        similarity against a normalized query is a plain dot product.
+        Batches are formed from texts of similar length, in this process.
+        progress, if given, is called with the fraction encoded so far.
+        """
+        logger.info(f"Encoding {len(texts)} job descriptions in batches...")
+        return CorpusEncoder(self.model, self.batch_size).encode(texts, progress=progress)
+
+    def warm_up(self, batch_sizes: tuple = (1, 8), top_k: int = 10):
+        """
+        Runs dummy encodes and searches so the first real requests do not pay
+        one-time costs (lazy kernel setup, allocator growth, first page-ins of
+        the index).
+        """
+        self.load_status.begin("warmup")
+        dummy = "Experienced software engineer skilled in Python, SQL, cloud services and data analysis."
+        for step, batch_size in enumerate(batch_sizes, 1):
+            texts = [f"{dummy} {i}" for i in range(batch_size)]
+            self.match_batch_json(texts, [top_k] * batch_size, use_cache=False)
+            self.load_status.update(step / len(batch_sizes))
+        if self.shared and self.cursor_cache.ttl_seconds > 0:
+            self._check_portable_cursors(dummy, top_k)
+
+    def _check_portable_cursors(self, resume_text: str, page_size: int):
+        """
+        Checks that a cursor pages the same when rebuilt from its token alone,
+        as it is by a worker that never saw it. Several workers share one port
+        without sticky routing, so a shared corpus must not start otherwise.
+        """
+        token = self.create_cursor(resume_text, page_size)
+        cursor_id, offset = decode_token(token)
+        here = self.match_page(token, page_size)
+        elsewhere = self._page(self._resolve_cursor(cursor_id, use_cache=False), cursor_id, offset, page_size)
+        if here != elsewhere:
+            raise RuntimeError("Pagination cursors cannot be resolved across worker processes")
+
+    def find_top_matches(self, resume_text: str, top_k: int = 5, filters: Optional[dict] = None) -> list[dict]:
         """
         Finds the top k matching job descriptions for a given resume text.
         """
@@ -70,43 +366,400 @@ class JobMatcher:
             logger.warning("Empty resume text provided")
             return []
 
-        return self.recommend_jobs(resume_text, top_k)
+        return self.recommend_jobs(resume_text, top_k, filters)
 
-    def recommend_jobs(self, resume_text: str, top_k: int = 5) -> list[dict]:
+    def recommend_jobs(self, resume_text: str, top_k: int = 5, filters: Optional[dict] = None) -> list[dict]:
+        """
+        Recommendation function that finds top matching jobs for a resume,
+        optionally restricted by metadata filters.
         """
-        Recommendation function that finds top matching jobs for a resume.
+        return self.match_batch([resume_text], [top_k], [filters])[0]
+
+    def encode_queries(self, texts: list[str]) -> np.ndarray:
+        """
+        Encodes resume texts into L2-normalized float32 query vectors.
+        """
+        with STAGE_SECONDS.labels("encode").time():
+            return self.model.encode(
+                texts, convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+            ).astype(np.float32, copy=False)
+
+    def _search_batch(self, snapshot: CorpusSnapshot, resume_texts: list[str], top_ks: list[int],
+                      filters: Optional[list[Optional[dict]]] = None,
+                      use_cache: bool = True) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        Finds the best (job row ids, scores) in a snapshot for several resumes
+        with one encode call and one index search per distinct filter set.
+
+        filters holds optional metadata filters per resume (see
+        FilterIndex.mask); they restrict the candidate set before top-k
+        selection. With use_cache, previously seen resumes are answered from
+        the result cache, and only resumes without a cached embedding are
+        encoded.
         """
         try:
-            # Encode resume text
-            resume_embedding = self.model.encode(resume_text, convert_to_tensor=True)
-            
-            # Calculate cosine similarity scores
-            cosine_scores = util.cos_sim(resume_embedding, self.job_embeddings)[0].cpu().numpy()
-            
-            # Get top k indices
-            top_indices = np.argsort(-cosine_scores)[:top_k]
-
-            # Format results
-            results = []
-            for idx in top_indices:
-                job_info = self.job_df.iloc[idx]
-                results.append({
-                    "job_id": str(job_info["job_id"]) if pd.notna(job_info["job_id"]) else None,
-                    "job_title": str(job_info["job_title"]) if pd.notna(job_info["job_title"]) else None,
-                    "job_description": str(job_info["job_text"]) if pd.notna(job_info["job_text"]) else None,
-                    "company": str(job_info["company"]) if pd.notna(job_info["company"]) else None,
-                    "location": str(job_info["location"]) if pd.notna(job_info["location"]) else None,
-                    "category": str(job_info["category"]) if pd.notna(job_info["category"]) else None,
-                    "subcategory": str(job_info["subcategory"]) if pd.notna(job_info["subcategory"]) else None,
-                    "role": str(job_info["role"]) if pd.notna(job_info["role"]) else None,
-                    "type": str(job_info["type"]) if pd.notna(job_info["type"]) else None,
-                    "salary": str(job_info["salary"]) if pd.notna(job_info["salary"]) else None,
-                    "listingDate": str(job_info["listingDate"]) if pd.notna(job_info["listingDate"]) else None,
-                    "score": round(float(cosine_scores[idx]), 4)
-                })
-            
-            return results
+            filters = filters or [None] * len(resume_texts)
+            filter_keys = [json.dumps(f, sort_keys=True, default=str) if f else "" for f in filters]
+            hits = [None] * len(resume_texts)
+            pending = list(range(len(resume_texts)))
+            
+            if use_cache:
+                keys = [text_key(text) for text in resume_texts]
+                for i in pending:
+                    hits[i] = self.result_cache.get((snapshot.version, keys[i], top_ks[i], filter_keys[i]))
+                pending = [i for i in pending if hits[i] is None]
+                if not pending:
+                    return hits
+            
+            resume_embeddings = self._embed_queries([resume_texts[i] for i in pending],
+                                                    [keys[i] for i in pending] if use_cache else None)
+            
+            # Resumes sharing the same filters are searched together
+            groups = {}
+            for position, i in enumerate(pending):
+                groups.setdefault(filter_keys[i], []).append(position)
+            
+            for positions in groups.values():
+                group = [pending[p] for p in positions]
+                group_top_ks = [top_ks[i] for i in group]
+                # The group is searched once at its largest top_k, never deeper than the corpus
+                depth = min(max(group_top_ks), len(snapshot))
+                allowed = None
+                if filters[group[0]]:
+                    with STAGE_SECONDS.labels("filter").time():
+                        allowed = snapshot.filters.mask(filters[group[0]])
+                
+                top_indices, top_scores = self._retrieve(snapshot, [resume_texts[i] for i in group],
+                                                         resume_embeddings[positions], depth, allowed)
+                
+                for i, indices, scores, top_k in zip(group, top_indices, top_scores, group_top_ks):
+                    found = indices[:top_k] >= 0
+                    hits[i] = (indices[:top_k][found], scores[:top_k][found])
+                    if use_cache:
+                        self.result_cache.put((snapshot.version, keys[i], top_k, filter_keys[i]), hits[i])
+            
+            return hits
             
         except Exception as e:
             logger.error(f"Error during job recommendation: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def _retrieve(self, snapshot: CorpusSnapshot, resume_texts: list[str], queries: np.ndarray, top_k: int,
+                  allowed: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Searches a snapshot for a group of resumes: the dense index directly,
+        or in hybrid mode, each resume's BM25 candidates.
+        """
+        # Cosine similarity search (embeddings are pre-normalized)
+        with STAGE_SECONDS.labels("search").time():
+            if snapshot.keywords is None:
+                return snapshot.index.search(queries, top_k, allowed=allowed)
+            
+            results = [hybrid_search(snapshot.keywords, snapshot.index, snapshot.store, text, query, top_k,
+                                     self.hybrid_candidates, allowed)
+                       for text, query in zip(resume_texts, np.atleast_2d(queries))]
+            return np.concatenate([ids for ids, _ in results]), np.concatenate([scores for _, scores in results])
+
+    def match_batch(self, resume_texts: list[str], top_ks: list[int], filters: Optional[list[Optional[dict]]] = None,
+                    use_cache: bool = True) -> list[list[dict]]:
+        """
+        Finds matches for several resumes, returning one list of job match
+        dictionaries per resume.
+        """
+        snapshot = self.snapshot
+        hits = self._search_batch(snapshot, resume_texts, top_ks, filters, use_cache)
+        with STAGE_SECONDS.labels("format").time():
+            return [snapshot.formatter.records(ids, scores) for ids, scores in hits]
+
+    def match_batch_json(self, resume_texts: list[str], top_ks: list[int], filters: Optional[list[Optional[dict]]] = None,
+                         use_cache: bool = True) -> list[bytes]:
+        """
+        Like match_batch, but returns each resume's matches as a serialized JSON
+        array assembled from pre-encoded job fragments.
+        """
+        snapshot = self.snapshot
+        hits = self._search_batch(snapshot, resume_texts, top_ks, filters, use_cache)
+        with STAGE_SECONDS.labels("format").time():
+            return [snapshot.formatter.json_array(ids, scores) for ids, scores in hits]
+
+    def _embed_queries(self, resume_texts: list[str], keys: Optional[list[str]] = None) -> np.ndarray:
+        """
+        Returns query vectors for the resumes, encoding only those missing from
+        the query embedding cache when keys are given.
+        """
+        if keys is None:
+            return self.encode_queries(resume_texts)
+        
+        cached = [self.query_embedding_cache.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+        if missing:
+            encoded = self.encode_queries([resume_texts[i] for i in missing])
+            for i, embedding in zip(missing, encoded):
+                cached[i] = embedding
+                self.query_embedding_cache.put(keys[i], embedding)
+        return np.stack(cached)
+
+    def create_cursor(self, resume_text: str, top_k: int, filters: Optional[dict] = None) -> str:
+        """
+        Returns a cursor for the results after the first top_k matches of a
+        resume. Nothing is searched until the next page is requested.
+        """
+        cursor = MatchCursor(
+            version=self.corpus_version,
+            resume_text=resume_text,
+            resume_key=text_key(resume_text),
+            filters=filters,
+            created_at=time.time()
+        )
+        cursor_id = pack_cursor(cursor)
+        self.cursor_cache.put(text_key(cursor_id), cursor)
+        return encode_token(cursor_id, top_k)
+
+    def _resolve_cursor(self, cursor_id: str, use_cache: bool = True) -> MatchCursor:
+        """
+        Returns the cursor with the given id, rebuilding it from the id when
+        this process does not hold it (another worker created it, or it was
+        evicted). Raises CursorError for malformed or expired cursors.
+        """
+        key = text_key(cursor_id)
+        cursor = self.cursor_cache.get(key) if use_cache else None
+        if cursor is not None:
+            return cursor
+        
+        version, resume_text, filters, created_at = unpack_cursor(cursor_id)
+        if time.time() - created_at > self.cursor_cache.ttl_seconds:
+            raise CursorError("Cursor expired or unknown; repeat the search")
+        cursor = MatchCursor(version=version, resume_text=resume_text, resume_key=text_key(resume_text),
+                             filters=filters, created_at=created_at)
+        if use_cache:
+            self.cursor_cache.put(key, cursor)
+        return cursor
+
+    def match_page(self, token: str, page_size: int) -> tuple[bytes, Optional[str]]:
+        """
+        Returns the next page_size matches after a cursor as a serialized JSON
+        array, with the cursor for the page after it (None at the end).
+
+        The query embedding is reused, and the ranking is selected several
+        pages ahead, so most pages are a slice of an already ranked list.
+        Raises CursorError for unknown, expired or outdated cursors.
+        """
+        cursor_id, offset = decode_token(token)
+        return self._page(self._resolve_cursor(cursor_id), cursor_id, offset, page_size)
+
+    def _page(self, cursor: MatchCursor, cursor_id: str, offset: int, page_size: int) -> tuple[bytes, Optional[str]]:
+        snapshot = self.snapshot
+        if cursor.version != snapshot.version:
+            raise CursorError("The job corpus changed since this cursor was created; repeat the search")
+        
+        end = offset + page_size
+        if not cursor.covers(end):
+            self._extend_ranking(snapshot, cursor, end + page_size * PREFETCH_PAGES)
+        
+        ids, scores, exhausted = cursor.ranking
+        with STAGE_SECONDS.labels("format").time():
+            page = snapshot.formatter.json_array(ids[offset:end], scores[offset:end])
+        next_token = None if exhausted and end >= len(ids) else encode_token(cursor_id, end)
+        return page, next_token
+
+    def _extend_ranking(self, snapshot: CorpusSnapshot, cursor: MatchCursor, depth: int):
+        """
+        Selects the top depth matches of a cursor's query (at least double
+        what it already holds).
+        """
+        if cursor.embedding is None:
+            cursor.embedding = self._embed_queries([cursor.resume_text], [cursor.resume_key])[0]
+        
+        held = len(cursor.ranking[0]) if cursor.ranking is not None else 0
+        depth = min(max(depth, 2 * held), len(snapshot))
+        
+        allowed = None
+        if cursor.filters:
+            with STAGE_SECONDS.labels("filter").time():
+                allowed = snapshot.filters.mask(cursor.filters)
+        ids, scores = self._retrieve(snapshot, [cursor.resume_text], cursor.embedding, depth, allowed)
+        
+        found = ids[0] >= 0
+        cursor.ranking = (ids[0][found], scores[0][found], int(found.sum()) < depth or depth == len(snapshot))
+
+    def similar_jobs(self, job_id: str, top_k: int = 5) -> Optional[tuple[str, bytes]]:
+        """
+        Returns the job_id of a job (resolving the job_id of a collapsed
+        repost to the job it was folded into) and its top_k most similar jobs
+        as a serialized JSON array, or None for an unknown job_id. top_k is
+        capped at the neighbours kept per job.
+        """
+        snapshot = self.snapshot
+        if snapshot.similar is None:
+            raise RuntimeError("Similar jobs are disabled")
+        
+        row = snapshot.row_by_job_id.get(str(job_id), snapshot.row_by_alias.get(str(job_id)))
+        if row is None:
+            return None
+        
+        ids, scores = snapshot.similar.neighbors_of(row, top_k)
+        with STAGE_SECONDS.labels("format").time():
+            matches = snapshot.formatter.json_array(ids, scores)
+        return str(snapshot.job_df["job_id"].iloc[row]), matches
+
+    def match_companies(self, resume_text: str = "", cursor: Optional[str] = None,
+                        top_k: Optional[int] = None) -> list[dict]:
+        """
+        Ranks companies by the similarity of the resume to the centroid of
+        their jobs, returning the top_k (or all) with their score and job
+        count. cursor may stand in for the resume: the token of an earlier
+        /match_jobs response, whose resume embedding is usually still cached.
+        Raises CursorError for unknown or expired cursors.
+        """
+        snapshot = self.snapshot
+        if cursor:
+            cursor_id, _ = decode_token(cursor)
+            match_cursor = self._resolve_cursor(cursor_id)
+            query = self._embed_queries([match_cursor.resume_text], [match_cursor.resume_key])
+        else:
+            query = self._embed_queries([resume_text], [text_key(resume_text)])
+        
+        with STAGE_SECONDS.labels("search").time():
+            return snapshot.companies.ranking(query, top_k)
+
+    def cache_stats(self) -> dict:
+        """
+        Returns hit/miss counters of the query caches.
+        """
+        return {
+            "corpus_version": self.corpus_version,
+            "query_embeddings": self.query_embedding_cache.stats(),
+            "results": self.result_cache.stats(),
+        }
+
+    def iter_matches(self, resume_texts: list[str], top_ks: list[int], filters: Optional[list[Optional[dict]]] = None,
+                     chunk_size: int = 64):
+        """
+        Yields (position, serialized JSON matches) for each resume, encoding and
+        searching chunk_size resumes at a time so memory stays bounded for any
+        input size.
+
+        If a chunk fails, its resumes are retried one at a time; a resume that
+        still fails yields (position, exception) and later chunks carry on.
+        """
+        filters = filters or [None] * len(resume_texts)
+        for start in range(0, len(resume_texts), chunk_size):
+            end = min(start + chunk_size, len(resume_texts))
+            try:
+                # Bulk runs would only flush interactive entries out of the query caches
+                chunk_results = self.match_batch_json(resume_texts[start:end], top_ks[start:end],
+                                                      filters[start:end], use_cache=False)
+            except Exception as e:
+                logger.error(f"Error matching resumes {start}-{end - 1} of a bulk run: {e}; retrying them one by one")
+                chunk_results = [self._match_one_json(resume_texts[i], top_ks[i], filters[i]) for i in range(start, end)]
+            yield from enumerate(chunk_results, start)
+
+    def _match_one_json(self, resume_text: str, top_k: int, filters: Optional[dict]):
+        """
+        Returns one resume's serialized matches, or the exception matching it
+        raised.
+        """
+        try:
+            return self.match_batch_json([resume_text], [top_k], [filters], use_cache=False)[0]
+        except Exception as e:
+            return e
+
+    def upsert_jobs(self, jobs: list[dict]) -> dict:
+        """
+        Inserts or replaces jobs by job_id and swaps in the updated corpus.
+
+        Only jobs whose job_text is not already in the corpus are encoded. See
+        merge_upserts for how aliases of collapsed reposts are kept.
+        """
+        self._check_updatable()
+        with self._update_lock:
+            current = self.snapshot
+            job_ids = current.formatter.columns["job_id"]
+            job_df, record_sources = merge_upserts(current.job_df, job_ids, jobs)
+            
+            # Reuse embeddings of any text already in the corpus
+            row_by_text = {text: row for row, text in enumerate(current.job_df["job_text"])}
+            embedding_sources = np.array([row_by_text.get(text, -1) for text in job_df["job_text"]], dtype=np.int64)
+            
+            encoded = self._publish(current, job_df, record_sources, embedding_sources)
+            logger.info(f"Upserted {len(jobs)} jobs ({encoded} encoded); corpus is now {len(job_df)} jobs "
+                        f"at version {self.corpus_version}")
+            return {"upserted": len(jobs), "encoded": encoded, "total_jobs": len(job_df),
+                    "corpus_version": self.corpus_version}
+
+    def delete_jobs(self, job_ids: list[str]) -> dict:
+        """
+        Removes jobs by job_id and swaps in the updated corpus. An alias job_id
+        is removed from the job it was folded into.
+        """
+        self._check_updatable()
+        with self._update_lock:
+            current = self.snapshot
+            removed = {str(job_id) for job_id in job_ids} & (current.row_by_job_id.keys() | current.row_by_alias.keys())
+            if not removed:
+                return {"deleted": 0, "total_jobs": len(current), "corpus_version": current.version}
+            
+            job_df, source_rows, record_sources = drop_jobs(current.job_df, current.formatter.columns["job_id"], removed)
+            self._publish(current, job_df, record_sources, source_rows)
+            logger.info(f"Deleted {len(removed)} jobs; corpus is now {len(job_df)} jobs at version {self.corpus_version}")
+            return {"deleted": len(removed), "total_jobs": len(job_df), "corpus_version": self.corpus_version}
+
+    def _check_updatable(self):
+        if self.shared:
+            raise RuntimeError("A corpus shared between worker processes cannot be updated in place; "
+                               "run a single worker for live updates or restart with a new dataset")
+
+    def _publish(self, current: CorpusSnapshot, job_df: pd.DataFrame, record_sources: np.ndarray,
+                 embedding_sources: np.ndarray) -> int:
+        """
+        Builds a new snapshot for a changed job table and swaps it in.
+
+        record_sources maps each row to an unchanged row of the current snapshot
+        (or -1), and embedding_sources to a current row with the same job_text
+        (or -1). Returns the number of newly encoded jobs.
+        """
+        new_rows = np.flatnonzero(embedding_sources < 0)
+        new_embeddings = self._encode_texts(job_df["job_text"].iloc[new_rows].tolist()) if len(new_rows) else None
+        
+        # With a cache the new matrix is written to a mapped file, so the corpus never sits on the heap
+        shape = (len(job_df), current.embeddings.shape[1])
+        if self.embedding_cache is not None:
+            embeddings = self.embedding_cache.create_update(self.revision + 1, shape)
+        else:
+            embeddings = np.empty(shape, dtype=np.float32)
+        for start in range(0, len(job_df), 65_536):
+            block = np.arange(start, min(start + 65_536, len(job_df)))
+            block = block[embedding_sources[block] >= 0]
+            embeddings[block] = current.embeddings[embedding_sources[block]]
+        if new_embeddings is not None:
+            embeddings[new_rows] = new_embeddings
+        if isinstance(embeddings, np.memmap):
+            embeddings.flush()
+            embeddings = np.load(embeddings.filename, mmap_mode="r")
+        
+        store = current.store.refreshed(embeddings, embedding_sources)
+        index = refresh_index(current.index, embeddings, store, embedding_sources, **self.index_options)
+        formatter = current.formatter.derive(job_df, record_sources)
+        keywords = current.keywords.refreshed(job_df, record_sources) if current.keywords is not None else None
+        similar = current.similar.refreshed(index, embeddings, embedding_sources) if current.similar is not None else None
+        companies = CompanyCentroids.build(job_df["company"], embeddings)
+        
+        self.revision += 1
+        self.snapshot = CorpusSnapshot(
+            version=f"{self.base_version}.{self.revision}",
+            job_df=job_df,
+            embeddings=embeddings,
+            store=store,
+            index=index,
+            formatter=formatter,
+            filters=FilterIndex(job_df),
+            keywords=keywords,
+            similar=similar,
+            companies=companies,
+            row_by_job_id=CorpusSnapshot.map_job_ids(job_df),
+            row_by_alias=CorpusSnapshot.map_aliases(job_df)
+        )
+        
+        # Entries for the old version can no longer be hit; free them now
+        self.result_cache.clear()
+        return len(new_rows)
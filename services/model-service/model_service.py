@@ -1,11 +1,25 @@
 import os
+import json
 import logging
+import secrets
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from model import JobMatcher
+from pagination import CursorError
+from batching import MicroBatcher
+from loading import LoadStatus
+from metrics import (
+    CORPUS_JOBS, LOAD_PROGRESS, MEMORY_BYTES, REQUEST_ERRORS, REQUEST_SECONDS, release_worker, render
+)
+from prometheus_client import CONTENT_TYPE_LATEST
 import asyncio
+import time
 from contextlib import asynccontextmanager
 
 # Configure logging
@@ -15,42 +29,137 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Global variable to hold the matcher
+# Global variables to hold the matcher and its request scheduler
 matcher = None
+batcher = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Manage the application lifecycle"""
-    global matcher
+# Resumes encoded and searched together by /match_jobs/batch
+BATCH_ENCODE_SIZE = int(os.environ.get("BATCH_ENCODE_SIZE", "64"))
+
+# /admin endpoints require a matching X-Admin-Token header; they are disabled while this is unset
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# uvicorn worker processes; with more than one, workers map a shared corpus artifact
+MODEL_WORKERS = int(os.environ.get("MODEL_WORKERS", "1"))
+
+# Concurrent /match_jobs requests encoded together, and how long to wait for them
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "5"))
+
+# Largest top_k a request may ask for; requests in a micro-batch are searched at the largest top_k among them
+MAX_TOP_K = 50
+
+# Startup progress, reported by /health/live and /health/ready
+load_status = LoadStatus()
+
+def load_matcher() -> JobMatcher:
+    """Builds and warms up the JobMatcher from environment settings (blocking)"""
+    MODEL_PATH = os.environ.get("MODEL_PATH", "/app/model/fine_tuned_mpnet_with_eval")
+    DATASET_PATH = os.environ.get("DATASET_PATH", "/app/dataset/job_vacancy.csv")
+    EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", "/app/cache")
+    ANN_INDEX = os.environ.get("ANN_INDEX", "ivf")
+    ANN_NPROBE = int(os.environ.get("ANN_NPROBE", "16"))
+    ANN_NLISTS = int(os.environ.get("ANN_NLISTS", "0"))
+    ANN_MIN_CORPUS_SIZE = int(os.environ.get("ANN_MIN_CORPUS_SIZE", "20000"))
+    EMBEDDING_STORE = os.environ.get("EMBEDDING_STORE", "float32")
+    RESCORE_DEPTH = int(os.environ.get("RESCORE_DEPTH", "50"))
+    QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", "1024"))
+    QUERY_CACHE_TTL_SECONDS = float(os.environ.get("QUERY_CACHE_TTL_SECONDS", "600"))
+    ENCODER_BACKEND = os.environ.get("ENCODER_BACKEND", "torch")
+    ENCODER_THREADS = int(os.environ.get("ENCODER_THREADS", "0"))
+    CURSOR_CACHE_SIZE = int(os.environ.get("CURSOR_CACHE_SIZE", "4096"))
+    CURSOR_TTL_SECONDS = float(os.environ.get("CURSOR_TTL_SECONDS", "900"))
+    RETRIEVAL_MODE = os.environ.get("RETRIEVAL_MODE", "dense")
+    HYBRID_CANDIDATES = int(os.environ.get("HYBRID_CANDIDATES", "2000"))
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+    ENCODE_WORKERS = int(os.environ.get("ENCODE_WORKERS", "1"))
+    SIMILAR_JOBS_K = int(os.environ.get("SIMILAR_JOBS_K", "20"))
+    
+    # Check if files exist before loading
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"Model path does not exist: {MODEL_PATH}")
+    if not os.path.exists(DATASET_PATH):
+        raise FileNotFoundError(f"Dataset path does not exist: {DATASET_PATH}")
+    
+    loaded = JobMatcher(
+        model_path=str(MODEL_PATH),
+        dataset_path=str(DATASET_PATH),
+        cache_dir=EMBEDDING_CACHE_DIR or None,
+        index_type=ANN_INDEX,
+        n_probe=ANN_NPROBE,
+        n_lists=ANN_NLISTS or None,
+        ann_min_corpus_size=ANN_MIN_CORPUS_SIZE,
+        store_type=EMBEDDING_STORE,
+        rescore_depth=RESCORE_DEPTH,
+        query_cache_size=QUERY_CACHE_SIZE,
+        query_cache_ttl=QUERY_CACHE_TTL_SECONDS,
+        shared=MODEL_WORKERS > 1,
+        encoder_backend=ENCODER_BACKEND,
+        encoder_threads=ENCODER_THREADS or None,
+        load_status=load_status,
+        cursor_cache_size=CURSOR_CACHE_SIZE,
+        cursor_ttl=CURSOR_TTL_SECONDS,
+        retrieval_mode=RETRIEVAL_MODE,
+        hybrid_candidates=HYBRID_CANDIDATES,
+        near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD,
+        encode_workers=ENCODE_WORKERS,
+        similar_jobs_k=SIMILAR_JOBS_K
+    )
+    logger.info("JobMatcher model loaded successfully in model service.")
+    
+    # Exercise the batch sizes the scheduler will actually use
+    loaded.warm_up(batch_sizes=(1, BATCH_MAX_SIZE))
+    return loaded
+
+async def load_in_background():
+    """Loads the model off the event loop, then starts serving matches"""
+    global matcher, batcher
     
-    # Startup
-    logger.info("Starting model service...")
     try:
-        MODEL_PATH = os.environ.get("MODEL_PATH", "/app/model/fine_tuned_mpnet_with_eval")
-        DATASET_PATH = os.environ.get("DATASET_PATH", "/app/dataset/job_vacancy.csv")
+        loaded = await asyncio.to_thread(load_matcher)
         
-        # Check if files exist before loading
-        if not os.path.exists(MODEL_PATH):
-            raise FileNotFoundError(f"Model path does not exist: {MODEL_PATH}")
-        if not os.path.exists(DATASET_PATH):
-            raise FileNotFoundError(f"Dataset path does not exist: {DATASET_PATH}")
-
-        matcher = JobMatcher(
-            model_path=str(MODEL_PATH),
-            dataset_path=str(DATASET_PATH)
+        new_batcher = MicroBatcher(
+            loaded.match_batch_json,
+            max_batch_size=BATCH_MAX_SIZE,
+            max_wait_ms=BATCH_MAX_WAIT_MS
         )
-        logger.info("JobMatcher model loaded successfully in model service.")
-    except FileNotFoundError as e:
-        logger.error(f"ERROR: A required file was not found: {e}")
-        raise SystemExit(f"Model loading failed: {e}")
+        await new_batcher.start()
+        batcher, matcher = new_batcher, loaded
+        load_status.finish()
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        logger.error(f"ERROR: An unexpected error occurred while loading the model: {e}")
-        raise SystemExit(f"An unexpected model loading error occurred: {e}")
+        if isinstance(e, FileNotFoundError):
+            logger.error(f"ERROR: A required file was not found: {e}")
+        else:
+            logger.exception(f"ERROR: An unexpected error occurred while loading the model: {e}")
+        load_status.fail(e)
+        # Exit with an error so supervisors see a failed start and the restart policy retries the load;
+        # a signal would look like a clean shutdown to uvicorn
+        logging.shutdown()
+        os._exit(1)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage the application lifecycle"""
+    global batcher
+    
+    # Startup: accept health checks right away while the model loads in the background
+    logger.info("Starting model service...")
+    loader = asyncio.create_task(load_in_background())
     
     yield
     
     # Shutdown
     logger.info("Shutting down model service...")
+    loader.cancel()
+    try:
+        await loader
+    except asyncio.CancelledError:
+        pass
+    if batcher is not None:
+        await batcher.stop()
+    release_worker()
 
 app = FastAPI(
     title="Job Matcher Model Service",
@@ -59,36 +168,322 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+class RequestMetricsMiddleware:
+    """
+    Records request latency and error responses per route template. Plain
+    ASGI, so it adds no buffering to streamed responses.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status = 500
+        
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                REQUEST_SECONDS.labels(scope["method"], route_of(scope)).observe(time.perf_counter() - start)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            if status >= 400:
+                REQUEST_ERRORS.labels(scope["method"], route_of(scope), status).inc()
+
+def route_of(scope) -> str:
+    # Route templates keep label values bounded (e.g. /admin/jobs/{job_id})
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+app.add_middleware(RequestMetricsMiddleware)
+
+# Gauges read at scrape time; samples are skipped until the model is loaded
+CORPUS_JOBS.set_function(lambda: len(matcher.snapshot))
+MEMORY_BYTES.set_function(lambda: matcher.snapshot.embeddings.nbytes, "embeddings")
+MEMORY_BYTES.set_function(lambda: matcher.snapshot.store.nbytes, "store")
+MEMORY_BYTES.set_function(lambda: matcher.snapshot.formatter.blob.nbytes, "result_fragments")
+# Only reported in hybrid retrieval mode
+MEMORY_BYTES.set_function(lambda: matcher.snapshot.keywords.nbytes, "keywords")
+MEMORY_BYTES.set_function(lambda: matcher.snapshot.similar.nbytes, "similar_jobs")
+MEMORY_BYTES.set_function(lambda: matcher.snapshot.companies.nbytes, "company_centroids")
+LOAD_PROGRESS.set_function(lambda: load_status.percent)
+
 # Request/Response models
+class JobFilters(BaseModel):
+    location: Optional[list[str]] = None
+    category: Optional[list[str]] = None
+    subcategory: Optional[list[str]] = None
+    type: Optional[list[str]] = None
+    listing_date_from: Optional[date] = None
+    listing_date_to: Optional[date] = None
+    salary_min: Optional[float] = None
+    salary_max: Optional[float] = None
+
 class JobMatchRequest(BaseModel):
-    resume_text: str
-    top_k: int = 5
+    resume_text: str = ""
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
+    filters: Optional[JobFilters] = None
+    # next_cursor of a previous response; resume_text and filters are then ignored
+    cursor: Optional[str] = None
 
 class JobMatchResponse(BaseModel):
     job_matches: list
+    next_cursor: Optional[str] = None
+
+class CompanyMatchRequest(BaseModel):
+    resume_text: str = ""
+    # next_cursor of a /match_jobs response, standing in for its resume
+    cursor: Optional[str] = None
+    # None ranks every company
+    top_k: Optional[int] = Field(None, ge=1, le=MAX_TOP_K)
+
+class BatchMatchItem(BaseModel):
+    id: Optional[str] = None
+    resume_text: str
+    top_k: int = Field(5, ge=1, le=MAX_TOP_K)
+    filters: Optional[JobFilters] = None
+
+class BatchMatchRequest(BaseModel):
+    items: list[BatchMatchItem]
+
+class JobRecord(BaseModel):
+    job_id: str
+    job_text: str
+    job_title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    category: Optional[str] = None
+    subcategory: Optional[str] = None
+    role: Optional[str] = None
+    type: Optional[str] = None
+    salary: Optional[str] = None
+    listingDate: Optional[str] = None
+
+class JobUpsertRequest(BaseModel):
+    jobs: list[JobRecord]
+
+class JobDeleteRequest(BaseModel):
+    job_ids: list[str]
+
+def filter_dict(filters: Optional[JobFilters]) -> Optional[dict]:
+    """Drops unset filter fields, returning None when nothing is filtered"""
+    return (filters.model_dump(exclude_none=True) or None) if filters else None
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Rejects admin calls without the configured token, and all of them when none is configured"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    # Each worker would only update its own copy of the corpus
+    if matcher is not None and matcher.shared:
+        raise HTTPException(status_code=409, detail="Corpus updates are not supported with MODEL_WORKERS > 1")
 
 @app.post("/match_jobs", response_model=JobMatchResponse)
 async def match_jobs(request: JobMatchRequest):
     """
     Find matching jobs for the given resume text.
+
+    Each response carries a next_cursor; sending it back (with a top_k) returns
+    the following page of the same ranking.
     """
-    global matcher
+    global matcher, batcher
     
-    if matcher is None:
+    if batcher is None:
         raise HTTPException(status_code=503, detail="Model not loaded yet. Please try again later.")
     
     try:
-        if not request.resume_text.strip():
-            raise HTTPException(status_code=400, detail="Resume text cannot be empty")
-        
-        job_matches = matcher.find_top_matches(request.resume_text, top_k=request.top_k)
+        if request.cursor:
+            # Later pages reuse the cursor's embedding and prefetched ranking
+            job_matches, next_cursor = await run_in_threadpool(matcher.match_page, request.cursor, request.top_k)
+        else:
+            if not request.resume_text.strip():
+                raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+            
+            filters = filter_dict(request.filters)
+            # Queued and batched with concurrent requests; encoding runs off the event loop
+            job_matches = await batcher.submit(request.resume_text, request.top_k, filters)
+            next_cursor = matcher.create_cursor(request.resume_text, request.top_k, filters)
         
-        return JobMatchResponse(job_matches=job_matches)
+        # Matches arrive pre-serialized, so skip re-validating them through JobMatchResponse
+        return Response(
+            content=b'{"job_matches": ' + job_matches + b', "next_cursor": ' + json.dumps(next_cursor).encode("utf-8") + b"}",
+            media_type="application/json"
+        )
     
+    except CursorError as e:
+        raise HTTPException(status_code=410 if e.expired else 400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Error during job matching")
         raise HTTPException(status_code=500, detail=f"Error during job matching: {str(e)}")
 
+@app.post("/match_jobs/batch")
+async def match_jobs_batch(request: BatchMatchRequest):
+    """
+    Find matching jobs for many resumes in one call.
+
+    Results are streamed back as NDJSON, one line per item in request order:
+    {"index": ..., "id": ..., "job_matches": [...]}, or {"index": ..., "id": ...,
+    "error": "..."} for items that could not be matched.
+    """
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded yet. Please try again later.")
+    
+    items = request.items
+    valid_positions = [i for i, item in enumerate(items) if item.resume_text.strip()]
+    
+    def generate():
+        next_position = 0
+        
+        def skipped_until(position):
+            # Emit errors for empty items that sit before the next matched one
+            nonlocal next_position
+            while next_position < position:
+                item = items[next_position]
+                yield json.dumps({"index": next_position, "id": item.id, "error": "Resume text cannot be empty"}) + "\n"
+                next_position += 1
+        
+        try:
+            results = matcher.iter_matches(
+                [items[i].resume_text for i in valid_positions],
+                [items[i].top_k for i in valid_positions],
+                [filter_dict(items[i].filters) for i in valid_positions],
+                chunk_size=BATCH_ENCODE_SIZE
+            )
+            for valid_index, job_matches in results:
+                position = valid_positions[valid_index]
+                yield from skipped_until(position)
+                if isinstance(job_matches, Exception):
+                    yield json.dumps({"index": position, "id": items[position].id, "error": f"Error during job matching: {str(job_matches)}"}) + "\n"
+                else:
+                    # job_matches is already serialized; splice it into the line
+                    yield json.dumps({"index": position, "id": items[position].id})[:-1] + ', "job_matches": ' + job_matches.decode("utf-8") + "}\n"
+                next_position = position + 1
+            yield from skipped_until(len(items))
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band for the remaining items
+            logger.exception("Error during batch job matching")
+            for position in range(next_position, len(items)):
+                yield json.dumps({"index": position, "id": items[position].id, "error": f"Error during job matching: {str(e)}"}) + "\n"
+    
+    # A sync generator is iterated in the threadpool, keeping encoding off the event loop
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.post("/match_companies")
+async def match_companies(request: CompanyMatchRequest):
+    """
+    Rank companies for a resume.
+
+    Each company is scored by the cosine similarity between the resume and the
+    mean embedding of its jobs, all companies in one matrix product.
+    """
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded yet. Please try again later.")
+    if not request.cursor and not request.resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text cannot be empty")
+    
+    try:
+        companies = await run_in_threadpool(matcher.match_companies, request.resume_text, request.cursor, request.top_k)
+        return {"companies": companies, "total_companies": len(matcher.snapshot.companies)}
+    
+    except CursorError as e:
+        raise HTTPException(status_code=410 if e.expired else 400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error during company matching")
+        raise HTTPException(status_code=500, detail=f"Error during company matching: {str(e)}")
+
+@app.get("/similar_jobs/{job_id}")
+async def similar_jobs(job_id: str, top_k: int = 5):
+    """
+    Find the jobs most similar to a given job.
+
+    Neighbours are precomputed for every job, so no resume is encoded and the
+    corpus is not scanned. A job_id of a collapsed repost returns the
+    neighbours of the job it was folded into.
+    """
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded yet. Please try again later.")
+    if matcher.snapshot.similar is None:
+        raise HTTPException(status_code=503, detail="Similar jobs are disabled (SIMILAR_JOBS_K=0)")
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1")
+    
+    try:
+        result = matcher.similar_jobs(job_id, top_k)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        
+        canonical_id, matches = result
+        return Response(
+            content=b'{"job_id": ' + json.dumps(canonical_id).encode("utf-8") + b', "similar_jobs": ' + matches + b"}",
+            media_type="application/json"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error finding similar jobs")
+        raise HTTPException(status_code=500, detail=f"Error finding similar jobs: {str(e)}")
+
+@app.post("/admin/jobs", dependencies=[Depends(require_admin)])
+async def upsert_jobs(request: JobUpsertRequest):
+    """
+    Insert or replace jobs by job_id. Only new or changed job texts are encoded,
+    and the updated corpus is swapped in atomically.
+    """
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded yet. Please try again later.")
+    if not request.jobs:
+        raise HTTPException(status_code=400, detail="No jobs provided")
+    if any(not job.job_text.strip() for job in request.jobs):
+        raise HTTPException(status_code=400, detail="Job text cannot be empty")
+    
+    try:
+        return await run_in_threadpool(matcher.upsert_jobs, [job.model_dump() for job in request.jobs])
+    except Exception as e:
+        logger.exception("Error upserting jobs")
+        raise HTTPException(status_code=500, detail=f"Error upserting jobs: {str(e)}")
+
+@app.post("/admin/jobs/delete", dependencies=[Depends(require_admin)])
+async def delete_jobs(request: JobDeleteRequest):
+    """Remove jobs by job_id"""
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded yet. Please try again later.")
+    
+    try:
+        return await run_in_threadpool(matcher.delete_jobs, request.job_ids)
+    except Exception as e:
+        logger.exception("Error deleting jobs")
+        raise HTTPException(status_code=500, detail=f"Error deleting jobs: {str(e)}")
+
+@app.delete("/admin/jobs/{job_id}", dependencies=[Depends(require_admin)])
+async def delete_job(job_id: str):
+    """Remove a single job by job_id"""
+    result = await delete_jobs(JobDeleteRequest(job_ids=[job_id]))
+    if result["deleted"] == 0:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return result
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -97,7 +492,63 @@ async def health_check():
     if matcher is None:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
-    return {"status": "healthy", "service": "job-matcher-model"}
+    return {"status": "healthy", "service": "job-matcher-model", "pid": os.getpid(), "shared_corpus": matcher.shared}
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up, including while the model is still loading"""
+    status = load_status.snapshot()
+    if status["error"]:
+        raise HTTPException(status_code=503, detail=status)
+    return {"status": "alive", **status}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 200 only once the model is loaded and warmed up"""
+    status = load_status.snapshot()
+    if not status["ready"]:
+        raise HTTPException(status_code=503, detail=status)
+    return {"status": "ready", **status}
+
+@app.get("/filters")
+async def filter_values():
+    """Distinct values accepted by the categorical /match_jobs filters"""
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    filter_index = matcher.snapshot.filters
+    return {field: filter_index.values(field) for field in filter_index.postings}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the resume embedding and result caches"""
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    return matcher.cache_stats()
+
+@app.get("/corpus/stats")
+async def corpus_stats():
+    """Size of the corpus and how much deduplication shrank it at load time"""
+    global matcher
+    
+    if matcher is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    return {
+        "corpus_version": matcher.corpus_version,
+        "total_jobs": len(matcher.snapshot),
+        "load": matcher.corpus_report,
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency histograms, batch sizes, queue depth, corpus size and errors in Prometheus text format"""
+    return Response(content=render(), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/")
 async def read_root():
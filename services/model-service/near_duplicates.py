@@ -0,0 +1,219 @@
+import argparse
+import logging
+import re
+import time
+import zlib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ALIAS_COLUMN = "alias_job_ids"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Dates, salaries and reference numbers change between reposts of a vacancy
+DIGITS_PATTERN = re.compile(r"\d+")
+
+_SHINGLE_MULTIPLIERS = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(1))
+
+
+def _tokens(text) -> list[str]:
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(DIGITS_PATTERN.sub("0", text.lower()))
+
+
+class _TokenHashes(dict):
+    """
+    Memoized CRC32 of tokens. Unlike hash(), it is the same in every process,
+    so signatures are identical across workers and restarts.
+    """
+
+    def __missing__(self, token: str) -> int:
+        value = self[token] = zlib.crc32(token.encode())
+        return value
+
+
+def _shingle_hashes(tokens: list[str], token_hashes: _TokenHashes, shingle_size: int) -> np.ndarray:
+    """
+    Hashes every run of shingle_size consecutive tokens (the whole text if it
+    is shorter).
+    """
+    hashes = np.array([token_hashes[token] for token in tokens], dtype=np.uint64)
+    size = min(shingle_size, len(hashes))
+    if size == 0:
+        return hashes
+    shingles = np.zeros(len(hashes) - size + 1, dtype=np.uint64)
+    for offset, multiplier in zip(range(size), _SHINGLE_MULTIPLIERS[-size:]):
+        shingles ^= hashes[offset:offset + len(shingles)] * multiplier
+    return shingles
+
+
+def minhash_signatures(texts: list, num_perm: int = 128, shingle_size: int = 3, seed: int = 0,
+                       chunk_rows: int = 256) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Computes a MinHash signature of each text's word shingles, after
+    lowercasing and replacing digit runs. Two signatures agree in roughly the
+    Jaccard similarity of the shingle sets.
+
+    Returns (signatures of shape (n, num_perm), mask of texts that had tokens).
+    """
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    increments = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    has_tokens = np.zeros(len(texts), dtype=bool)
+    token_hashes = _TokenHashes()
+    for start in range(0, len(texts), chunk_rows):
+        shingles = [_shingle_hashes(_tokens(text), token_hashes, shingle_size) for text in texts[start:start + chunk_rows]]
+        lengths = np.array([len(s) for s in shingles])
+        rows = np.flatnonzero(lengths)
+        if not len(rows):
+            continue
+        # Universal hashing per permutation (the high half of the product is the
+        # best mixed), laid out permutation-major so the per-text minimum runs
+        # over contiguous memory
+        values = np.multiply.outer(multipliers, np.concatenate(shingles))
+        values += increments[:, None]
+        values >>= np.uint64(32)
+        values = values.astype(np.uint32)
+        offsets = np.concatenate([[0], np.cumsum(lengths[rows])[:-1]])
+        signatures[start + rows] = np.minimum.reduceat(values, offsets, axis=1).T
+        has_tokens[start + rows] = True
+    return signatures, has_tokens
+
+
+def _band_keys(signatures: np.ndarray, groups: np.ndarray, band: slice) -> np.ndarray:
+    keys = groups.astype(np.uint64)
+    for column in signatures[:, band].T:
+        keys = keys * np.uint64(0x100000001B3) + column
+    return keys
+
+
+def _connected_labels(n: int, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    Labels each of n items with the smallest item it is linked to through
+    the given pairs.
+    """
+    labels = np.arange(n)
+    while True:
+        linked = np.minimum(labels[first], labels[second])
+        updated = labels.copy()
+        np.minimum.at(updated, first, linked)
+        np.minimum.at(updated, second, linked)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def near_duplicate_clusters(job_df: pd.DataFrame, threshold: float = 0.9, num_perm: int = 128,
+                            bands: int = 16) -> np.ndarray:
+    """
+    Labels each job with the cluster of reposts it belongs to.
+
+    Jobs are only compared within the same company and job title (compared
+    case-insensitively and ignoring digits). Within them, locality-sensitive
+    hashing over bands of the MinHash signatures finds candidate pairs, and
+    pairs whose signatures agree in at least threshold of their positions
+    (estimated shingle Jaccard similarity) are linked.
+    """
+    n = len(job_df)
+    signatures, has_tokens = minhash_signatures(job_df["job_text"].tolist(), num_perm=num_perm)
+    group_names = [" ".join(_tokens(company)) + "|" + " ".join(_tokens(title))
+                   for company, title in zip(job_df["company"].tolist(), job_df["job_title"].tolist())]
+    groups = pd.factorize(pd.Series(group_names))[0]
+
+    candidates = np.flatnonzero(has_tokens)
+    rows_per_band = num_perm // bands
+    first_parts, second_parts = [], []
+    for band in range(bands):
+        keys = _band_keys(signatures[candidates], groups[candidates], slice(band * rows_per_band, (band + 1) * rows_per_band))
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        run_start = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        # Each member of a bucket is paired with the bucket's first member
+        heads = order[np.maximum.accumulate(np.where(run_start, np.arange(len(order)), 0))]
+        members = ~run_start
+        first_parts.append(candidates[heads[members]])
+        second_parts.append(candidates[order[members]])
+
+    first = np.concatenate(first_parts) if first_parts else np.empty(0, dtype=np.int64)
+    second = np.concatenate(second_parts) if second_parts else np.empty(0, dtype=np.int64)
+    if len(first):
+        pairs = np.unique(np.stack([first, second], axis=1), axis=0)
+        agreement = np.concatenate([
+            (signatures[pairs[i:i + 65_536, 0]] == signatures[pairs[i:i + 65_536, 1]]).mean(axis=1)
+            for i in range(0, len(pairs), 65_536)
+        ])
+        first, second = pairs[agreement >= threshold].T
+    return _connected_labels(n, first, second)
+
+
+def collapse_near_duplicates(job_df: pd.DataFrame, threshold: float = 0.9,
+                             labels: Optional[np.ndarray] = None) -> tuple[pd.DataFrame, dict]:
+    """
+    Keeps one canonical job per cluster of reposts: the most recently listed
+    (the earliest row on ties). Its alias_job_ids column lists the job_ids of
+    the reposts folded into it (None for jobs without any). labels may pass
+    clusters computed earlier by near_duplicate_clusters.
+
+    Returns the collapsed table, in the original row order, and a report of
+    how much it shrank.
+    """
+    start = time.perf_counter()
+    if labels is None:
+        labels = near_duplicate_clusters(job_df, threshold=threshold)
+
+    listed = pd.to_datetime(job_df["listingDate"], errors="coerce", utc=True)
+    listed = (listed - pd.Timestamp(0, tz="UTC")).dt.total_seconds().fillna(-np.inf).to_numpy()
+    rows = np.arange(len(job_df))
+    order = np.lexsort((rows, -listed, labels))
+    is_canonical_position = np.r_[True, labels[order][1:] != labels[order][:-1]]
+
+    canonical_of_label = np.empty(len(job_df), dtype=np.int64)
+    canonical_of_label[labels[order][is_canonical_position]] = order[is_canonical_position]
+    canonical = canonical_of_label[labels]
+
+    aliases = {}
+    job_ids = job_df["job_id"].tolist()
+    for row in np.flatnonzero(canonical != rows):
+        aliases.setdefault(canonical[row], []).append(str(job_ids[row]))
+
+    kept = np.flatnonzero(canonical == rows)
+    collapsed = job_df.iloc[kept].reset_index(drop=True)
+    collapsed[ALIAS_COLUMN] = [aliases.get(row) for row in kept]
+
+    report = {
+        "input_jobs": len(job_df),
+        "near_duplicates": len(job_df) - len(kept),
+        "canonical_jobs_with_aliases": len(aliases),
+        "unique_jobs": len(kept),
+        "reduction_percent": round(100.0 * (len(job_df) - len(kept)) / max(len(job_df), 1), 2),
+        "threshold": threshold,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    logger.info(f"Collapsed {report['near_duplicates']} near-duplicate reposts into {len(aliases)} jobs; "
+                f"corpus shrank by {report['reduction_percent']}% to {len(kept)} jobs")
+    return collapsed, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report how many near-duplicate reposts a job CSV contains.")
+    parser.add_argument("dataset_path", help="Job CSV in the job_vacancy.csv format")
+    parser.add_argument("--threshold", type=float, nargs="+", default=[0.8, 0.9, 0.95])
+    parser.add_argument("--examples", type=int, default=3, help="Collapsed jobs printed per threshold")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    jobs = pd.read_csv(args.dataset_path).drop_duplicates("job_text").reset_index(drop=True)
+    for threshold in args.threshold:
+        collapsed, report = collapse_near_duplicates(jobs, threshold)
+        print(report)
+        examples = collapsed[collapsed[ALIAS_COLUMN].notna()].head(args.examples)
+        for job_id, title, company, aliases in examples[["job_id", "job_title", "company", ALIAS_COLUMN]].itertuples(index=False):
+            print(f"  {job_id} {title!r} at {company!r} <- {aliases}")
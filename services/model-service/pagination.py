@@ -0,0 +1,86 @@
+import base64
+import binascii
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+# Follow-up pages select this many pages ahead at once, so scrolling through
+# them is just slicing an already ranked list
+PREFETCH_PAGES = 5
+
+
+class CursorError(Exception):
+    """
+    Raised for cursors that are malformed, expired or belong to an older
+    corpus version.
+    """
+
+    def __init__(self, message: str, expired: bool = True):
+        super().__init__(message)
+        self.expired = expired
+
+
+@dataclass
+class MatchCursor:
+    """
+    State of a paginated match: what was searched, and the ranked results
+    selected so far as (ids, scores, exhausted), replaced as a whole when it
+    grows so concurrent readers never see a mix. Positions within the ranking
+    live in the cursor token, so retrying a page returns the same page.
+
+    The token also carries what was searched (see pack_cursor), so a worker
+    that never saw the cursor, or has evicted it, can rebuild it; the ranking
+    held here only saves repeating the search.
+    """
+    version: str
+    resume_text: str
+    resume_key: str
+    filters: Optional[dict]
+    created_at: float
+    embedding: Optional[np.ndarray] = None
+    ranking: Optional[tuple[np.ndarray, np.ndarray, bool]] = None
+
+    def covers(self, end: int) -> bool:
+        if self.ranking is None:
+            return False
+        ids, _, exhausted = self.ranking
+        return len(ids) >= end or exhausted
+
+
+def pack_cursor(cursor: MatchCursor) -> str:
+    """
+    Packs a cursor's corpus version, resume text, filters (dates as ISO
+    strings) and creation time into a URL-safe cursor id, compressed to
+    roughly half the resume's size.
+    """
+    state = {"v": cursor.version, "t": cursor.resume_text, "f": cursor.filters, "c": int(cursor.created_at)}
+    packed = zlib.compress(json.dumps(state, separators=(",", ":"), default=str).encode("utf-8"))
+    return base64.urlsafe_b64encode(packed).decode("ascii").rstrip("=")
+
+
+def unpack_cursor(cursor_id: str) -> tuple[str, str, Optional[dict], float]:
+    """
+    Returns the (version, resume_text, filters, created_at) packed into a
+    cursor id by pack_cursor.
+    """
+    try:
+        state = json.loads(zlib.decompress(base64.urlsafe_b64decode(cursor_id + "=" * (-len(cursor_id) % 4))))
+        if state["f"] is not None and not isinstance(state["f"], dict):
+            raise TypeError("filters must be an object")
+        return str(state["v"]), str(state["t"]), state["f"], float(state["c"])
+    except (binascii.Error, zlib.error, ValueError, TypeError, KeyError) as e:
+        raise CursorError("Malformed cursor", expired=False) from e
+
+
+def encode_token(cursor_id: str, offset: int) -> str:
+    return f"{cursor_id}.{offset}"
+
+
+def decode_token(token: str) -> tuple[str, int]:
+    cursor_id, _, offset = token.rpartition(".")
+    if not cursor_id or not offset.isdigit():
+        raise CursorError("Malformed cursor", expired=False)
+    return cursor_id, int(offset)
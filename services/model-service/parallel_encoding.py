@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows encoded (and checkpointed) per task; a crash loses at most one shard per worker
+SHARD_ROWS = 4096
+
+PARTIAL_EMBEDDINGS_FILE = "embeddings.npy"
+DONE_FILE = "done.npy"
+PLAN_FILE = "plan.json"
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """
+    CPUs allowed by the cgroup CPU quota (docker's --cpus), or None when
+    unlimited or not in a cgroup. Reads cgroup v2 cpu.max, then v1 cfs files.
+    """
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def available_cores() -> int:
+    """
+    CPUs this process may use: its CPU affinity (container CPU sets), capped
+    by the cgroup CPU quota, which is how compose's cpus limit is enforced.
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cores = min(cores, max(int(quota), 1))
+    return cores
+
+
+def length_order(texts: list[str]) -> np.ndarray:
+    """
+    Orders texts by length, so each batch holds texts of similar token counts
+    and little of it is padding. Character length stands in for token length,
+    as in SentenceTransformer.encode. The order is stable, so an interrupted
+    build resumes with the same shards.
+    """
+    return np.argsort(np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts)), kind="stable")
+
+
+def encode_rows(model, texts: list[str], batch_size: int,
+                progress: Optional[Callable[[int], None]] = None) -> np.ndarray:
+    """
+    Encodes texts (already in length order) batch by batch into L2-normalized
+    float32 vectors. progress, if given, is called with the rows done so far.
+    """
+    embeddings = np.empty((len(texts), model.get_sentence_embedding_dimension()), dtype=np.float32)
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        embeddings[start:start + len(batch)] = model.encode(
+            batch, batch_size=len(batch), convert_to_numpy=True, normalize_embeddings=True, show_progress_bar=False
+        )
+        if progress is not None:
+            progress(start + len(batch))
+    return embeddings
+
+
+# Encoder of a pool worker, loaded once by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_path: str, backend: str, threads: int, encoder):
+    global _worker_model
+    if encoder is not None:
+        _worker_model = encoder
+    else:
+        from encoders import load_encoder
+        _worker_model = load_encoder(model_path, backend, threads)
+
+
+def _encode_shard(shard: int, rows: np.ndarray, texts: list[str], output_path: str, batch_size: int) -> int:
+    output = np.load(output_path, mmap_mode="r+")
+    output[rows] = encode_rows(_worker_model, texts, batch_size)
+    output.flush()
+    return shard
+
+
+class CorpusEncoder:
+    """
+    Encodes a corpus into a preallocated .npy file, optionally across a pool
+    of worker processes.
+
+    Texts are ordered by length and cut into shards of SHARD_ROWS; each
+    worker loads the encoder once and writes whole shards straight into the
+    memory-mapped output. Finished shards are recorded in a bitmap next to
+    it, so a build interrupted by a crash or restart resumes where it stopped
+    as long as the same work_dir is used.
+    """
+
+    def __init__(self, model, batch_size: int = 32, workers: int = 1, model_path: Optional[str] = None,
+                 backend: str = "torch", threads: Optional[int] = None, pass_model: bool = False):
+        """
+        workers above 1 encode in that many spawned processes, each loading the
+        encoder from model_path with backend (or receiving a pickled copy of
+        model when pass_model is set, for stand-in encoders) and running
+        threads intra-op threads, by default an equal share of the available
+        cores.
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.model_path = model_path
+        self.backend = backend
+        self.threads = threads
+        self.pass_model = pass_model
+
+    def encode(self, texts: list[str], work_dir: Optional[Path] = None,
+               progress: Optional[Callable[[float], None]] = None) -> np.ndarray:
+        """
+        Returns embeddings for texts in their original order. With work_dir,
+        the output (and its resume state) lives there and is returned
+        memory-mapped; without, a single worker encodes in memory.
+        """
+        if work_dir is None and self.workers == 1:
+            order = length_order(texts)
+            embeddings = np.empty((len(texts), self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+            report = (lambda done: progress(done / len(texts))) if progress is not None else None
+            embeddings[order] = encode_rows(self.model, [texts[i] for i in order], self.batch_size, report)
+            return embeddings
+
+        if work_dir is None:
+            scratch = Path(tempfile.mkdtemp(prefix="encode-"))
+            try:
+                return np.array(self._encode_to(texts, scratch, progress))
+            finally:
+                shutil.rmtree(scratch, ignore_errors=True)
+        return self._encode_to(texts, Path(work_dir), progress)
+
+    def _encode_to(self, texts: list[str], work_dir: Path, progress: Optional[Callable[[float], None]]) -> np.ndarray:
+        order = length_order(texts)
+        shards = [order[start:start + SHARD_ROWS] for start in range(0, len(texts), SHARD_ROWS)]
+        output, done = self._open(work_dir, len(texts))
+        pending = [shard for shard in range(len(shards)) if not done[shard]]
+
+        finished_rows = sum(len(shards[shard]) for shard in range(len(shards)) if done[shard])
+        if finished_rows:
+            logger.info(f"Resuming corpus encoding: {finished_rows}/{len(texts)} rows already encoded")
+        start_time = time.perf_counter()
+
+        def record(shard: int):
+            nonlocal finished_rows
+            done[shard] = True
+            done.flush()
+            finished_rows += len(shards[shard])
+            if progress is not None:
+                progress(finished_rows / len(texts))
+            logger.info(f"Encoded {finished_rows}/{len(texts)} job descriptions")
+
+        if self.workers == 1 or len(pending) <= 1:
+            for shard in pending:
+                output[shards[shard]] = encode_rows(self.model, [texts[i] for i in shards[shard]], self.batch_size)
+                output.flush()
+                record(shard)
+        else:
+            self._encode_in_pool(texts, shards, pending, work_dir / PARTIAL_EMBEDDINGS_FILE, record)
+
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"Encoded {sum(len(shards[s]) for s in pending)} texts in {elapsed:.1f}s with {self.workers} worker(s)")
+        return np.load(work_dir / PARTIAL_EMBEDDINGS_FILE, mmap_mode="r")
+
+    def _encode_in_pool(self, texts: list[str], shards: list[np.ndarray], pending: list[int], output_path: Path,
+                        record: Callable[[int], None]):
+        workers = min(self.workers, len(pending))
+        threads = self.threads or max(1, available_cores() // workers)
+        # Spawned workers start without the parent's torch thread pools (forking them can deadlock)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker,
+            initargs=(self.model_path, self.backend, threads, self.model if self.pass_model else None)
+        ) as pool:
+            # Keep a couple of shards queued per worker so texts are not all pickled up front
+            queue = list(pending)
+            running = set()
+            while queue or running:
+                while queue and len(running) < 2 * workers:
+                    shard = queue.pop(0)
+                    running.add(pool.submit(_encode_shard, shard, shards[shard], [texts[i] for i in shards[shard]],
+                                            str(output_path), self.batch_size))
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(future.result())
+
+    def _open(self, work_dir: Path, rows: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Opens the output and done bitmap in work_dir, reusing them if they
+        belong to the same build plan.
+        """
+        dim = self.model.get_sentence_embedding_dimension()
+        plan = {"rows": rows, "dim": dim, "shard_rows": SHARD_ROWS}
+        plan_path = work_dir / PLAN_FILE
+        try:
+            with open(plan_path) as f:
+                resumable = json.load(f) == plan
+        except (OSError, ValueError):
+            resumable = False
+
+        if resumable:
+            try:
+                return (np.load(work_dir / PARTIAL_EMBEDDINGS_FILE, mmap_mode="r+"),
+                        np.load(work_dir / DONE_FILE, mmap_mode="r+"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Restarting corpus encoding, unreadable partial build in {work_dir}: {e}")
+
+        shutil.rmtree(work_dir, ignore_errors=True)
+        work_dir.mkdir(parents=True)
+        output = np.lib.format.open_memmap(work_dir / PARTIAL_EMBEDDINGS_FILE, mode="w+", dtype=np.float32, shape=(rows, dim))
+        done = np.lib.format.open_memmap(work_dir / DONE_FILE, mode="w+", dtype=bool,
+                                         shape=((rows + SHARD_ROWS - 1) // SHARD_ROWS,))
+        # Written last, so a plan file always describes complete files
+        with open(plan_path, "w") as f:
+            json.dump(plan, f)
+        return output, done
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from metrics import CACHE_LOOKUPS
+
+
+def text_key(text: str) -> str:
+    """
+    Hashes a query text into a compact cache key.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a per-entry time-to-live.
+
+    A max_size of 0 disables the cache: every lookup is a miss and nothing is
+    stored. Caches given a metric_name also count their lookups in the
+    model_cache_lookups_total metric.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 600.0, metric_name: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._hit_metric = CACHE_LOOKUPS.labels(metric_name, "hit") if metric_name else None
+        self._miss_metric = CACHE_LOOKUPS.labels(metric_name, "miss") if metric_name else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                self._count(self._miss_metric)
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                self._count(self._miss_metric)
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._count(self._hit_metric)
+            return value
+
+    @staticmethod
+    def _count(metric):
+        if metric is not None:
+            metric.inc()
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
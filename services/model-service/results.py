@@ -0,0 +1,146 @@
+import json
+import logging
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from near_duplicates import ALIAS_COLUMN
+
+logger = logging.getLogger(__name__)
+
+# Response field -> job_df column, in response order
+RESULT_FIELDS = [
+    ("job_id", "job_id"),
+    ("job_title", "job_title"),
+    ("job_description", "job_text"),
+    ("company", "company"),
+    ("location", "location"),
+    ("category", "category"),
+    ("subcategory", "subcategory"),
+    ("role", "role"),
+    ("type", "type"),
+    ("salary", "salary"),
+    ("listingDate", "listingDate"),
+    ("duplicate_job_ids", ALIAS_COLUMN),
+]
+# Fields holding lists of strings rather than strings
+LIST_FIELDS = {"duplicate_job_ids"}
+
+
+def clean_column(values: pd.Series) -> np.ndarray:
+    """
+    Converts a column to an object array of str, with None for missing values.
+    """
+    return np.array([str(v) if pd.notna(v) else None for v in values], dtype=object)
+
+
+def clean_list_column(values: pd.Series) -> np.ndarray:
+    """
+    Converts a column of lists to an object array of lists of str, with None
+    for missing values.
+    """
+    cleaned = np.empty(len(values), dtype=object)
+    for row, value in enumerate(values):
+        cleaned[row] = [str(v) for v in value] if isinstance(value, (list, tuple, np.ndarray)) else None
+    return cleaned
+
+
+class ResultFormatter:
+    """
+    Builds match results from data prepared once at load time.
+
+    Each job's fields are cleaned into per-column arrays for dict results, and
+    serialized into a JSON object fragment that stops right before its score
+    ({"job_id": ..., "listingDate": ..., "score":). Fragments live in one
+    contiguous byte buffer indexed by an offsets array, so building a JSON
+    response is a gather plus a join, with no per-field Python work.
+
+    The blob and offsets may be memory-mapped from the corpus artifact and
+    shared between worker processes; such formatters have no columns and
+    decode dict results from the fragments.
+    """
+
+    def __init__(self, columns: Optional[dict[str, np.ndarray]], blob: np.ndarray, offsets: np.ndarray):
+        self.columns = columns
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def from_frame(cls, job_df: pd.DataFrame) -> "ResultFormatter":
+        columns = {
+            field: (clean_list_column if field in LIST_FIELDS else clean_column)(job_df[column])
+            for field, column in RESULT_FIELDS
+        }
+
+        fragments = []
+        for row in zip(*columns.values()):
+            record = json.dumps(dict(zip(columns.keys(), row)), ensure_ascii=False)
+            fragments.append((record[:-1] + ', "score": ').encode("utf-8"))
+
+        offsets = np.zeros(len(fragments) + 1, dtype=np.int64)
+        np.cumsum([len(f) for f in fragments], out=offsets[1:])
+        blob = np.frombuffer(b"".join(fragments), dtype=np.uint8)
+
+        logger.info(f"Prepared result fragments for {len(fragments)} jobs ({blob.nbytes / 2**20:.1f} MB)")
+        return cls(columns, blob, offsets)
+
+    def derive(self, job_df: pd.DataFrame, source_rows: np.ndarray) -> "ResultFormatter":
+        """
+        Returns a formatter for a changed job table. Rows whose source_rows
+        entry points at an unchanged job in this formatter reuse its cleaned
+        values and fragment; only rows marked -1 are cleaned and serialized.
+        """
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        reused = source_rows >= 0
+        fresh = ResultFormatter.from_frame(job_df[~reused])
+        new_rows = np.flatnonzero(~reused)
+
+        columns = {}
+        for field, values in self.columns.items():
+            column = np.empty(len(source_rows), dtype=object)
+            column[reused] = values[source_rows[reused]]
+            column[new_rows] = fresh.columns[field]
+            columns[field] = column
+
+        fragments = []
+        fresh_position = 0
+        for source in source_rows.tolist():
+            if source >= 0:
+                fragments.append(self.blob[self.offsets[source]:self.offsets[source + 1]].tobytes())
+            else:
+                fragments.append(fresh.blob[fresh.offsets[fresh_position]:fresh.offsets[fresh_position + 1]].tobytes())
+                fresh_position += 1
+
+        offsets = np.zeros(len(fragments) + 1, dtype=np.int64)
+        np.cumsum([len(f) for f in fragments], out=offsets[1:])
+        return ResultFormatter(columns, np.frombuffer(b"".join(fragments), dtype=np.uint8), offsets)
+
+    def records(self, ids: np.ndarray, scores: np.ndarray) -> list[dict]:
+        """
+        Gathers job match dictionaries for index hits (best first).
+        """
+        if self.columns is None:
+            return json.loads(self.json_array(ids, scores))
+        gathered = {field: values[ids] for field, values in self.columns.items()}
+        return [
+            {**{field: gathered[field][i] for field in gathered}, "score": round(float(score), 4)}
+            for i, score in enumerate(scores)
+        ]
+
+    def json_array(self, ids: np.ndarray, scores: np.ndarray) -> bytes:
+        """
+        Returns the serialized JSON array of job matches for index hits.
+        """
+        blob = self.blob
+        starts = self.offsets[ids].tolist()
+        ends = self.offsets[np.asarray(ids) + 1].tolist()
+        # repr() of a finite float is exactly its JSON encoding
+        parts = [
+            blob[start:end].tobytes() + repr(round(score, 4)).encode() + b"}"
+            for start, end, score in zip(starts, ends, np.asarray(scores, dtype=np.float64).tolist())
+        ]
+        return b"[" + b", ".join(parts) + b"]"
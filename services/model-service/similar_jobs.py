@@ -0,0 +1,185 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+from ann_index import ExactIndex, IVFIndex, top_k_indices
+from vector_store import Float32Store
+
+logger = logging.getLogger(__name__)
+
+ARRAY_NAMES = ("neighbors", "scores")
+
+
+class SimilarJobsGraph:
+    """
+    The k most similar jobs of every job (cosine similarity of their
+    embeddings), precomputed so a lookup needs neither the encoder nor a
+    corpus scan.
+
+    neighbors holds the rows of each job's neighbours, best first, padded with
+    -1 when the corpus has fewer than k other jobs; scores holds their
+    similarities.
+    """
+
+    def __init__(self, neighbors: np.ndarray, scores: np.ndarray):
+        self.neighbors = neighbors
+        self.scores = scores
+
+    def __len__(self):
+        return self.neighbors.shape[0]
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.neighbors.nbytes + self.scores.nbytes)
+
+    @classmethod
+    def build(cls, index, embeddings: np.ndarray, k: int, block_rows: int = 1024) -> "SimilarJobsGraph":
+        """
+        Searches the index with every job's own embedding, block_rows jobs at a
+        time.
+        """
+        start = time.perf_counter()
+        neighbors = np.full((embeddings.shape[0], k), -1, dtype=np.int32)
+        scores = np.full((embeddings.shape[0], k), -np.inf, dtype=np.float32)
+        for block_start in range(0, embeddings.shape[0], block_rows):
+            rows = np.arange(block_start, min(block_start + block_rows, embeddings.shape[0]))
+            neighbors[rows], scores[rows] = _search_neighbors(index, embeddings, rows, k)
+        logger.info(f"Built similar-jobs graph with {k} neighbours for {embeddings.shape[0]} jobs "
+                    f"in {time.perf_counter() - start:.1f}s")
+        return cls(neighbors, scores)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """
+        Returns the graph arrays, for persisting next to the embeddings.
+        """
+        return {"neighbors": self.neighbors, "scores": self.scores}
+
+    def refreshed(self, index, embeddings: np.ndarray, source_rows: np.ndarray) -> "SimilarJobsGraph":
+        """
+        Returns the graph for a changed corpus, whose rows carry over the
+        embedding of source_rows (-1 for newly encoded ones).
+
+        Surviving neighbour lists are renumbered; each added job is searched
+        in the index, and scored against every other job so it can enter their
+        lists. Only jobs that lost a neighbour to a deletion are searched
+        again.
+        """
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        k = self.k
+        reused = np.flatnonzero(source_rows >= 0)
+        added = np.flatnonzero(source_rows < 0)
+
+        new_row_of = np.full(len(self) + 1, -1, dtype=np.int64)
+        new_row_of[source_rows[reused]] = reused
+        neighbors = np.full((len(source_rows), k), -1, dtype=np.int64)
+        scores = np.full((len(source_rows), k), -np.inf, dtype=np.float32)
+        # -1 padding maps to the extra -1 slot at the end of new_row_of
+        neighbors[reused] = new_row_of[np.asarray(self.neighbors[source_rows[reused]], dtype=np.int64)]
+        scores[reused] = np.where(neighbors[reused] >= 0, self.scores[source_rows[reused]], -np.inf)
+
+        if len(added):
+            added_vectors = np.asarray(embeddings[added], dtype=np.float32)
+            for block_start in range(0, len(reused), 65_536):
+                rows = reused[block_start:block_start + 65_536]
+                merged_ids = np.concatenate([neighbors[rows], np.broadcast_to(added, (len(rows), len(added)))], axis=1)
+                merged_scores = np.concatenate([scores[rows], np.asarray(embeddings[rows], dtype=np.float32) @ added_vectors.T], axis=1)
+                merged_scores[merged_ids < 0] = -np.inf
+                best = top_k_indices(merged_scores, k)
+                neighbors[rows] = np.take_along_axis(merged_ids, best, axis=1)
+                scores[rows] = np.take_along_axis(merged_scores, best, axis=1)
+            neighbors[np.isneginf(scores)] = -1
+
+        full = min(k, len(source_rows) - 1)
+        stale = np.flatnonzero(np.count_nonzero(neighbors >= 0, axis=1) < full)
+        for block_start in range(0, len(stale), 1024):
+            rows = stale[block_start:block_start + 1024]
+            neighbors[rows], scores[rows] = _search_neighbors(index, embeddings, rows, k)
+        logger.info(f"Refreshed similar-jobs graph: {len(added)} jobs added, {len(stale)} neighbour lists searched")
+        return SimilarJobsGraph(neighbors.astype(np.int32), scores)
+
+    def neighbors_of(self, row: int, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the (rows, scores) of up to top_k neighbours of a job.
+        """
+        ids = np.asarray(self.neighbors[row, :top_k], dtype=np.int64)
+        found = ids >= 0
+        return ids[found], np.asarray(self.scores[row, :top_k])[found]
+
+
+def _search_neighbors(index, embeddings: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the k nearest other jobs of the given rows, found by searching
+    the index with their embeddings.
+    """
+    ids, scores = index.search(np.asarray(embeddings[rows], dtype=np.float32), k + 1)
+    is_self = ids == rows[:, None]
+    ids[is_self] = -1
+    scores[is_self] = -np.inf
+    best = top_k_indices(scores, k)
+    ids = np.take_along_axis(ids, best, axis=1)
+    scores = np.take_along_axis(scores, best, axis=1)
+    ids[np.isneginf(scores)] = -1
+    return ids, scores
+
+
+def build_similar_jobs(index, embeddings: np.ndarray, k: int, cache=None) -> SimilarJobsGraph:
+    """
+    Builds the similar-jobs graph for a corpus. If an EmbeddingCache is
+    passed, the graph is saved next to the embedding artifact and
+    memory-mapped back.
+    """
+    graph = SimilarJobsGraph.build(index, embeddings, k)
+    if cache is None:
+        return graph
+    for name, array in graph.arrays().items():
+        cache.save_array(f"similar_{name}", array)
+    return load_similar_jobs(cache, embeddings.shape[0], k)
+
+
+def load_similar_jobs(cache, expected_rows: int, k: int) -> Optional[SimilarJobsGraph]:
+    """
+    Maps a similar-jobs graph of k neighbours for expected_rows jobs from the
+    artifact cache, if there is one.
+    """
+    arrays = {name: cache.load_array(f"similar_{name}") for name in ARRAY_NAMES}
+    if any(array is None for array in arrays.values()) or arrays["neighbors"].shape != (expected_rows, k):
+        return None
+    logger.info(f"Loaded similar-jobs graph with {k} neighbours from cache")
+    return SimilarJobsGraph(**arrays)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report build time and recall@k of the similar-jobs graph "
+                                                 "for a cached embedding artifact.")
+    parser.add_argument("embeddings", help="Path to an embeddings.npy artifact")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--sample", type=int, default=500, help="Jobs checked against brute force")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    corpus = np.load(args.embeddings, mmap_mode="r")
+    store = Float32Store(corpus)
+    sample = np.random.default_rng(0).choice(corpus.shape[0], size=min(args.sample, corpus.shape[0]), replace=False)
+    exact_ids, _ = _search_neighbors(ExactIndex(store), corpus, sample, args.k)
+    ivf = IVFIndex.build(corpus, store)
+    for probe in args.n_probe:
+        ivf.n_probe = probe
+        start = time.perf_counter()
+        ids, _ = _search_neighbors(ivf, corpus, sample, args.k)
+        seconds_per_job = (time.perf_counter() - start) / len(sample)
+        hits = sum(len(np.intersect1d(e[e >= 0], a[a >= 0])) for e, a in zip(exact_ids, ids))
+        print({
+            "n_probe": probe,
+            "k": args.k,
+            "recall_at_k": round(hits / max(np.count_nonzero(exact_ids >= 0), 1), 4),
+            "estimated_build_seconds": round(seconds_per_job * corpus.shape[0], 1),
+        })
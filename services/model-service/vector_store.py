@@ -0,0 +1,287 @@
+import argparse
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows converted to float32 at a time when scanning a compact store, which
+# bounds the temporary memory of a full-corpus scan.
+SCAN_BLOCK_ROWS = 65_536
+
+
+class Float32Store:
+    """
+    Full-precision store: scores are exact, so no re-scoring is needed.
+    """
+    kind = "float32"
+
+    def __init__(self, embeddings: np.ndarray):
+        self.vectors = embeddings
+        self.exact = None
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vectors.nbytes)
+
+    def scores(self, queries: np.ndarray, rows: Optional[Union[slice, np.ndarray]] = None) -> np.ndarray:
+        """
+        Returns the (n_queries, n_rows) inner products against all rows, a
+        contiguous slice of rows, or selected row ids.
+        """
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        return np.atleast_2d(queries) @ vectors.T
+
+    def candidate_count(self, top_k: int) -> int:
+        return top_k
+
+    def refreshed(self, embeddings: np.ndarray, source_rows: np.ndarray) -> "Float32Store":
+        """
+        Returns the store for a changed corpus, whose rows carry over the
+        vectors of source_rows (-1 for newly encoded ones).
+        """
+        return Float32Store(embeddings)
+
+    def refine(self, query: np.ndarray, ids: np.ndarray, scores: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Narrows a best-first candidate list down to the final top_k.
+        """
+        return ids[:top_k], scores[:top_k]
+
+
+class _QuantizedStore(Float32Store, ABC):
+    """
+    Base for compact stores. Candidates are ranked on the compact vectors, then
+    the best rescore_depth of them are re-scored against the float32 vectors,
+    which are normally the memory-mapped embedding artifact so only the
+    re-scored rows are ever paged in.
+    """
+
+    # Names of the arrays making up the compact vectors, for persisting them
+    parts = ("vectors",)
+
+    def __init__(self, embeddings: np.ndarray, rescore_depth: int = 50, vectors=None):
+        self.exact = embeddings
+        self.rescore_depth = rescore_depth
+        self.vectors = self._encode(embeddings) if vectors is None else vectors
+
+    def arrays(self) -> tuple:
+        return (self.vectors,)
+
+    @classmethod
+    def from_arrays(cls, embeddings: np.ndarray, arrays: tuple, rescore_depth: int = 50):
+        return cls(embeddings, rescore_depth=rescore_depth, vectors=arrays[0])
+
+    @abstractmethod
+    def _encode(self, embeddings: np.ndarray):
+        """
+        Returns the compact vectors of float32 embeddings: one array, or a tuple
+        with one array per name in parts.
+        """
+
+    @abstractmethod
+    def _decode(self, rows: Union[slice, np.ndarray]) -> np.ndarray:
+        """
+        Returns the given rows of the compact vectors as float32.
+        """
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int:
+        """
+        Size of the compact vectors.
+        """
+
+    def scores(self, queries: np.ndarray, rows: Optional[Union[slice, np.ndarray]] = None) -> np.ndarray:
+        queries = np.atleast_2d(queries)
+        if rows is not None:
+            return queries @ self._decode(rows).T
+
+        result = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), SCAN_BLOCK_ROWS):
+            block = slice(start, min(start + SCAN_BLOCK_ROWS, len(self)))
+            result[:, block] = queries @ self._decode(block).T
+        return result
+
+    def candidate_count(self, top_k: int) -> int:
+        return max(top_k, self.rescore_depth)
+
+    def refreshed(self, embeddings: np.ndarray, source_rows: np.ndarray) -> "_QuantizedStore":
+        """
+        Returns the store for a changed corpus, re-scoring against embeddings.
+        Compact vectors of carried-over rows are copied and only the newly
+        encoded rows (source_rows -1) are quantized, so the float32 corpus is
+        never materialized.
+        """
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        reused = np.flatnonzero(source_rows >= 0)
+        added = np.flatnonzero(source_rows < 0)
+        encoded = self._encode(np.asarray(embeddings[added], dtype=np.float32))
+        encoded = encoded if isinstance(encoded, tuple) else (encoded,)
+        arrays = []
+        for part, added_part in zip(self.arrays(), encoded):
+            array = np.empty((len(source_rows),) + part.shape[1:], dtype=part.dtype)
+            array[reused] = part[source_rows[reused]]
+            array[added] = added_part
+            arrays.append(array)
+        return self.from_arrays(embeddings, arrays, rescore_depth=self.rescore_depth)
+
+    def refine(self, query: np.ndarray, ids: np.ndarray, scores: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        ids = ids[ids >= 0]
+        # Gather rows in ascending order so memory-mapped reads stay sequential
+        ascending = np.argsort(ids)
+        exact_scores = np.empty(len(ids), dtype=np.float32)
+        exact_scores[ascending] = self.exact[ids[ascending]] @ query
+        order = np.argsort(-exact_scores, kind="stable")[:top_k]
+        return ids[order], exact_scores[order]
+
+
+class Float16Store(_QuantizedStore):
+    """
+    Pre-normalized vectors stored as float16 (2x smaller than float32).
+    """
+    kind = "float16"
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    def _encode(self, embeddings):
+        vectors = np.empty(embeddings.shape, dtype=np.float16)
+        for start in range(0, embeddings.shape[0], SCAN_BLOCK_ROWS):
+            vectors[start:start + SCAN_BLOCK_ROWS] = embeddings[start:start + SCAN_BLOCK_ROWS]
+        return vectors
+
+    def _decode(self, rows):
+        return self.vectors[rows].astype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vectors.nbytes)
+
+
+class Int8Store(_QuantizedStore):
+    """
+    Symmetric int8 codes with one float32 scale per vector (~4x smaller).
+    """
+    kind = "int8"
+    parts = ("codes", "scales")
+
+    def __len__(self):
+        return self.vectors[0].shape[0]
+
+    def arrays(self) -> tuple:
+        return self.vectors
+
+    @classmethod
+    def from_arrays(cls, embeddings: np.ndarray, arrays: tuple, rescore_depth: int = 50):
+        return cls(embeddings, rescore_depth=rescore_depth, vectors=tuple(arrays))
+
+    def _encode(self, embeddings):
+        codes = np.empty(embeddings.shape, dtype=np.int8)
+        scales = np.empty(embeddings.shape[0], dtype=np.float32)
+        for start in range(0, embeddings.shape[0], SCAN_BLOCK_ROWS):
+            block = np.asarray(embeddings[start:start + SCAN_BLOCK_ROWS], dtype=np.float32)
+            block_scales = np.abs(block).max(axis=1) / 127.0
+            block_scales[block_scales == 0] = 1.0
+            codes[start:start + block.shape[0]] = np.rint(block / block_scales[:, None]).astype(np.int8)
+            scales[start:start + block.shape[0]] = block_scales
+        return codes, scales
+
+    def _decode(self, rows):
+        codes, scales = self.vectors
+        return codes[rows].astype(np.float32) * scales[rows][:, None]
+
+    @property
+    def nbytes(self) -> int:
+        codes, scales = self.vectors
+        return int(codes.nbytes + scales.nbytes)
+
+
+STORE_TYPES = {store.kind: store for store in (Float32Store, Float16Store, Int8Store)}
+
+
+def build_store(embeddings: np.ndarray, kind: str = "float32", rescore_depth: int = 50, cache=None):
+    """
+    Wraps the float32 corpus embeddings in the requested store type.
+
+    With an EmbeddingCache, compact vectors are stored in the artifact and
+    memory-mapped, so they are encoded once and shared by every process.
+    """
+    if kind not in STORE_TYPES:
+        raise ValueError(f"Unknown embedding store type: {kind}")
+    if kind == "float32":
+        store = Float32Store(embeddings)
+    else:
+        if not isinstance(embeddings, np.memmap):
+            logger.warning(
+                f"{kind} store requested without an on-disk embedding cache; float32 vectors "
+                f"stay in memory for re-scoring, so no memory is saved"
+            )
+        store_type = STORE_TYPES[kind]
+        names = [f"store_{kind}_{part}" for part in store_type.parts]
+        cached = [cache.load_array(name) for name in names] if cache is not None else [None]
+        if all(array is not None and len(array) == len(embeddings) for array in cached):
+            store = store_type.from_arrays(embeddings, cached, rescore_depth=rescore_depth)
+        else:
+            store = store_type(embeddings, rescore_depth=rescore_depth)
+            if cache is not None:
+                for name, array in zip(names, store.arrays()):
+                    cache.save_array(name, array)
+                store = store_type.from_arrays(embeddings, [cache.load_array(name) for name in names],
+                                               rescore_depth=rescore_depth)
+
+    logger.info(
+        f"Embedding store: {store.kind}, {store.nbytes / 2**20:.1f} MB resident "
+        f"(float32 would be {embeddings.nbytes / 2**20:.1f} MB)"
+    )
+    return store
+
+
+def quantization_report(store, embeddings: np.ndarray, queries: np.ndarray, top_k: int = 5) -> dict:
+    """
+    Compares a store's final ranking with exact float32 ranking: recall@k of the
+    top_k sets, and the largest score error before re-scoring.
+    """
+    from ann_index import top_k_indices
+
+    exact_scores = queries @ np.asarray(embeddings, dtype=np.float32).T
+    compact_scores = store.scores(queries)
+    exact_ids = top_k_indices(exact_scores, top_k)
+    candidate_ids = top_k_indices(compact_scores, store.candidate_count(top_k))
+
+    hits = 0
+    for query, exact_row, candidates, scores in zip(queries, exact_ids, candidate_ids, compact_scores):
+        ids, _ = store.refine(query, candidates, scores[candidates], top_k)
+        hits += len(np.intersect1d(exact_row, ids))
+
+    return {
+        "store": store.kind,
+        "top_k": top_k,
+        "rescore_depth": getattr(store, "rescore_depth", 0),
+        "queries": len(queries),
+        "recall_at_k": round(hits / (top_k * len(queries)), 4),
+        "max_abs_score_error": round(float(np.abs(compact_scores - exact_scores).max()), 5),
+        "resident_mb": round(store.nbytes / 2**20, 2),
+        "float32_mb": round(embeddings.nbytes / 2**20, 2),
+    }
+
+
+if __name__ == "__main__":
+    from ann_index import sample_queries
+
+    parser = argparse.ArgumentParser(description="Measure ranking drift of compact embedding stores against float32.")
+    parser.add_argument("embeddings", help="Path to an embeddings.npy artifact")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rescore-depth", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = np.load(args.embeddings, mmap_mode="r")
+    query_sample = sample_queries(corpus, min(args.queries, corpus.shape[0]))
+    for store_kind in ("float16", "int8"):
+        print(quantization_report(build_store(corpus, store_kind, args.rescore_depth), corpus, query_sample, args.top_k))